@@ -0,0 +1,156 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication as BaseJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from superadmin.models import Role, User
+
+from .replicas import use_primary
+
+
+class UserCache:
+    """
+    Per-process cache of users (with their role) keyed by primary key. Keys
+    are strings because the token's user id claim may be serialized as one.
+
+    Entries live for ``JWT_USER_CACHE_TTL`` seconds; 0 disables the cache.
+    Saves and deletes of User/Role in this process evict entries straight
+    away, other processes see the change once the TTL runs out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._next_purge = 0.0
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'JWT_USER_CACHE_TTL', 0)
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is not None and entry[0] < now:
+                del self._entries[str(user_id)]
+                entry = None
+        if entry is None:
+            return None
+        # Hand out a copy so a request can't mutate the cached instance
+        return copy.copy(entry[1])
+
+    def set(self, user):
+        if self.ttl > 0:
+            now = time.monotonic()
+            with self._lock:
+                self._purge(now)
+                # Copy on the way in too: the caller goes on using the instance it passed
+                self._entries[str(user.pk)] = (now + self.ttl, copy.copy(user))
+
+    def _purge(self, now):
+        """Drop expired entries, at most once per TTL, so idle users don't pile up. Call with the lock held."""
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.ttl
+        for user_id, (expires, _) in list(self._entries.items()):
+            if expires < now:
+                del self._entries[user_id]
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def evict_role(self, role_id):
+        with self._lock:
+            for user_id, (_, user) in list(self._entries.items()):
+                if user.role_id == role_id:
+                    del self._entries[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@receiver([post_save, post_delete], sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    user_cache.evict(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Role)
+def evict_cached_role(sender, instance, **kwargs):
+    user_cache.evict_role(instance.pk)
+
+
+class JWTAuthentication(BaseJWTAuthentication):
+    """
+    simplejwt authentication that loads the user together with its role.
+
+    The permission classes read ``request.user.role.name`` on every request;
+    selecting the role up front (or serving the user from ``user_cache``)
+    keeps those checks free of extra queries.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id) if user_cache.ttl > 0 else None
+        if user is None:
+            try:
+                # Never cache (or authenticate against) a lagging replica's row
+                with use_primary():
+                    user = self.user_model.objects.select_related('role').get(
+                        **{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            user_cache.set(user)
+        return self.check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views; the user is loaded with the async ORM."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id) if user_cache.ttl > 0 else None
+        if user is None:
+            try:
+                with use_primary():
+                    user = await self.user_model.objects.select_related('role').aget(
+                        **{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            user_cache.set(user)
+        return self.check_user(user, validated_token)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def check_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            from rest_framework_simplejwt.utils import get_md5_hash_password
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed")
+
+        return user
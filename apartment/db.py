@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .pool import PooledDatabaseWrapperMixin
+
+
+def apply_sqlite_pragmas(conn):
+    """Apply SQLITE_PRAGMAS (WAL, sync level, caches, busy timeout) to a raw sqlite3 connection."""
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        conn.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    # On the raw connection, so the request metrics don't count them as queries.
+    # Pooled backends tune a connection once, when the pool opens it, instead:
+    # connection_created fires again on every checkout of the same one
+    if connection.vendor != 'sqlite' or isinstance(connection, PooledDatabaseWrapperMixin):
+        return
+    apply_sqlite_pragmas(connection.connection)
@@ -0,0 +1,8 @@
+from django.db.backends.mysql import base
+
+from apartment.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def ping_connection(self, conn):
+        conn.ping()
@@ -0,0 +1,12 @@
+from django.db.backends.sqlite3 import base
+
+from apartment.db import apply_sqlite_pragmas
+from apartment.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def ping_connection(self, conn):
+        conn.execute('SELECT 1')
+
+    def configure_new_connection(self, conn):
+        apply_sqlite_pragmas(conn)
@@ -0,0 +1,220 @@
+"""
+Per-endpoint request metrics.
+
+``RequestMetricsMiddleware`` times every request, counts its queries and
+their database time through an execute wrapper installed on every
+connection (so it works with DEBUG off, and for async views whose queries
+run on other threads) and measures the response body. Each request is logged as a
+JSON line on the ``apartment.metrics`` logger and folded into an in-process
+registry keyed by resolved URL name, which ``MetricsView`` serves to admins.
+Requests over their ``QUERY_BUDGETS`` entry are logged as warnings.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .permissions import IsAdminOrSuperAdmin
+from .pool import pool_stats
+
+logger = logging.getLogger('apartment.metrics')
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+SAMPLE_SIZE = 1000
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.queries_total = 0
+        self.queries_max = 0
+        self.bytes_total = 0
+        # Recent samples for percentiles
+        self.times = deque(maxlen=SAMPLE_SIZE)
+        self.db_times = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, record):
+        self.count += 1
+        if record['status'] >= 500:
+            self.errors += 1
+        self.buckets[bisect_left(LATENCY_BUCKETS, record['time_ms'])] += 1
+        self.queries_total += record['queries']
+        self.queries_max = max(self.queries_max, record['queries'])
+        self.bytes_total += record['bytes'] or 0
+        self.times.append(record['time_ms'])
+        self.db_times.append(record['db_time_ms'])
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'time_ms': {
+                'p50': percentile(self.times, 0.5),
+                'p95': percentile(self.times, 0.95),
+                'max': max(self.times, default=None),
+            },
+            'db_time_ms': {
+                'p50': percentile(self.db_times, 0.5),
+                'p95': percentile(self.db_times, 0.95),
+            },
+            'queries': {
+                'avg': round(self.queries_total / self.count, 2),
+                'max': self.queries_max,
+            },
+            'bytes_avg': round(self.bytes_total / self.count),
+            'histogram': dict(zip([f'le_{bound}' for bound in LATENCY_BUCKETS] + ['inf'], self.buckets)),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, record):
+        with self._lock:
+            self._endpoints.setdefault(record['view'], EndpointStats()).add(record)
+
+    def snapshot(self):
+        with self._lock:
+            return {view: stats.summary() for view, stats in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = MetricsRegistry()
+
+
+class QueryCounter:
+    """Counts queries and their time."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
+
+
+# The current request's counter; context variables follow a request into
+# the threads the async ORM and sync_to_async run it on
+_counter = ContextVar('request_query_counter', default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    counter = _counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _counter.reset(token)
+        self.record(request, response, counter, start)
+        return response
+
+    async def __acall__(self, request):
+        counter, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _counter.reset(token)
+        self.record(request, response, counter, start)
+        return response
+
+    def start(self):
+        # Connections opened before this module was imported missed connection_created
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(None, connection)
+        counter = QueryCounter()
+        return counter, _counter.set(counter), time.perf_counter()
+
+    def record(self, request, response, counter, start):
+        elapsed = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'view': match.view_name if match else '<unresolved>',
+            'method': request.method,
+            'status': response.status_code,
+            'time_ms': round(elapsed * 1000, 2),
+            'queries': counter.queries,
+            'db_time_ms': round(counter.seconds * 1000, 2),
+            'bytes': response_size(response),
+        }
+        registry.record(record)
+
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(record['view'])
+        if budget is not None and record['queries'] > budget:
+            logger.warning(json.dumps({**record, 'query_budget': budget}))
+        else:
+            logger.info(json.dumps(record))
+
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser | IsAdminOrSuperAdmin]
+
+    def get(self, request):
+        from landlord.lookups import lookup_cache
+
+        return Response({
+            'endpoints': registry.snapshot(),
+            'caches': {'lookups': lookup_cache.stats()},
+            # Only this worker's pools; empty unless DB_POOL is on
+            'db_pools': pool_stats(),
+        })
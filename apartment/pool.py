@@ -0,0 +1,221 @@
+"""
+Process-wide database connection pool for backends without a native one.
+
+Django only pools PostgreSQL connections. The ``apartment.db_backends``
+engines check their raw DB-API connection out of a ``ConnectionPool`` in
+``get_new_connection()`` and hand it back in ``close()``, so with
+``CONN_MAX_AGE = 0`` every request borrows a connection and returns it when
+``request_finished`` closes it. The pool is per process (one per worker),
+capped at ``MAX_SIZE``; threads that want more wait up to ``TIMEOUT``
+seconds. Idle connections are pinged before reuse once they have sat for
+``PING_AFTER`` seconds and are replaced after ``RECYCLE`` seconds.
+
+Configure it with a ``POOL`` dict in the DATABASES entry::
+
+    'POOL': {'MAX_SIZE': 10, 'TIMEOUT': 10, 'RECYCLE': 3600, 'PING_AFTER': 5}
+"""
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+DEFAULTS = {'MAX_SIZE': 10, 'TIMEOUT': 10.0, 'RECYCLE': 3600.0, 'PING_AFTER': 5.0}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+def close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    def __init__(self, ping, max_size=10, timeout=10.0, recycle=3600.0, ping_after=5.0):
+        self.ping = ping  # callable(conn) raising if the connection is dead
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, created, returned)
+        self._in_use = {}  # id(conn) -> (conn, created, owning thread)
+        self._size = 0  # idle + in use + being opened
+        self.counters = dict.fromkeys(('created', 'reused', 'discarded', 'reaped', 'waits', 'timeouts'), 0)
+
+    def acquire(self, connect):
+        """Return an idle healthy connection, or a new one from ``connect()`` while under MAX_SIZE."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = None
+            with self._cond:
+                if self._idle:
+                    entry = self._idle.pop()  # Most recently used: least likely to have timed out
+                elif self._size < self.max_size:
+                    self._size += 1  # Reserve the slot, connect outside the lock
+                else:
+                    if self._reap():
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(f'No database connection free after {self.timeout}s '
+                                          f'({self.max_size} in use).')
+                    self.counters['waits'] += 1
+                    self._cond.wait(remaining)
+                    continue
+
+            if entry is None:
+                try:
+                    conn = connect()
+                except BaseException:
+                    self._forget()
+                    raise
+                created = time.monotonic()
+                self._count('created')
+            else:
+                conn, created, returned = entry
+                if not self._healthy(conn, created, returned):
+                    close_quietly(conn)
+                    self._forget(discarded=True)
+                    continue
+                self._count('reused')
+
+            with self._cond:
+                self._in_use[id(conn)] = (conn, created, threading.current_thread())
+            return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+            if entry is not None and not discard:
+                self._idle.append((conn, entry[1], time.monotonic()))
+                self._cond.notify()
+                return
+        close_quietly(conn)
+        if entry is not None:
+            self._forget(discarded=True)
+
+    def close_idle(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            close_quietly(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                **self.counters,
+            }
+
+    def _healthy(self, conn, created, returned):
+        now = time.monotonic()
+        if now - created > self.recycle:
+            return False
+        if now - returned < self.ping_after:
+            return True
+        try:
+            self.ping(conn)
+        except Exception:
+            return False
+        return True
+
+    def _reap(self):
+        """Reclaim connections still checked out by threads that have exited. Call with the lock held."""
+        dead = [key for key, (_, _, thread) in self._in_use.items() if not thread.is_alive()]
+        for key in dead:
+            conn = self._in_use.pop(key)[0]
+            close_quietly(conn)
+            self._size -= 1
+            self.counters['reaped'] += 1
+        return bool(dead)
+
+    def _forget(self, discarded=False):
+        with self._cond:
+            self._size -= 1
+            if discarded:
+                self.counters['discarded'] += 1
+            self._cond.notify()
+
+    def _count(self, name):
+        with self._cond:
+            self.counters[name] += 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict, ping):
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            options = {**DEFAULTS, **settings_dict.get('POOL', {})}
+            pool = _pools[alias] = ConnectionPool(
+                ping, max_size=options['MAX_SIZE'], timeout=options['TIMEOUT'],
+                recycle=options['RECYCLE'], ping_after=options['PING_AFTER'])
+        return pool
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in sorted(pools.items())}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_idle()
+
+
+class PooledDatabaseWrapperMixin:
+    """Mixed into a backend's DatabaseWrapper ahead of it; see the module docstring."""
+
+    def ping_connection(self, conn):
+        raise NotImplementedError
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict, self.ping_connection)
+
+    def configure_new_connection(self, conn):
+        """Set up a raw connection once, when the pool opens it; reused checkouts skip this."""
+
+    def get_new_connection(self, conn_params):
+        def connect():
+            conn = super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params)
+            self.configure_new_connection(conn)
+            return conn
+        return self.pool.acquire(connect)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.in_atomic_block:
+            # close() keeps self.connection around until the atomic block
+            # exits, so it must not go back to the pool for another thread
+            self.pool.release(self.connection, discard=True)
+            return
+        discard = False
+        try:
+            # Never hand the next borrower an open transaction or a changed autocommit
+            if not self.get_autocommit():
+                self.connection.rollback()
+                self._set_autocommit(self.settings_dict['AUTOCOMMIT'])
+            discard = self.errors_occurred and not self.is_usable()
+        except Exception:
+            discard = True
+        self.pool.release(self.connection, discard=discard)
@@ -0,0 +1,155 @@
+"""
+Server push for chat and community events over WebSockets.
+
+Events are published to named channels (``user:<id>`` for a user's chat
+traffic, ``community`` for announcements) through a broker whose backend is
+chosen with the ``REALTIME_BACKEND`` setting. The default in-memory backend
+fans out within the current process, which is enough for a single ASGI worker
+and for tests; a multi-process deployment plugs in a shared backend that
+implements the same three methods.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseBackend:
+    def subscribe(self, channel, callback):
+        raise NotImplementedError
+
+    def unsubscribe(self, channel, callback):
+        raise NotImplementedError
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+
+class InMemoryBackend(BaseBackend):
+    """Delivers events to callbacks registered in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel, callback):
+        with self._lock:
+            self._subscribers[channel].add(callback)
+
+    def unsubscribe(self, channel, callback):
+        with self._lock:
+            self._subscribers[channel].discard(callback)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, ()))
+        for callback in callbacks:
+            callback(event)
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'REALTIME_BACKEND', 'apartment.realtime.InMemoryBackend')
+                _broker = import_string(backend)()
+    return _broker
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+COMMUNITY_CHANNEL = 'community'
+
+
+def publish(channel, event_type, data):
+    get_broker().publish(channel, {'type': event_type, 'data': data})
+
+
+async def authenticate(scope):
+    """Resolve the ``?token=`` access token of a WebSocket handshake to a user."""
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+    from superadmin.models import User
+
+    raw = parse_qs(scope.get('query_string', b'').decode()).get('token')
+    if not raw:
+        return None
+    try:
+        token = AccessToken(raw[0])
+    except TokenError:
+        return None
+    return await User.objects.filter(
+        pk=token.get(api_settings.USER_ID_CLAIM), is_active=True).afirst()
+
+
+async def websocket_application(scope, receive, send):
+    """
+    ASGI handler for ``/ws/``.
+
+    After the handshake the socket is subscribed to the user's channel and the
+    community channel and stays idle until an event arrives. A ``ping`` text
+    frame is answered with ``pong`` so clients can keep proxies from timing out.
+    """
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+    if scope['path'].rstrip('/') != '/ws':
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    user = await authenticate(scope)
+    if user is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+    await send({'type': 'websocket.accept'})
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def deliver(event):
+        # Publishers run in sync views / worker threads
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    broker = get_broker()
+    channels = [user_channel(user.pk), COMMUNITY_CHANNEL]
+    for channel in channels:
+        broker.subscribe(channel, deliver)
+
+    receive_task = asyncio.ensure_future(receive())
+    queue_task = asyncio.ensure_future(queue.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {receive_task, queue_task}, return_when=asyncio.FIRST_COMPLETED)
+            if queue_task in done:
+                await send({'type': 'websocket.send', 'text': json.dumps(queue_task.result(), default=str)})
+                queue_task = asyncio.ensure_future(queue.get())
+            if receive_task in done:
+                message = receive_task.result()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                if message.get('text') == 'ping':
+                    await send({'type': 'websocket.send', 'text': 'pong'})
+                receive_task = asyncio.ensure_future(receive())
+    finally:
+        for channel in channels:
+            broker.unsubscribe(channel, deliver)
+        receive_task.cancel()
+        queue_task.cancel()
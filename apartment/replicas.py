@@ -0,0 +1,170 @@
+"""
+Read-replica routing.
+
+``ReplicaRouter`` sends reads to one of the ``DATABASE_REPLICAS`` aliases
+only while ``ReplicaRoutingMiddleware`` has marked the current request as
+replica-safe: a GET/HEAD/OPTIONS to a view that opted in with
+``read_replica = True`` (``REPLICA_READS_DEFAULT`` applies to views that set
+nothing), from a user who has not written anything in the last
+``REPLICA_PIN_SECONDS``. Everything else, writes included, uses ``default``.
+
+A successful write request pins its user to ``default`` through the cache
+named by ``REPLICA_CACHE_ALIAS``, which must be shared between workers
+(Redis, Memcached, database) for the pin to hold across them.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import Resolver404, get_resolver
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as default
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+@contextmanager
+def use_primary():
+    """Read from ``default`` inside the block, e.g. before caching what was read."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def use_replica():
+    """Let reads in the block go to a replica, for code running outside a request."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_cache():
+    return caches[getattr(settings, 'REPLICA_CACHE_ALIAS', 'default')]
+
+
+def pin(user_id):
+    pin_cache().set(pin_key(user_id), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+def is_pinned(user_id):
+    return pin_cache().get(pin_key(user_id), False)
+
+
+async def apin(user_id):
+    await pin_cache().aset(pin_key(user_id), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+async def ais_pinned(user_id):
+    return await pin_cache().aget(pin_key(user_id), False)
+
+
+def request_user_id(request):
+    """User id from the request's access token, without touching the database."""
+    from .authentication import JWTAuthentication
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    for token_class in api_settings.AUTH_TOKEN_CLASSES:
+        try:
+            return token_class(raw_token).get(api_settings.USER_ID_CLAIM)
+        except TokenError:
+            continue
+    return None
+
+
+def reads_from_replica(request):
+    try:
+        view_func = get_resolver(getattr(request, 'urlconf', None)).resolve(request.path_info).func
+    except Resolver404:
+        return False
+    view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    enabled = getattr(view, 'read_replica', None)
+    if enabled is None:
+        return getattr(settings, 'REPLICA_READS_DEFAULT', False)
+    return enabled
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        user_id = request_user_id(request)
+        replica = self.replica_safe(request) and not (user_id is not None and is_pinned(user_id))
+        token = _use_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        if self.pins(request, response, user_id):
+            pin(user_id)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        user_id = request_user_id(request)
+        replica = self.replica_safe(request) and not (user_id is not None and await ais_pinned(user_id))
+        token = _use_replica.set(replica)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        if self.pins(request, response, user_id):
+            await apin(user_id)
+        return response
+
+    def replica_safe(self, request):
+        return request.method in SAFE_METHODS and reads_from_replica(request)
+
+    def pins(self, request, response, user_id):
+        # Read-your-writes: their next reads must see this write
+        return request.method not in SAFE_METHODS and user_id is not None and response.status_code < 400
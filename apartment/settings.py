@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -54,10 +57,16 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apartment.authentication.JWTAuthentication',
     )
 }
 
+# Seconds an authenticated user (with role) stays in the per-process cache;
+# 0 (the default) disables it. Saving a user evicts it only in the process
+# that saved, so other workers keep accepting a deactivated user, or applying
+# their old role, for up to this long after the change.
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', 0))
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),  # Short-lived access token
@@ -66,7 +75,67 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Local memory per process by default; point 'default' at
+# django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.redis.RedisCache to share entries between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Tenant -> room -> property -> landlord lookups (see landlord/lookups.py)
+LOOKUP_CACHE_ALIAS = 'default'
+LOOKUP_CACHE_TTL = 300
+
+# Most queries a request to these URL names should run, JWT user lookup
+# included; going over is logged as a warning by apartment.metrics and fails
+# QueryBudgetMixin.assertQueryBudget in tests.
+QUERY_BUDGETS = {
+    'landlord-properties': 3,
+    'room-list-create': 2,
+    'tenant-room-detail': 4,
+    'tenant-landlord-contact': 4,
+    'tenant-payment-list': 2,
+    'landlord-payment-list': 2,
+    'rent-unpaid': 2,
+    'rent-dashboard': 2,
+    'landlord-complaints': 2,
+    'complaint-counts': 2,
+    'community-message-list': 3,
+    'chat': 2,
+    'chat-conversations': 3,
+    'chat-messages': 2,
+    'income-analytics': 2,
+    'async-tenant-room-detail': 4,
+    'async-tenant-landlord-contact': 4,
+    'async-chat-messages': 2,
+    'async-community-message-list': 3,
+    'async-income-analytics': 2,
+}
+
+# Per-request metrics are logged as JSON on 'apartment.metrics'; set
+# METRICS_LOG_LEVEL=INFO to log every request, not just those over budget.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apartment.metrics': {
+            'handlers': ['console'],
+            'level': os.environ.get('METRICS_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Broker used to push chat / community events to WebSocket clients (see apartment/realtime.py)
+REALTIME_BACKEND = 'apartment.realtime.InMemoryBackend'
+
 MIDDLEWARE = [
+    'apartment.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +143,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apartment.replicas.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'apartment.urls'
@@ -100,22 +170,80 @@ WSGI_APPLICATION = 'apartment.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.sqlite3',
-#         'NAME': BASE_DIR / 'db.sqlite3',
-#     }
-# }
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'mkdb',      # The name of your database
-        'USER': 'root',      # Your MySQL username (e.g., 'root')
-        'PASSWORD': '1234',  # Your MySQL password
-        'HOST': 'localhost',  # Or IP address of your MySQL server
-        'PORT': '3306',      # Default MySQL port
+# DB_PROFILE picks the database: 'mysql' (default) or 'sqlite' for local
+# runs, tests and benchmarks without a MySQL server.
+DB_PROFILE = os.environ.get('DB_PROFILE', 'mysql')
+
+if DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # Take the write lock up front so busy_timeout applies instead of
+            # failing with "database is locked" on a read -> write upgrade
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+            # As for MySQL: reconnecting (and re-applying SQLITE_PRAGMAS) per request is wasted work
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+elif DB_PROFILE == 'mysql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': os.environ.get('DB_NAME', 'mkdb'),
+            'USER': os.environ.get('DB_USER', 'root'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', '1234'),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '3306'),
+            # Keep connections across requests; check them before reuse
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
+else:
+    raise ImproperlyConfigured(f"Unknown DB_PROFILE {DB_PROFILE!r}; use 'mysql' or 'sqlite'.")
+
+# DB_POOL=1 swaps in the pooled engine from apartment.db_backends: each
+# request borrows a connection from a per-process pool of at most
+# DB_POOL_SIZE and returns it when the request ends (see apartment.pool).
+if os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes'):
+    DATABASES['default'].update({
+        'ENGINE': DATABASES['default']['ENGINE'].replace('django.db.backends.', 'apartment.db_backends.'),
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'RECYCLE': float(os.environ.get('DB_POOL_RECYCLE', 3600)),
+            'PING_AFTER': float(os.environ.get('DB_POOL_PING_AFTER', 5)),
+        },
+    })
+
+# DB_REPLICAS lists read replicas of the active profile: hosts for MySQL,
+# database files for SQLite. Views opt in to replica reads with
+# ``read_replica = True``; see apartment.replicas.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), 1):
+    alias = f'replica{number}'
+    location = {'NAME': replica} if DB_PROFILE == 'sqlite' else {'HOST': replica}
+    DATABASES[alias] = {**DATABASES['default'], **location, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['apartment.replicas.ReplicaRouter']
+# Views without a read_replica attribute
+REPLICA_READS_DEFAULT = False
+# Seconds a user's reads stay on default after they write (read-your-writes)
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+REPLICA_CACHE_ALIAS = 'default'
+
+# Applied once to every new raw SQLite connection by apartment.db
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', 64 * 1024)),  # negative = KiB
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'temp_store': 'MEMORY',
 }
 
 
@@ -155,6 +283,19 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (payment screenshots, documents, landlord proofs)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Resumable chunked uploads (landlord/uploads.py); partial files default to MEDIA_ROOT/partial_uploads
+CHUNKED_UPLOAD_DIR = None
+CHUNKED_UPLOAD_MAX_SIZE = 50 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_CHUNK = 8 * 1024 * 1024
+# A chunk request holding a session longer than this is presumed dead and can be retried
+CHUNKED_UPLOAD_CLAIM_SECONDS = 300
+# purge_uploads removes unfinished sessions (and their partial files) idle for longer than this
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -0,0 +1,14 @@
+"""
+Settings for the test suite::
+
+    python manage.py test --settings=apartment.settings_test
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASE_REPLICAS, DATABASES
+
+# Test runs create many users; the default PBKDF2 hasher would dominate them
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# A second, unrouted database to stand in for a replica (ReplicaRoutingTests)
+if not DATABASE_REPLICAS:
+    DATABASES = {**DATABASES, 'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3'}}
@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for holding views to a query budget.
+
+    ``with self.assertQueryBudget('landlord-payment-list'):`` fails when the
+    block runs more queries than the view's ``QUERY_BUDGETS`` entry (or the
+    explicit ``budget``) and lists the SQL, so an N+1 shows up in the diff.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, view_name, budget=None):
+        if budget is None:
+            budget = settings.QUERY_BUDGETS[view_name]
+        with CaptureQueriesContext(connection) as ctx:
+            yield ctx
+        if len(ctx.captured_queries) > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}' for number, query in enumerate(ctx.captured_queries, start=1))
+            self.fail(f'{view_name} ran {len(ctx.captured_queries)} queries, budget is {budget}:\n{queries}')
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .metrics import MetricsView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -31,4 +32,5 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(),
          name='token_refresh'), 
     path('api/token/logout/', TokenBlacklistView.as_view(), name='token_blacklist'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
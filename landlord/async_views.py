@@ -0,0 +1,184 @@
+"""
+Async variants of the hottest read endpoints, mounted under ``async/``.
+
+DRF's APIView dispatches synchronously, so under ASGI every request to it
+holds a thread for its whole duration. These views answer the same
+requests with the same payloads, but wait on the database through the
+async ORM, so a worker's event loop keeps serving other connections
+meanwhile. ``AsyncAPIView`` covers the parts of APIView they need: JWT
+authentication, the DRF permission classes, conditional GET and JSON
+rendering.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db import models
+from django.db.models import Count, Max, Sum
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apartment.authentication import JWTAuthentication
+from .conditional import make_etag, set_validators
+from .filters import QueryParamFilterBackend
+from .lookups import aget_landlord_contact, aget_room_detail, aget_tenant_room
+from .models import ChatMessage, CommunityMessage, MonthlyIncome, Room
+from .pagination import CreatedAtCursorPagination
+from .permissions import IsLandlord, IsTenant
+from .serializers import ChatMessageSerializer, CommunityMessageSerializer
+from .views import CHAT_SYNC_PARAMS_ERROR, ChatMessageSyncView, chat_sync_params
+
+
+class AsyncAPIView(View):
+    permission_classes = [IsAuthenticated]
+
+    async def get_validators(self, request):
+        """``(version, last_modified)`` as in ConditionalGetMixin, or None to skip the check."""
+        return None
+
+    async def dispatch(self, request, *args, **kwargs):
+        etag = last_modified = response = None
+        try:
+            await self.initial(request)
+            if request.method in ('GET', 'HEAD'):
+                validators = await self.get_validators(request)
+                if validators is not None:
+                    version, modified = validators
+                    etag = make_etag(version, request)
+                    last_modified = int(modified.timestamp()) if modified else None
+                    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(exc)
+        set_validators(response, etag, last_modified)
+        return response
+
+    async def initial(self, request):
+        authenticator = JWTAuthentication()
+        self.authenticator = authenticator
+        user_auth = await authenticator.aauthenticate(request)
+        request.user, request.auth = user_auth if user_auth else (AnonymousUser(), None)
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise NotAuthenticated()
+                raise PermissionDenied(getattr(permission, 'message', None))
+
+    def handle_exception(self, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = self.render(data, exc.status_code)
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            # As APIView does when the authenticator has a WWW-Authenticate header
+            response.status_code = 401
+            response['WWW-Authenticate'] = self.authenticator.authenticate_header(self.request)
+        return response
+
+    def render(self, data, status=200):
+        if data is None:
+            return HttpResponse(status=status)
+        return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+
+class AsyncTenantRoomDetailView(AsyncAPIView):
+    """TenantRoomDetailView."""
+    permission_classes = [IsAuthenticated, IsTenant]
+
+    async def get_validators(self, request):
+        row = await Room.objects.filter(tenant=request.user).order_by('pk').values_list(
+            'id', 'updated_at', 'property__updated_at', 'property__landlord__updated_at').afirst()
+        if row is None:
+            return None
+        return row, max(row[1:])
+
+    async def get(self, request):
+        lookup = await aget_tenant_room(request.user)
+        if lookup is None:
+            return self.render({'detail': 'No room assigned.'}, 404)
+        return self.render(await aget_room_detail(lookup['room']))
+
+
+class AsyncLandlordContactView(AsyncAPIView):
+    """LandlordContactView."""
+    permission_classes = [IsAuthenticated, IsTenant]
+
+    async def get_validators(self, request):
+        row = await Room.objects.filter(tenant=request.user).order_by('pk').values_list(
+            'property__landlord_id', 'property__landlord__updated_at').afirst()
+        if row is None:
+            return None
+        return row, row[1]
+
+    async def get(self, request):
+        lookup = await aget_tenant_room(request.user)
+        if lookup is None:
+            return self.render({'detail': 'No room assigned.'}, 404)
+        return self.render(await aget_landlord_contact(lookup['landlord']))
+
+
+class AsyncChatMessageSyncView(AsyncAPIView):
+    """ChatMessageSyncView: ``?after=<id>``, ``?before=<id>`` and ``?limit=``."""
+    default_limit = ChatMessageSyncView.default_limit
+    max_limit = ChatMessageSyncView.max_limit
+
+    async def get(self, request, user_id):
+        try:
+            after, before, limit = chat_sync_params(request.GET, self.default_limit, self.max_limit)
+        except ValueError:
+            return self.render({'detail': CHAT_SYNC_PARAMS_ERROR}, 400)
+
+        user = request.user
+        messages = ChatMessage.objects.filter(
+            models.Q(sender=user, receiver_id=user_id) | models.Q(sender_id=user_id, receiver=user),
+            id__gt=after,
+        ).select_related('sender', 'receiver')
+        if before is not None:
+            # Most recent page before the cursor, returned in chronological order
+            messages = [message async for message in messages.filter(id__lt=before).order_by('-id')[:limit]][::-1]
+        else:
+            messages = [message async for message in messages.order_by('id')[:limit]]
+
+        if not messages:
+            return self.render(None, 204)
+        return self.render(ChatMessageSerializer(messages, many=True).data)
+
+
+class AsyncCommunityMessageListView(AsyncAPIView):
+    """CommunityMessageListView, with the same cursors and date filters."""
+    read_replica = True
+    pagination_class = CreatedAtCursorPagination
+    date_filter_field = 'created_at'
+
+    async def get_validators(self, request):
+        stats = await CommunityMessage.objects.aaggregate(count=Count('id'), last=Max('updated_at'))
+        return (stats['count'], stats['last']), None
+
+    async def get(self, request):
+        drf_request = Request(request)
+        queryset = QueryParamFilterBackend().filter_queryset(
+            drf_request, CommunityMessage.objects.select_related('sender').order_by('-created_at'), self)
+        paginator = self.pagination_class()
+        # CursorPagination evaluates the page itself; run it on the thread
+        # the async ORM uses, as the async ORM does with its own queries
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, drf_request, view=self)
+        data = CommunityMessageSerializer(page, many=True).data
+        return self.render(paginator.get_paginated_response(data).data)
+
+
+class AsyncIncomeAnalyticsView(AsyncAPIView):
+    """IncomeAnalyticsView."""
+    read_replica = True
+    permission_classes = [IsAuthenticated, IsLandlord]
+    filter_fields = {'property': 'property', 'payment_type': 'payment_type'}
+
+    async def get(self, request):
+        income = QueryParamFilterBackend().filter_queryset(
+            Request(request), MonthlyIncome.objects.filter(landlord=request.user), self)
+        payments = income.values('month').annotate(total=Sum('total')).order_by('month')
+        return self.render([
+            {'month': p['month'].strftime('%Y-%m'), 'total': p['total']}
+            async for p in payments
+        ])
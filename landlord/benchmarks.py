@@ -0,0 +1,335 @@
+"""
+Benchmark harness driving every URL of landlord/urls.py and superadmin/urls.py.
+
+Each URL name has a scenario below: which user calls it and with what
+request. Requests go through the test client with a real JWT, so
+authentication, middleware and rendering are all measured. Every request
+runs inside a transaction that is rolled back, so write endpoints leave the
+dataset as they found it and the numbers stay comparable between runs.
+
+``ConcurrencyRunner`` instead measures throughput of read endpoints under
+many concurrent clients through the ASGI application, to compare the sync
+views with their async variants.
+"""
+import asyncio
+import statistics
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from superadmin.models import User
+from superadmin.urls import urlpatterns as superadmin_urls
+from .models import Complaint, Payment, ReminderJob, Room, UploadSession
+from .urls import urlpatterns as landlord_urls
+
+
+@dataclass
+class Scenario:
+    user: str  # 'landlord', 'tenant' or None for anonymous
+    method: str = 'get'
+    kwargs: dict = field(default_factory=dict)
+    data: object = None  # dict, or a callable returning one per request
+    format: str = 'json'
+    setup: object = None  # callable(ctx) run (and rolled back) before each request, may return url kwargs
+
+
+@dataclass
+class Context:
+    landlord: User
+    tenant: User
+    property_id: int
+    room_id: int
+    month: str
+    payment_id: int = None
+    complaint_id: int = None
+
+
+def _reminder_job(ctx):
+    return {'pk': ReminderJob.objects.create(landlord=ctx.landlord, month=timezone.localdate().replace(day=1)).pk}
+
+
+def _upload_session(ctx):
+    return {'pk': UploadSession.objects.create(
+        user=ctx.tenant, target='document', filename='lease.pdf', size=1024, room_id=ctx.room_id).pk}
+
+
+def _unique_user():
+    name = f'bench-{uuid.uuid4().hex[:12]}'
+    return {'username': name, 'email': f'{name}@example.com', 'password': 'password123'}
+
+
+SCENARIOS = {
+    # landlord/urls.py
+    'landlord-properties': Scenario('landlord'),
+    'landlord-property-detail': Scenario('landlord', kwargs={'pk': 'property_id'}),
+    'room-list-create': Scenario('landlord'),
+    'room-detail': Scenario('landlord', kwargs={'pk': 'room_id'}),
+    'room-bulk-create': Scenario('landlord', 'post', data=lambda ctx: [
+        {'property': ctx.property_id, 'room_number': f'B{n}-{uuid.uuid4().hex[:6]}', 'floor': 9, 'rent': '900'}
+        for n in range(50)]),
+    'assign-tenant': Scenario('landlord', 'post', data=lambda ctx: {
+        'room_id': ctx.room_id, 'tenant_email': ctx.tenant.email}),
+    'assign-tenant-bulk': Scenario('landlord', 'post', data=lambda ctx: [
+        {'room_id': ctx.room_id, 'tenant_email': ctx.tenant.email}]),
+    'tenant-room-detail': Scenario('tenant'),
+    'tenant-payment-create': Scenario('tenant', 'post', data={'amount': '500'}),
+    'tenant-payment-list': Scenario('tenant'),
+    'landlord-payment-list': Scenario('landlord'),
+    'landlord-payment-detail': Scenario('landlord', kwargs={'pk': 'payment_id'}),
+    'rent-unpaid': Scenario('landlord'),
+    'rent-reminders': Scenario('landlord', 'post', data=lambda ctx: {'month': ctx.month}),
+    'rent-reminder-job': Scenario('landlord', setup=_reminder_job),
+    'tenant-complaints': Scenario('tenant'),
+    'landlord-complaints': Scenario('landlord'),
+    'complaint-counts': Scenario('landlord'),
+    'landlord-complaint-detail': Scenario('landlord', kwargs={'pk': 'complaint_id'}),
+    'upload-create': Scenario('tenant', 'post', data={'target': 'document', 'filename': 'lease.pdf', 'size': 1024}),
+    'upload-detail': Scenario('tenant', setup=_upload_session),
+    'payment-export': Scenario('landlord'),
+    'electricity-export': Scenario('landlord'),
+    'electricity-bill-create': Scenario('landlord', 'post', data=lambda ctx: {
+        'room': ctx.room_id, 'amount': '75', 'month': '2000-01-01'}),
+    'electricity-bill-run': Scenario('landlord', 'post', data={'month': '2000-01', 'tariff': '0.2'}),
+    'tenant-electricity-list': Scenario('tenant'),
+    'community-message-create': Scenario('landlord', 'post', data={'title': 'Benchmark', 'content': 'Ignore'}),
+    'community-message-list': Scenario('tenant'),
+    'tenant-landlord-contact': Scenario('tenant'),
+    'chat': Scenario('tenant'),
+    'chat-conversations': Scenario('landlord'),
+    'chat-messages': Scenario('landlord', kwargs={'user_id': 'tenant.pk'}),
+    'chat-mark-read': Scenario('landlord', 'post', kwargs={'user_id': 'tenant.pk'}, data={'up_to': 2 ** 31 - 1}),
+    'income-analytics': Scenario('landlord'),
+    'rent-dashboard': Scenario('landlord'),
+    'async-tenant-room-detail': Scenario('tenant'),
+    'async-tenant-landlord-contact': Scenario('tenant'),
+    'async-chat-messages': Scenario('landlord', kwargs={'user_id': 'tenant.pk'}),
+    'async-community-message-list': Scenario('tenant'),
+    'async-income-analytics': Scenario('landlord'),
+    # superadmin/urls.py
+    'register': Scenario(None, 'post', data=lambda ctx: _unique_user()),
+    'login': Scenario(None, 'post', data=lambda ctx: {'username': ctx.tenant.username, 'password': 'password123'}),
+    'add_user': Scenario('landlord', 'post', data=lambda ctx: _unique_user()),
+}
+
+
+def url_names():
+    return [pattern.name for pattern in list(landlord_urls) + list(superadmin_urls) if pattern.name]
+
+
+def build_context(landlord=None, tenant=None):
+    """Pick the landlord with the most rooms (and one of their tenants) unless given."""
+    if landlord is None:
+        landlord = User.objects.filter(role__name='admin').annotate(
+            room_total=Count('properties__rooms')).order_by('-room_total', 'id').first()
+    if landlord is None:
+        raise ValueError('No landlord in the database; run generate_synthetic_data first.')
+    rooms = Room.objects.filter(property__landlord=landlord, tenant__isnull=False)
+    if tenant is not None:
+        rooms = rooms.filter(tenant=tenant)
+    room = rooms.select_related('tenant').order_by('id').first()
+    if room is None:
+        raise ValueError(f'{landlord.username} has no rooms with a tenant.')
+    return Context(
+        landlord=landlord,
+        tenant=room.tenant,
+        property_id=room.property_id,
+        room_id=room.id,
+        month=timezone.localdate().strftime('%Y-%m'),
+        payment_id=Payment.objects.filter(room__property__landlord=landlord).values_list('id', flat=True).first(),
+        complaint_id=Complaint.objects.filter(property__landlord=landlord).values_list('id', flat=True).first(),
+    )
+
+
+def _resolve(value, ctx):
+    # 'tenant.pk' -> ctx.tenant.pk
+    for part in value.split('.'):
+        ctx = getattr(ctx, part)
+    return ctx
+
+
+class Runner:
+    def __init__(self, ctx, iterations=20, warmup=2):
+        self.ctx = ctx
+        self.iterations = iterations
+        self.warmup = warmup
+        self.tokens = {
+            'landlord': str(AccessToken.for_user(ctx.landlord)),
+            'tenant': str(AccessToken.for_user(ctx.tenant)),
+        }
+
+    def request(self, name, scenario):
+        """One rolled-back request; returns (seconds, queries, status)."""
+        client = APIClient()
+        if scenario.user:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens[scenario.user]}')
+        with transaction.atomic():
+            kwargs = {key: _resolve(value, self.ctx) for key, value in scenario.kwargs.items()}
+            if scenario.setup:
+                kwargs.update(scenario.setup(self.ctx))
+            data = scenario.data(self.ctx) if callable(scenario.data) else scenario.data
+            path = reverse(name, kwargs=kwargs)
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = getattr(client, scenario.method)(path, data, format=scenario.format)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return elapsed, len(queries.captured_queries), response.status_code
+
+    def run(self, name):
+        scenario = SCENARIOS.get(name)
+        if scenario is None:
+            return {'skipped': 'no scenario'}
+        missing = [value for value in scenario.kwargs.values() if _resolve(value, self.ctx) is None]
+        if missing:
+            return {'skipped': f'no {", ".join(missing)} in the dataset'}
+
+        for _ in range(self.warmup):
+            self.request(name, scenario)
+        times, query_counts, statuses = [], [], set()
+        for _ in range(self.iterations):
+            elapsed, queries, status = self.request(name, scenario)
+            times.append(elapsed * 1000)
+            query_counts.append(queries)
+            statuses.add(status)
+
+        # Separate pass: tracemalloc slows everything down
+        tracemalloc.start()
+        try:
+            self.request(name, scenario)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        ordered = sorted(times)
+        return {
+            'p50_ms': round(statistics.median(ordered), 2),
+            'p95_ms': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2),
+            'queries': max(query_counts),
+            'peak_kb': round(peak / 1024, 1),
+            'status': sorted(statuses),
+        }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Regressions against a baseline: slower p95 beyond ``tolerance`` or more queries."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or 'skipped' in result or 'skipped' in before:
+            continue
+        if result['queries'] > before['queries']:
+            regressions.append(f'{name}: {before["queries"]} -> {result["queries"]} queries')
+        if result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {before["p95_ms"]} -> {result["p95_ms"]} ms')
+        if result['peak_kb'] > before['peak_kb'] * (1 + tolerance):
+            regressions.append(f'{name}: peak memory {before["peak_kb"]} -> {result["peak_kb"]} KB')
+    return regressions
+
+
+# Sync URL name -> its async variant (landlord/async_views.py)
+ASYNC_PAIRS = {
+    'tenant-room-detail': 'async-tenant-room-detail',
+    'tenant-landlord-contact': 'async-tenant-landlord-contact',
+    'chat-messages': 'async-chat-messages',
+    'community-message-list': 'async-community-message-list',
+    'income-analytics': 'async-income-analytics',
+}
+
+
+class ConcurrencyRunner:
+    """
+    Throughput under concurrent clients, through the ASGI application as a
+    server would drive it. ``clients`` connections each send ``requests``
+    GETs one after another; ``client_delay`` seconds are spent on every
+    message exchanged with a client, as over a slow network. GET only:
+    nothing is rolled back.
+    """
+
+    def __init__(self, ctx, clients=50, requests=5, client_delay=0.0):
+        self.ctx = ctx
+        self.clients = clients
+        self.requests = requests
+        self.client_delay = client_delay
+        self.tokens = {
+            'landlord': str(AccessToken.for_user(ctx.landlord)),
+            'tenant': str(AccessToken.for_user(ctx.tenant)),
+        }
+        self.application = get_asgi_application()
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')]
+        self.host = hosts[0] if hosts else 'localhost'
+
+    def scope(self, path, scenario):
+        headers = [(b'host', self.host.encode())]
+        if scenario.user:
+            headers.append((b'authorization', f'Bearer {self.tokens[scenario.user]}'.encode()))
+        return {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': headers, 'client': ('127.0.0.1', 0), 'server': (self.host, 80),
+        }
+
+    async def request(self, scope):
+        """One request; returns (seconds, status)."""
+        done = asyncio.Event()
+        sent = False
+        status = None
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                await asyncio.sleep(self.client_delay)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            await asyncio.sleep(self.client_delay)
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif not message.get('more_body'):
+                done.set()
+
+        start = time.perf_counter()
+        await self.application(scope, receive, send)
+        return time.perf_counter() - start, status
+
+    async def client(self, scope, times, statuses):
+        for _ in range(self.requests):
+            elapsed, status = await self.request(scope)
+            times.append(elapsed * 1000)
+            statuses.add(status)
+
+    async def measure(self, scope):
+        await self.request(scope)  # Warm up
+        times, statuses = [], set()
+        start = time.perf_counter()
+        await asyncio.gather(*(self.client(scope, times, statuses) for _ in range(self.clients)))
+        elapsed = time.perf_counter() - start
+        ordered = sorted(times)
+        return {
+            'requests_per_s': round(len(times) / elapsed, 1),
+            'p50_ms': round(statistics.median(ordered), 2),
+            'p95_ms': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2),
+            'status': sorted(statuses),
+        }
+
+    def run(self, name):
+        scenario = SCENARIOS[name]
+        kwargs = {key: _resolve(value, self.ctx) for key, value in scenario.kwargs.items()}
+        return asyncio.run(self.measure(self.scope(reverse(name, kwargs=kwargs), scenario)))
@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+
+from .models import ElectricityBill, Room
+
+
+class BillRunError(Exception):
+    pass
+
+
+def run_electricity_bills(landlord, month, readings=None, tariff=None, fixed_charge=Decimal('0'),
+                          property_id=None):
+    """
+    Create the month's ElectricityBill for every occupied room of a landlord.
+
+    ``readings`` maps room id to ``{'units': ...}`` (billed at ``tariff`` per
+    unit) or ``{'amount': ...}``; ``fixed_charge`` is added to every bill and
+    is all that rooms without a reading are billed. Rooms that already have a
+    bill for the month are left alone, so a run can be repeated safely. All
+    bills are written with one bulk insert in a single transaction.
+    """
+    readings = readings or {}
+    month = month.replace(day=1)
+    rooms = Room.objects.filter(property__landlord=landlord, tenant__isnull=False)
+    if property_id is not None:
+        rooms = rooms.filter(property_id=property_id)
+    room_ids = set(rooms.values_list('id', flat=True))
+
+    unknown = sorted(set(readings) - room_ids)
+    if unknown:
+        raise BillRunError(f'Rooms not found, not yours or not occupied: {unknown}')
+    if tariff is None and any('units' in reading for reading in readings.values()):
+        raise BillRunError('A tariff is required to bill meter readings.')
+
+    # A concurrent run can bill some of the rooms between the check and the
+    # insert; its (room, month) conflict rolls this attempt back, and the
+    # retry then counts those rooms as already billed
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                already_billed, bills, missing = _plan_bills(room_ids, month, readings, tariff, fixed_charge)
+                ElectricityBill.objects.bulk_create(bills, batch_size=500)
+            break
+        except IntegrityError:
+            if attempt:
+                raise
+
+    return {
+        'month': month.strftime('%Y-%m'),
+        'created': len(bills),
+        'already_billed': len(already_billed),
+        'missing_readings': missing,
+        'total_amount': sum((bill.amount for bill in bills), Decimal('0')),
+    }
+
+
+def _plan_bills(room_ids, month, readings, tariff, fixed_charge):
+    already_billed = set(ElectricityBill.objects.filter(
+        room_id__in=room_ids, month=month).values_list('room_id', flat=True))
+
+    bills, missing = [], []
+    for room_id in sorted(room_ids - already_billed):
+        reading = readings.get(room_id)
+        if reading is None:
+            if not fixed_charge:
+                missing.append(room_id)
+                continue
+            amount = fixed_charge
+        elif 'units' in reading:
+            amount = reading['units'] * tariff + fixed_charge
+        else:
+            amount = reading['amount'] + fixed_charge
+        bills.append(ElectricityBill(room_id=room_id, month=month, amount=amount.quantize(Decimal('0.01'))))
+    return already_billed, bills, missing
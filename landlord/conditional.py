@@ -0,0 +1,70 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(version, request):
+    # The query string picks the page / filters, so it is part of the tag
+    key = repr((version, request.get_full_path())).encode()
+    return 'W/' + quote_etag(hashlib.md5(key, usedforsecurity=False).hexdigest())
+
+
+def set_validators(response, etag, last_modified):
+    if etag and response.status_code in (200, 304, 412):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Per-user data: shared caches must not store it, clients must revalidate
+        patch_cache_control(response, private=True, no_cache=True)
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for GET.
+
+    Views implement ``get_validators(request)`` returning ``(version, last_modified)``
+    from a cheap query (a count, a max(updated_at), ...), or None to skip the
+    check. Collections whose rows can be deleted return no last_modified:
+    removing a row doesn't move their max(updated_at), only their count.
+
+    The validators are checked in ``initial()``, after authentication and
+    permissions, so a matching If-None-Match / If-Modified-Since gets its 304
+    before the handler (and its queryset) runs.
+    """
+    etag = None
+    last_modified = None
+
+    def get_validators(self, request):
+        raise NotImplementedError
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return
+        validators = self.get_validators(request)
+        if validators is None:
+            return
+
+        version, last_modified = validators
+        self.etag = make_etag(version, request)
+        self.last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        set_validators(response, self.etag, self.last_modified)
+        return response
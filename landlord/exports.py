@@ -0,0 +1,73 @@
+import csv
+
+from .models import ElectricityBill, Payment
+
+PAYMENT_COLUMNS = [
+    ('id', 'id'),
+    ('date', 'date'),
+    ('property', 'room__property__name'),
+    ('room', 'room__room_number'),
+    ('tenant', 'tenant__username'),
+    ('tenant_email', 'tenant__email'),
+    ('payment_type', 'payment_type'),
+    ('amount', 'amount'),
+    ('status', 'status'),
+]
+
+BILL_COLUMNS = [
+    ('id', 'id'),
+    ('month', 'month'),
+    ('property', 'room__property__name'),
+    ('room', 'room__room_number'),
+    ('tenant', 'room__tenant__username'),
+    ('amount', 'amount'),
+    ('is_paid', 'is_paid'),
+    ('created_at', 'created_at'),
+]
+
+EXPORTS = {
+    'payments': (Payment, PAYMENT_COLUMNS),
+    'electricity': (ElectricityBill, BILL_COLUMNS),
+}
+
+
+def export_queryset(kind, landlord=None):
+    model, _ = EXPORTS[kind]
+    queryset = model.objects.all()
+    if landlord is not None:
+        queryset = queryset.filter(room__property__landlord=landlord)
+    return queryset
+
+
+def export_rows(queryset, columns, chunk_size=2000):
+    """
+    Yield the header and then one tuple per row, ``chunk_size`` rows per query.
+
+    Chunks are fetched by primary key (``id > last_id``) rather than through
+    one long cursor: MySQL drivers buffer a whole result set client side, so
+    keyset chunks are what keeps memory flat there, and every chunk is an
+    index range scan no matter how deep the export is.
+    """
+    yield [header for header, _ in columns]
+    lookups = [lookup for _, lookup in columns]
+    queryset = queryset.order_by('id').values_list(*lookups)
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,92 @@
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+def _resolve_field(model, lookup):
+    field = None
+    for part in lookup.split('__'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if field.is_relation:
+            model = field.related_model
+    return field
+
+
+def date_range_filters(model, field_name, date_from=None, date_to=None):
+    """
+    Lookups for an inclusive day range on a date or datetime field.
+
+    Datetimes are compared against day boundaries instead of ``__date`` so the
+    column can still be used by an index.
+    """
+    filters = {}
+    is_datetime = isinstance(model._meta.get_field(field_name), models.DateTimeField)
+    if date_from is not None:
+        if is_datetime:
+            date_from = timezone.make_aware(datetime.combine(date_from, time.min))
+        filters[f'{field_name}__gte'] = date_from
+    if date_to is not None:
+        if is_datetime:
+            filters[f'{field_name}__lt'] = timezone.make_aware(
+                datetime.combine(date_to + timedelta(days=1), time.min))
+        else:
+            filters[f'{field_name}__lte'] = date_to
+    return filters
+
+
+class QueryParamFilterBackend(BaseFilterBackend):
+    """
+    Filters a list view by plain query parameters.
+
+    Views declare ``filter_fields`` as ``{param: orm_lookup}`` and optionally
+    ``date_filter_field`` to accept ``date_from`` / ``date_to`` (inclusive,
+    YYYY-MM-DD). Values are validated against the model field and applied as
+    queryset filters, so the database does the filtering.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        errors = {}
+        filters = {}
+
+        for param, lookup in getattr(view, 'filter_fields', {}).items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            field = _resolve_field(queryset.model, lookup)
+            try:
+                value = field.to_python(value)
+            except DjangoValidationError:
+                errors[param] = [f'Invalid value "{value}".']
+                continue
+            if field.choices and value not in dict(field.flatchoices):
+                errors[param] = [f'"{value}" is not a valid choice.']
+                continue
+            filters[lookup] = value
+
+        date_field = getattr(view, 'date_filter_field', None)
+        if date_field:
+            bounds = {}
+            for param in ('date_from', 'date_to'):
+                value = request.query_params.get(param)
+                if value in (None, ''):
+                    continue
+                try:
+                    bounds[param] = parse_date(value)
+                except ValueError:
+                    bounds[param] = None
+                if bounds[param] is None:
+                    errors[param] = ['Use the YYYY-MM-DD format.']
+            if not errors:
+                filters.update(date_range_filters(queryset.model, date_field, **bounds))
+
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(**filters)
@@ -0,0 +1,77 @@
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+MAX_DIMENSION = 1600
+THUMBNAIL_SIZE = (320, 320)
+JPEG_QUALITY = 80
+THUMBNAIL_QUALITY = 70
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(64 * 1024), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _to_jpeg(image, size, quality):
+    image = image.copy()
+    image.thumbnail(size, Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return ContentFile(buffer.getvalue())
+
+
+def _save_once(storage, name, render):
+    # Content-addressed names: an identical upload maps to a file that is already there
+    if not storage.exists(name):
+        name = storage.save(name, render())
+    return name
+
+
+def process_screenshot(file, storage, digest=None):
+    """
+    Store a downscaled JPEG and a review thumbnail of an uploaded screenshot.
+
+    Files are named after the SHA-256 of the original upload, so resubmitting
+    the same screenshot reuses the stored files without decoding it again.
+    Returns the values for Payment.screenshot, screenshot_thumbnail and
+    screenshot_hash; raises InvalidImage if the upload can't be decoded.
+    """
+    digest = digest or content_hash(file)
+    main_name = f'payment_screenshots/{digest}.jpg'
+    thumb_name = f'payment_screenshots/thumbs/{digest}.jpg'
+
+    image = None
+
+    def load():
+        nonlocal image
+        if image is None:
+            file.seek(0)
+            try:
+                with Image.open(file) as source:
+                    source = ImageOps.exif_transpose(source)
+                    image = source.convert('RGB')
+            except (OSError, Image.DecompressionBombError) as exc:
+                # Truncated or oversized: ImageField's verify() doesn't decode the pixels
+                raise InvalidImage(str(exc)) from exc
+        return image
+
+    main_name = _save_once(storage, main_name,
+                           lambda: _to_jpeg(load(), (MAX_DIMENSION, MAX_DIMENSION), JPEG_QUALITY))
+    thumb_name = _save_once(storage, thumb_name,
+                            lambda: _to_jpeg(load(), THUMBNAIL_SIZE, THUMBNAIL_QUALITY))
+    return {
+        'screenshot': main_name,
+        'screenshot_thumbnail': thumb_name,
+        'screenshot_hash': digest,
+    }
@@ -0,0 +1,75 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Payment, RentDue, Room
+from .rollups import next_month
+
+
+def _month_bounds(month):
+    return (
+        timezone.make_aware(datetime.combine(month, time.min)),
+        timezone.make_aware(datetime.combine(next_month(month), time.min)),
+    )
+
+
+def reconcile_rent_dues(dues):
+    """
+    Recompute amount_paid and status of the given RentDue queryset.
+
+    Approved rent payments for the room dated within the due month count
+    towards it. Two set-based UPDATEs per month, whatever the number of rows.
+    """
+    money = DecimalField(max_digits=10, decimal_places=2)
+    updated = 0
+    for month in dues.order_by().values_list('month', flat=True).distinct():
+        start, end = _month_bounds(month)
+        paid = Payment.objects.filter(
+            room=OuterRef('room'),
+            payment_type='rent',
+            status='approved',
+            date__gte=start,
+            date__lt=end,
+        ).order_by().values('room').annotate(total=Sum('amount')).values('total')
+
+        month_dues = dues.filter(month=month)
+        month_dues.update(amount_paid=Coalesce(
+            Subquery(paid, output_field=money), Value(Decimal('0')), output_field=money))
+        updated += month_dues.update(status=Case(
+            When(amount_paid__gte=F('amount_due'), then=Value('paid')),
+            When(amount_paid__gt=0, then=Value('partial')),
+            default=Value('unpaid'),
+        ), updated_at=timezone.now())
+    return updated
+
+
+def generate_rent_dues(month, landlord=None):
+    """
+    Create the month's RentDue for every occupied room and reconcile the month.
+
+    Existing dues are kept, so the command can run repeatedly. Returns
+    (created, reconciled).
+    """
+    month = month.replace(day=1)
+    rooms = Room.objects.filter(tenant__isnull=False)
+    dues = RentDue.objects.filter(month=month)
+    if landlord is not None:
+        rooms = rooms.filter(property__landlord=landlord)
+        dues = dues.filter(landlord=landlord)
+
+    with transaction.atomic():
+        existing = set(dues.values_list('room_id', flat=True))
+        new_dues = [
+            RentDue(room_id=room_id, tenant_id=tenant_id, landlord_id=landlord_id,
+                    month=month, amount_due=rent)
+            for room_id, tenant_id, landlord_id, rent in rooms.values_list(
+                'id', 'tenant_id', 'property__landlord_id', 'rent')
+            if room_id not in existing
+        ]
+        RentDue.objects.bulk_create(new_dues, batch_size=500, ignore_conflicts=True)
+        reconciled = reconcile_rent_dues(dues)
+    return len(new_dues), reconciled
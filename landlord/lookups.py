@@ -0,0 +1,198 @@
+"""
+Read-through cache for the tenant -> room -> property -> landlord lookups.
+
+Entries live in the Django cache named by ``LOOKUP_CACHE_ALIAS`` (local memory
+unless CACHES says otherwise; the file and Redis backends work unchanged) for
+``LOOKUP_CACHE_TTL`` seconds. Room, Property and User signals evict them;
+code that writes those models with update()/bulk_update() must call the
+``invalidate_*`` helpers itself. Loaders always read from the primary.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from apartment.replicas import use_primary
+
+_MISSING = object()
+
+
+class LookupCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'LOOKUP_CACHE_ALIAS', 'default')]
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'LOOKUP_CACHE_TTL', 300)
+
+    def get_or_load(self, key, loader):
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        # Never cache what a lagging replica returned
+        with use_primary():
+            value = loader()
+        self.cache.set(key, value, self.ttl)
+        return value
+
+    async def aget_or_load(self, key, loader):
+        """get_or_load() for async views; ``loader`` is a coroutine function."""
+        value = await self.cache.aget(key, _MISSING)
+        if value is not _MISSING:
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        with use_primary():
+            value = await loader()
+        await self.cache.aset(key, value, self.ttl)
+        return value
+
+    def delete(self, keys):
+        keys = list(keys)
+        if not keys:
+            return
+        self.cache.delete_many(keys)
+        # A request that read the old rows before our commit may have cached them again
+        transaction.on_commit(lambda: self.cache.delete_many(keys))
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+lookup_cache = LookupCache()
+
+
+def tenant_room_key(user_id):
+    return f'lookup:tenant-room:{user_id}'
+
+
+def room_detail_key(room_id):
+    return f'lookup:room-detail:{room_id}'
+
+
+def landlord_contact_key(landlord_id):
+    return f'lookup:landlord-contact:{landlord_id}'
+
+
+def _tenant_room_query(user):
+    from .models import Room
+
+    # Same room as user.rooms.first()
+    return Room.objects.filter(tenant_id=user.pk).order_by('pk').values_list(
+        'id', 'property_id', 'property__landlord_id')
+
+
+def _tenant_room(row):
+    if row is None:
+        return None
+    return {'room': row[0], 'property': row[1], 'landlord': row[2]}
+
+
+def get_tenant_room(user):
+    """Ids of the tenant's room, its property and landlord, or None without a room."""
+    def load():
+        return _tenant_room(_tenant_room_query(user).first())
+    return lookup_cache.get_or_load(tenant_room_key(user.pk), load)
+
+
+async def aget_tenant_room(user):
+    async def load():
+        return _tenant_room(await _tenant_room_query(user).afirst())
+    return await lookup_cache.aget_or_load(tenant_room_key(user.pk), load)
+
+
+def _room_detail_query(room_id):
+    from .models import Room
+
+    return Room.objects.select_related('property__landlord').filter(pk=room_id)
+
+
+def _room_detail(room):
+    from .serializers import RoomDetailTenantSerializer
+
+    return dict(RoomDetailTenantSerializer(room).data)
+
+
+def get_room_detail(room_id):
+    """RoomDetailTenantSerializer data for a room."""
+    def load():
+        return _room_detail(_room_detail_query(room_id).get())
+    return lookup_cache.get_or_load(room_detail_key(room_id), load)
+
+
+async def aget_room_detail(room_id):
+    async def load():
+        return _room_detail(await _room_detail_query(room_id).aget())
+    return await lookup_cache.aget_or_load(room_detail_key(room_id), load)
+
+
+def _landlord_contact_query(landlord_id):
+    from superadmin.models import User
+
+    return User.objects.filter(pk=landlord_id).values_list('username', 'email')
+
+
+def _landlord_contact(row):
+    return {'name': row[0], 'email': row[1]}
+
+
+def get_landlord_contact(landlord_id):
+    def load():
+        return _landlord_contact(_landlord_contact_query(landlord_id).get())
+    return lookup_cache.get_or_load(landlord_contact_key(landlord_id), load)
+
+
+async def aget_landlord_contact(landlord_id):
+    async def load():
+        return _landlord_contact(await _landlord_contact_query(landlord_id).aget())
+    return await lookup_cache.aget_or_load(landlord_contact_key(landlord_id), load)
+
+
+def invalidate_rooms(rooms):
+    """Evict rooms and their current and previous tenants (from Room.from_db)."""
+    keys = set()
+    for room in rooms:
+        keys.add(room_detail_key(room.pk))
+        for tenant_id in {room.tenant_id, getattr(room, '_loaded_tenant_id', None)} - {None}:
+            keys.add(tenant_room_key(tenant_id))
+    lookup_cache.delete(keys)
+
+
+def invalidate_property(property_id):
+    from .models import Room
+
+    keys = set()
+    for room_id, tenant_id in Room.objects.filter(property_id=property_id).values_list('id', 'tenant_id'):
+        keys.add(room_detail_key(room_id))
+        if tenant_id is not None:
+            keys.add(tenant_room_key(tenant_id))
+    lookup_cache.delete(keys)
+
+
+def invalidate_user(user_id):
+    """Evict the user's own lookups and, for a landlord, their rooms' detail (it shows the landlord)."""
+    from .models import Room
+
+    keys = {tenant_room_key(user_id), landlord_contact_key(user_id)}
+    keys.update(room_detail_key(room_id) for room_id in Room.objects.filter(
+        property__landlord_id=user_id).values_list('id', flat=True))
+    lookup_cache.delete(keys)
@@ -0,0 +1,87 @@
+import json
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+from superadmin.models import User
+from landlord.benchmarks import Runner, build_context, compare, url_names
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks every landlord / superadmin URL: p50/p95 latency, queries and peak memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', nargs='+', metavar='URL_NAME', help='Only these URL names')
+        parser.add_argument('--landlord', help='Username to run landlord views as (default: the one with most rooms)')
+        parser.add_argument('--baseline', default=str(Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'),
+                            help='Baseline JSON to compare against / write to')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 / memory growth (0.2 = 20%%)')
+        parser.add_argument('--check', action='store_true', help='Exit with an error on regressions')
+
+    def handle(self, *args, **options):
+        landlord = None
+        if options['landlord']:
+            landlord = User.objects.filter(username=options['landlord']).first()
+            if landlord is None:
+                raise CommandError(f'User "{options["landlord"]}" not found.')
+        try:
+            ctx = build_context(landlord)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        names = options['only'] or url_names()
+        unknown = set(names) - set(url_names())
+        if unknown:
+            raise CommandError(f'Unknown URL names: {", ".join(sorted(unknown))}')
+
+        # testserver host, locmem email backend: nothing leaves the process
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            own_environment = False
+        # Expected 4xx (e.g. add_user as a landlord) would log a warning per request
+        request_logger = logging.getLogger('django.request')
+        request_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            runner = Runner(ctx, iterations=options['iterations'], warmup=options['warmup'])
+            self.stdout.write(f'Running as {ctx.landlord.username} / {ctx.tenant.username}, '
+                              f'{options["iterations"]} iterations')
+            self.stdout.write(f'{"url name":<28} {"p50 ms":>9} {"p95 ms":>9} {"queries":>8} {"peak KB":>9}  status')
+            results = {}
+            for name in names:
+                results[name] = result = runner.run(name)
+                if 'skipped' in result:
+                    self.stdout.write(f'{name:<28} skipped: {result["skipped"]}')
+                else:
+                    self.stdout.write(
+                        f'{name:<28} {result["p50_ms"]:>9} {result["p95_ms"]:>9} {result["queries"]:>8} '
+                        f'{result["peak_kb"]:>9}  {",".join(map(str, result["status"]))}')
+        finally:
+            request_logger.setLevel(request_level)
+            if own_environment:
+                teardown_test_environment()
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(f'No baseline at {baseline_path}; run with --save-baseline to create one.')
+            return
+
+        regressions = compare(results, json.loads(baseline_path.read_text()), options['tolerance'])
+        for line in regressions:
+            self.stdout.write(self.style.WARNING(line))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
+        elif options['check']:
+            raise CommandError(f'{len(regressions)} regression(s) against {baseline_path}')
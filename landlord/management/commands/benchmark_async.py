@@ -0,0 +1,53 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from superadmin.models import User
+from landlord.benchmarks import ASYNC_PAIRS, ConcurrencyRunner, build_context
+
+
+class Command(BaseCommand):
+    help = 'Compares sync views with their async variants: requests/s and latency under concurrent clients (ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help='Concurrent connections')
+        parser.add_argument('--requests', type=int, default=5, help='Requests per connection')
+        parser.add_argument('--client-delay', type=float, default=0.0,
+                            help='Milliseconds per message exchanged with a client, to simulate slow networks')
+        parser.add_argument('--only', nargs='+', metavar='URL_NAME', help='Only these (sync) URL names')
+        parser.add_argument('--landlord', help='Username to run landlord views as (default: the one with most rooms)')
+
+    def handle(self, *args, **options):
+        landlord = None
+        if options['landlord']:
+            landlord = User.objects.filter(username=options['landlord']).first()
+            if landlord is None:
+                raise CommandError(f'User "{options["landlord"]}" not found.')
+        try:
+            ctx = build_context(landlord)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        names = options['only'] or list(ASYNC_PAIRS)
+        unknown = set(names) - set(ASYNC_PAIRS)
+        if unknown:
+            raise CommandError(f'No async variant for: {", ".join(sorted(unknown))}')
+
+        request_logger = logging.getLogger('django.request')
+        request_level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            runner = ConcurrencyRunner(ctx, clients=options['clients'], requests=options['requests'],
+                                       client_delay=options['client_delay'] / 1000)
+            self.stdout.write(f'Running as {ctx.landlord.username} / {ctx.tenant.username}: '
+                              f'{options["clients"]} clients x {options["requests"]} requests')
+            self.stdout.write(f'{"url name":<28} {"mode":<6} {"req/s":>8} {"p50 ms":>9} {"p95 ms":>9}  status')
+            for name in names:
+                results = {'sync': runner.run(name), 'async': runner.run(ASYNC_PAIRS[name])}
+                for mode, result in results.items():
+                    self.stdout.write(
+                        f'{name:<28} {mode:<6} {result["requests_per_s"]:>8} {result["p50_ms"]:>9} '
+                        f'{result["p95_ms"]:>9}  {",".join(map(str, result["status"]))}')
+                speedup = results['async']['requests_per_s'] / results['sync']['requests_per_s']
+                self.stdout.write(f'{name:<28} async/sync throughput: {speedup:.2f}x')
+        finally:
+            request_logger.setLevel(request_level)
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.mixins import ListModelMixin
+from superadmin.models import User
+from landlord.permissions import IsTenant
+from landlord.urls import urlpatterns
+
+
+class Command(BaseCommand):
+    help = 'Prints the EXPLAIN plan of the first page query of every landlord list view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--landlord', help='Username to run landlord views as')
+        parser.add_argument('--tenant', help='Username to run tenant views as')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Pass ANALYZE to EXPLAIN (MySQL 8 / PostgreSQL only)')
+
+    def get_user(self, username, role_name):
+        users = User.objects.select_related('role')
+        if username:
+            user = users.filter(username=username).first()
+        else:
+            user = users.filter(role__name=role_name).order_by('id').first()
+        if user is None:
+            raise CommandError(f'No {role_name} user found, pass --{"landlord" if role_name == "admin" else "tenant"}.')
+        return user
+
+    def handle(self, *args, **options):
+        landlord = self.get_user(options['landlord'], 'admin')
+        tenant = self.get_user(options['tenant'], 'tenant')
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        factory = RequestFactory()
+
+        for pattern in urlpatterns:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is None or not issubclass(view_class, ListModelMixin):
+                continue
+
+            view = view_class()
+            view.args, view.kwargs, view.format_kwarg = (), {}, None
+            view.request = view.initialize_request(factory.get('/'))
+            view.request.user = tenant if IsTenant in view_class.permission_classes else landlord
+
+            # Same shape as the real first page: filters, cursor ordering, LIMIT
+            queryset = view.filter_queryset(view.get_queryset())
+            paginator = view.paginator
+            if paginator is not None:
+                ordering = paginator.get_ordering(view.request, queryset, view)
+                queryset = queryset.order_by(*ordering)[:paginator.page_size + 1]
+
+            self.stdout.write(self.style.SUCCESS(f'== {pattern.name} ({view_class.__name__})'))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
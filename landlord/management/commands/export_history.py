@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from superadmin.models import User
+from landlord.exports import EXPORTS, export_queryset, export_rows, stream_csv
+from landlord.filters import date_range_filters
+
+
+class Command(BaseCommand):
+    help = 'Streams payment or electricity bill history to CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--landlord', help='Only export this landlord\'s properties (username)')
+        parser.add_argument('--property', type=int)
+        parser.add_argument('--status', help='Payment status, or paid/unpaid for electricity bills')
+        parser.add_argument('--date-from', help='YYYY-MM-DD, inclusive')
+        parser.add_argument('--date-to', help='YYYY-MM-DD, inclusive')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        landlord = None
+        if options['landlord']:
+            try:
+                landlord = User.objects.get(username=options['landlord'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["landlord"]}" not found.')
+
+        queryset = export_queryset(kind, landlord)
+        if options['property']:
+            queryset = queryset.filter(room__property_id=options['property'])
+        if options['status']:
+            if kind == 'payments':
+                queryset = queryset.filter(status=options['status'])
+            elif options['status'] in ('paid', 'unpaid'):
+                queryset = queryset.filter(is_paid=options['status'] == 'paid')
+            else:
+                raise CommandError('Electricity bill status must be "paid" or "unpaid".')
+
+        bounds = {}
+        for option in ('date_from', 'date_to'):
+            if options[option]:
+                bounds[option] = parse_date(options[option])
+                if bounds[option] is None:
+                    raise CommandError(f'--{option.replace("_", "-")} must be YYYY-MM-DD.')
+        date_field = 'date' if kind == 'payments' else 'month'
+        queryset = queryset.filter(**date_range_filters(queryset.model, date_field, **bounds))
+
+        _, columns = EXPORTS[kind]
+        lines = stream_csv(export_rows(queryset, columns, options['chunk_size']))
+        count = -1  # header
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                for line in lines:
+                    output.write(line)
+                    count += 1
+            self.stderr.write(self.style.SUCCESS(f'Exported {count} rows to {options["output"]}.'))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from superadmin.models import User
+from landlord.ledger import generate_rent_dues
+
+
+class Command(BaseCommand):
+    help = 'Creates the monthly rent dues for occupied rooms and reconciles them with approved payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='YYYY-MM (default: current month)')
+        parser.add_argument('--landlord', help='Only generate for this username')
+
+    def handle(self, *args, **options):
+        if options['month']:
+            month = parse_date(f"{options['month']}-01")
+            if month is None:
+                raise CommandError('--month must be YYYY-MM.')
+        else:
+            month = timezone.localdate().replace(day=1)
+
+        landlord = None
+        if options['landlord']:
+            try:
+                landlord = User.objects.get(username=options['landlord'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["landlord"]}" not found.')
+
+        created, reconciled = generate_rent_dues(month, landlord)
+        self.stdout.write(self.style.SUCCESS(
+            f'{month:%Y-%m}: {created} dues created, {reconciled} reconciled.'))
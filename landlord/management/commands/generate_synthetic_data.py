@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from landlord.synthetic import PASSWORD, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Fills the database with a synthetic dataset for load tests and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench', help='Username prefix of the generated users')
+        parser.add_argument('--landlords', type=int, default=2)
+        parser.add_argument('--properties', type=int, default=3, help='Properties per landlord')
+        parser.add_argument('--rooms', type=int, default=20, help='Rooms per property')
+        parser.add_argument('--months', type=int, default=6, help='Months of payment / bill history')
+        parser.add_argument('--chat', type=int, default=10, help='Chat messages per tenant')
+        parser.add_argument('--occupancy', type=float, default=0.9, help='Share of rooms with a tenant')
+        parser.add_argument('--complaints', type=int, default=2, help='Complaints per property')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not 0 <= options['occupancy'] <= 1:
+            raise CommandError('--occupancy must be between 0 and 1.')
+        if options['months'] < 1:
+            raise CommandError('--months must be at least 1.')
+
+        start = time.monotonic()
+        try:
+            counts = generate_dataset(
+                prefix=options['prefix'],
+                landlords=options['landlords'],
+                properties=options['properties'],
+                rooms=options['rooms'],
+                months=options['months'],
+                chat=options['chat'],
+                occupancy=options['occupancy'],
+                complaints=options['complaints'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                log=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.monotonic() - start:.1f}s. Users log in with password "{PASSWORD}".'))
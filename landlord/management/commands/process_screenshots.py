@@ -0,0 +1,83 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from landlord.images import process_screenshot
+from landlord.models import Payment
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:  # spawn start method: the child starts without Django
+        django.setup()
+
+
+def _process(payment_id, name):
+    # Runs in a worker process; touches storage only, never the database
+    storage = Payment._meta.get_field('screenshot').storage
+    try:
+        with storage.open(name, 'rb') as file:
+            return payment_id, name, process_screenshot(file, storage), None
+    except Exception as exc:
+        return payment_id, name, None, repr(exc)
+
+
+class Command(BaseCommand):
+    help = 'Downscales, thumbnails and deduplicates payment screenshots that predate the upload pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Worker processes (1 processes in this process)')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--delete-originals', action='store_true',
+                            help='Delete the original file once its processed copy is stored')
+
+    def handle(self, *args, **options):
+        pending = Payment.objects.filter(screenshot_hash='').exclude(
+            screenshot__isnull=True).exclude(screenshot='').order_by('id')
+        storage = Payment._meta.get_field('screenshot').storage
+        processed = failed = 0
+
+        executor = None
+        if options['workers'] > 1:
+            # Forked workers must not inherit open database sockets
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker)
+
+        try:
+            last_id = 0
+            while True:
+                batch = list(pending.filter(id__gt=last_id).values_list(
+                    'id', 'screenshot')[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+
+                ids, names = zip(*batch)
+                if executor is not None:
+                    results = executor.map(_process, ids, names)
+                else:
+                    results = map(_process, ids, names)
+
+                updates, replaced = [], []
+                for payment_id, old_name, fields, error in results:
+                    if error:
+                        # The row keeps an empty hash and is retried on the next run
+                        failed += 1
+                        self.stderr.write(f'Payment {payment_id}: {error}')
+                        continue
+                    updates.append(Payment(id=payment_id, **fields))
+                    if old_name != fields['screenshot']:
+                        replaced.append(old_name)
+                Payment.objects.bulk_update(
+                    updates, ['screenshot', 'screenshot_thumbnail', 'screenshot_hash'])
+                processed += len(updates)
+                if options['delete_originals']:
+                    for name in replaced:
+                        storage.delete(name)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} screenshots, {failed} failed.'))
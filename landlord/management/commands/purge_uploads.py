@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from landlord.uploads import purge_abandoned_uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes chunked uploads abandoned before completion, with their partial files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=settings.CHUNKED_UPLOAD_EXPIRY_HOURS,
+                            help='Remove sessions and partial files idle for longer than this')
+
+    def handle(self, *args, **options):
+        sessions, files = purge_abandoned_uploads(timezone.now() - timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {sessions} abandoned upload sessions and {files} orphaned partial files.'))
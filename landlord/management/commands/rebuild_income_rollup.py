@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from superadmin.models import User
+from landlord.rollups import rebuild_income_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the monthly income rollup from approved payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--landlord', help='Only rebuild rows for this username')
+
+    def handle(self, *args, **options):
+        landlord = None
+        if options['landlord']:
+            try:
+                landlord = User.objects.get(username=options['landlord'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["landlord"]}" not found.')
+
+        count = rebuild_income_rollup(landlord)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} monthly income rows.'))
@@ -0,0 +1,65 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from superadmin.models import User
+from landlord.billing import BillRunError, run_electricity_bills
+from landlord.models import Room
+from landlord.parsers import read_csv_rows
+
+
+class Command(BaseCommand):
+    help = 'Generates the monthly electricity bills for every landlord (safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='YYYY-MM (default: current month)')
+        parser.add_argument('--tariff', type=Decimal, help='Price per metered unit')
+        parser.add_argument('--fixed-charge', type=Decimal, default=Decimal('0'),
+                            help='Added to every bill; rooms without a reading are billed only this')
+        parser.add_argument('--readings', help='CSV with room and units or amount columns')
+        parser.add_argument('--landlord', help='Only run for this username')
+
+    def load_readings(self, path):
+        with open(path, 'rb') as csv_file:
+            rows = read_csv_rows(csv_file)
+        readings = {}
+        try:
+            for row in rows:
+                kind = 'units' if row.get('units') else 'amount'
+                readings[int(row['room'])] = {kind: Decimal(row[kind])}
+        except (KeyError, ValueError, InvalidOperation) as exc:
+            raise CommandError(f'Bad readings row {row}: {exc!r}')
+        return readings
+
+    def handle(self, *args, **options):
+        if options['month']:
+            month = parse_date(f"{options['month']}-01")
+            if month is None:
+                raise CommandError('--month must be YYYY-MM.')
+        else:
+            month = timezone.localdate().replace(day=1)
+
+        readings = self.load_readings(options['readings']) if options['readings'] else {}
+        owners = dict(Room.objects.filter(id__in=readings).values_list('id', 'property__landlord_id'))
+        unknown = sorted(set(readings) - set(owners))
+        if unknown:
+            raise CommandError(f'Unknown rooms in readings: {unknown}')
+
+        landlords = User.objects.filter(role__name='admin').order_by('id')
+        if options['landlord']:
+            landlords = landlords.filter(username=options['landlord'])
+
+        for landlord in landlords:
+            own_readings = {room: r for room, r in readings.items() if owners[room] == landlord.id}
+            try:
+                summary = run_electricity_bills(
+                    landlord, month, readings=own_readings,
+                    tariff=options['tariff'], fixed_charge=options['fixed_charge'])
+            except BillRunError as exc:
+                self.stderr.write(self.style.ERROR(f'{landlord.username}: {exc}'))
+                continue
+            self.stdout.write(
+                f"{landlord.username}: {summary['created']} created, "
+                f"{summary['already_billed']} already billed, "
+                f"{len(summary['missing_readings'])} without reading, total {summary['total_amount']}")
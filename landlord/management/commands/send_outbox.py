@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from landlord.outbox import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued emails from the outbox in batches over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--digest', action='store_true',
+                            help='Combine queued emails for the same recipient into one')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the outbox instead of exiting when it is empty')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep between polls when the outbox is empty')
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            stats = deliver_outbox(
+                batch_size=options['batch_size'],
+                digest=options['digest'],
+                max_attempts=options['max_attempts'],
+            )
+            for key, value in stats.items():
+                totals[key] += value
+            if not any(stats.values()):
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']}, retrying {totals['retried']}, failed {totals['failed']}."))
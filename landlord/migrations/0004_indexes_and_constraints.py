@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landlord', '0003_payment_payment_type_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['sender', 'timestamp'], name='chat_sender_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['receiver', 'timestamp'], name='chat_receiver_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='communitymessage',
+            index=models.Index(fields=['-created_at'], name='community_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['room', 'status', 'date', 'amount'], name='payment_room_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['tenant', '-date'], name='payment_tenant_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='electricitybill',
+            constraint=models.UniqueConstraint(fields=('room', 'month'), name='unique_bill_per_room_month'),
+        ),
+        migrations.AddConstraint(
+            model_name='room',
+            constraint=models.UniqueConstraint(fields=('property', 'room_number'), name='unique_room_number_per_property'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_monthly_income(apps, schema_editor):
+    Payment = apps.get_model('landlord', 'Payment')
+    MonthlyIncome = apps.get_model('landlord', 'MonthlyIncome')
+    rows = Payment.objects.filter(status='approved').annotate(
+        month=TruncMonth('date', output_field=DateField())
+    ).values(
+        'room__property_id', 'room__property__landlord_id', 'month', 'payment_type'
+    ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+    MonthlyIncome.objects.bulk_create(
+        [
+            MonthlyIncome(
+                landlord_id=row['room__property__landlord_id'],
+                property_id=row['room__property_id'],
+                month=row['month'],
+                payment_type=row['payment_type'],
+                total=row['total'],
+                payment_count=row['count'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landlord', '0004_indexes_and_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyIncome',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('payment_type', models.CharField(choices=[('rent', 'Rent'), ('electricity', 'Electricity'), ('maintenance', 'Maintenance')], max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payment_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('landlord', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_income', to=settings.AUTH_USER_MODEL)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_income', to='landlord.property')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['landlord', 'month'], name='income_landlord_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('property', 'month', 'payment_type'), name='unique_income_bucket')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_income, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_complaint_property(apps, schema_editor):
+    Complaint = apps.get_model('landlord', 'Complaint')
+    Room = apps.get_model('landlord', 'Room')
+    Complaint.objects.update(property=Subquery(
+        Room.objects.filter(pk=OuterRef('room_id')).values('property_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landlord', '0011_reminderjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='property',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='complaints', to='landlord.property'),
+        ),
+        migrations.RunPython(populate_complaint_property, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['property', 'status', '-created_at'], name='complaint_queue_idx'),
+        ),
+    ]
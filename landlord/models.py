@@ -1,7 +1,10 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 from superadmin.models import User
 
 
@@ -33,6 +36,7 @@ class Property(models.Model):
     address = models.TextField()
     description = models.TextField(blank=True)
     room_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     landlord = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -53,10 +57,44 @@ class Room(models.Model):
     rent = models.DecimalField(max_digits=10, decimal_places=2)
     tenant = models.ForeignKey(User, on_delete=models.SET_NULL,
                                null=True, blank=True, related_name='rooms')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['property', 'room_number'], name='unique_room_number_per_property'),
+        ]
 
     def __str__(self):
         return f"{self.property.name} - Room {self.room_number}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The previous tenant's cached room lookup has to go when the room changes hands
+        instance._loaded_tenant_id = instance.__dict__.get('tenant_id')
+        return instance
+
+
+@receiver([post_save, post_delete], sender=Room)
+def evict_room_lookups(sender, instance, **kwargs):
+    from .lookups import invalidate_rooms
+    invalidate_rooms([instance])
+
+
+@receiver([post_save, post_delete], sender=Property)
+def evict_property_lookups(sender, instance, **kwargs):
+    from .lookups import invalidate_property
+    invalidate_property(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def evict_user_lookups(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return  # Logins don't change anything the lookups hold
+    from .lookups import invalidate_user
+    invalidate_user(instance.pk)
+
 
 class RoomType(models.Model):
     name = models.CharField(max_length=50)  # e.g., "1BHK", "2BHK", "Studio"
@@ -82,6 +120,22 @@ class Complaint(models.Model):
     ]
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Copied from room.property so the landlord queues can use one index
+    property = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='complaints', null=True, editable=False)
+
+    OPEN_STATUSES = ['pending', 'in_progress']
+
+    class Meta:
+        indexes = [
+            # "open complaints for property X, newest first"
+            models.Index(fields=['property', 'status', '-created_at'], name='complaint_queue_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.property_id is None:
+            self.property_id = self.room.property_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title} - {self.tenant.username}"
@@ -100,6 +154,38 @@ class Document(models.Model):
         return self.name
 
 
+class UploadSession(models.Model):
+    """A resumable, chunked upload of a Document or a LandlordProfile proof."""
+    TARGET_CHOICES = [
+        ('document', 'Document'),
+        ('proof', 'Landlord proof'),
+    ]
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('receiving', 'Receiving a chunk'),
+        ('complete', 'Complete'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='upload_sessions')
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    room = models.ForeignKey(
+        Room, on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions')
+    document_name = models.CharField(max_length=100, blank=True)
+    document = models.ForeignKey(
+        Document, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
 class Payment(models.Model):
     tenant = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='payments')
@@ -109,6 +195,10 @@ class Payment(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     screenshot = models.ImageField(
         upload_to='payment_screenshots/', blank=True, null=True)
+    # Filled by landlord.images.process_screenshot
+    screenshot_thumbnail = models.ImageField(
+        upload_to='payment_screenshots/thumbs/', blank=True, null=True)
+    screenshot_hash = models.CharField(max_length=64, blank=True, db_index=True)
 
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -126,27 +216,47 @@ class Payment(models.Model):
     payment_type = models.CharField(
         max_length=20, choices=PAYMENT_TYPE_CHOICES, default='rent')
 
+    class Meta:
+        indexes = [
+            # Landlord lists / analytics: rooms of the landlord -> status -> date,
+            # with amount so the income sums are served from the index alone.
+            models.Index(fields=['room', 'status', 'date', 'amount'],
+                         name='payment_room_status_date_idx'),
+            models.Index(fields=['tenant', '-date'], name='payment_tenant_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tenant.username} - {self.amount} - {self.payment_type} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the income rollup saw, so a save can fix the old bucket
+        instance._rollup_state = (
+            instance.__dict__.get('room_id'),
+            instance.__dict__.get('date'),
+            instance.__dict__.get('payment_type'),
+            instance.__dict__.get('status'),
+        )
+        return instance
+
 
 
 @receiver(post_save, sender=Payment)
 def notify_landlord_payment_uploaded(sender, instance, created, **kwargs):
     if created:
-        # Get the landlord of the property
-        landlord = instance.room.property.landlord
+        # One query for everything the message needs; the email itself is
+        # queued in the outbox and sent by the send_outbox worker.
+        property_name, room_number, landlord_email = Room.objects.filter(
+            pk=instance.room_id
+        ).values_list('property__name', 'room_number', 'property__landlord__email').get()
         tenant = instance.tenant
-        
-        # Send email notification
-        from django.core.mail import send_mail
-        send_mail(
-            f'New Payment Uploaded - {instance.room.property.name}',
-            f'Tenant {tenant.username} uploaded payment of ${instance.amount} for room {instance.room.room_number}',
-            'from@example.com',
-            [landlord.email],
-            fail_silently=True,
+
+        EmailOutbox.objects.create(
+            subject=f'New Payment Uploaded - {property_name}',
+            body=f'Tenant {tenant.username} uploaded payment of ${instance.amount} for room {room_number}',
+            from_email='from@example.com',
+            recipient=landlord_email,
         )
 
 
@@ -158,16 +268,141 @@ class ElectricityBill(models.Model):
     is_paid = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # Also serves the (room, month) lookups of the tenant bill list
+            models.UniqueConstraint(fields=['room', 'month'], name='unique_bill_per_room_month'),
+        ]
+
     def __str__(self):
         return f"Electricity Bill - {self.room.room_number} - {self.month.strftime('%B %Y')}"
 
 
+class RentDue(models.Model):
+    """Rent owed for one room and month, reconciled against approved rent payments."""
+    STATUS_CHOICES = [
+        ('unpaid', 'Unpaid'),
+        ('partial', 'Partially paid'),
+        ('paid', 'Paid'),
+    ]
+    landlord = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='rent_dues_owed')
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='rent_dues')
+    tenant = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='rent_dues')
+    month = models.DateField(help_text="First day of the month")
+    amount_due = models.DecimalField(max_digits=10, decimal_places=2)
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='unpaid')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'month'], name='unique_rent_due_per_room_month'),
+        ]
+        indexes = [
+            # "unpaid rooms of landlord X for month Y"
+            models.Index(fields=['landlord', 'month', 'status'], name='rentdue_landlord_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.room} - {self.month.strftime('%Y-%m')} - {self.status}"
+
+
+class ReminderJob(models.Model):
+    """A rent reminder fan-out; its progress is read from the queued outbox emails."""
+    landlord = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reminder_jobs')
+    month = models.DateField(help_text="First day of the month")
+    message = models.TextField(blank=True)
+    recipients = models.PositiveIntegerField(default=0)
+    chat_messages = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Rent reminders {self.month.strftime('%Y-%m')} ({self.recipients} tenants)"
+
+
+class EmailOutbox(models.Model):
+    """Emails waiting for the send_outbox worker."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    reminder_job = models.ForeignKey(
+        ReminderJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject} ({self.status})"
+
+
+class MonthlyIncome(models.Model):
+    """Approved payment totals per property, month and payment type."""
+    landlord = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_income')
+    property = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='monthly_income')
+    month = models.DateField(help_text="First day of the month")
+    payment_type = models.CharField(max_length=20, choices=Payment.PAYMENT_TYPE_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['property', 'month', 'payment_type'], name='unique_income_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['landlord', 'month'], name='income_landlord_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.property.name} - {self.month.strftime('%Y-%m')} - {self.payment_type}: {self.total}"
+
+
+@receiver(post_save, sender=Payment)
+def update_income_rollup(sender, instance, **kwargs):
+    from .rollups import sync_payment_rollup
+    sync_payment_rollup(instance)
+
+
+@receiver(post_delete, sender=Payment)
+def remove_from_income_rollup(sender, instance, **kwargs):
+    from .rollups import sync_payment_rollup
+    sync_payment_rollup(instance, deleted=True)
+
+
 class CommunityMessage(models.Model):
     sender = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sent_messages')
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='community_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -181,8 +416,43 @@ class ChatMessage(models.Model):
     message = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
+    reminder_job = models.ForeignKey(
+        ReminderJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='reminder_chats')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sender', 'timestamp'], name='chat_sender_ts_idx'),
+            models.Index(fields=['receiver', 'timestamp'], name='chat_receiver_ts_idx'),
+            # Conversation sync: (sender, receiver) pair scanned by id
+            models.Index(fields=['sender', 'receiver', 'id'], name='chat_pair_idx'),
+            models.Index(fields=['receiver', 'is_read', 'sender'], name='chat_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender} -> {self.receiver}: {self.message[:20]}"
 
 
+@receiver(post_save, sender=ChatMessage)
+def push_chat_message(sender, instance, created, **kwargs):
+    if created:
+        from django.db import transaction
+        from apartment.realtime import publish, user_channel
+        from .serializers import ChatMessageSerializer
+
+        data = ChatMessageSerializer(instance).data
+
+        def send():
+            for user_id in {instance.sender_id, instance.receiver_id}:
+                publish(user_channel(user_id), 'chat.message', data)
+        transaction.on_commit(send)
+
+
+@receiver(post_save, sender=CommunityMessage)
+def push_community_message(sender, instance, created, **kwargs):
+    if created:
+        from django.db import transaction
+        from apartment.realtime import COMMUNITY_CHANNEL, publish
+        from .serializers import CommunityMessageSerializer
+
+        data = CommunityMessageSerializer(instance).data
+        transaction.on_commit(lambda: publish(COMMUNITY_CHANNEL, 'community.message', data))
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+def enqueue_email(recipient, subject, body, from_email='from@example.com'):
+    return EmailOutbox.objects.create(
+        recipient=recipient, subject=subject, body=body, from_email=from_email)
+
+
+def retry_delay(attempts, base_seconds=60, max_seconds=6 * 60 * 60):
+    """Exponential backoff: 1, 2, 4, ... minutes, capped at six hours."""
+    return timedelta(seconds=min(base_seconds * 2 ** (attempts - 1), max_seconds))
+
+
+def _build_messages(rows, digest):
+    """Yield (EmailMessage, [outbox rows]) pairs, one digest per recipient if asked."""
+    if not digest:
+        for row in rows:
+            yield EmailMessage(row.subject, row.body, row.from_email or None, [row.recipient]), [row]
+        return
+
+    by_recipient = defaultdict(list)
+    for row in rows:
+        by_recipient[row.recipient].append(row)
+    for recipient, group in by_recipient.items():
+        if len(group) == 1:
+            row = group[0]
+            yield EmailMessage(row.subject, row.body, row.from_email or None, [recipient]), group
+            continue
+        body = '\n\n'.join(f'{row.subject}\n{row.body}' for row in group)
+        yield EmailMessage(
+            f'{len(group)} new notifications', body, group[0].from_email or None, [recipient]), group
+
+
+def deliver_outbox(batch_size=100, digest=False, max_attempts=5, connection=None, claim_seconds=300):
+    """
+    Send one batch of due outbox emails over a single SMTP connection.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED and marked
+    ``sending`` in a short transaction, so several workers can drain the same
+    outbox without holding locks while SMTP is slow. Each send's result is
+    then recorded in its own transaction. Rows still ``sending`` after
+    ``claim_seconds`` (their worker died) are picked up again. Failed sends are
+    rescheduled with exponential backoff and marked failed after
+    ``max_attempts``. Returns a dict of counts.
+    """
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not rows:
+            return stats
+        EmailOutbox.objects.filter(pk__in=[row.pk for row in rows]).update(
+            status='sending', next_attempt_at=now + timedelta(seconds=claim_seconds))
+
+    def record(group, exc=None):
+        finished_at = timezone.now()
+        for row in group:
+            row.attempts += 1
+            if exc is None:
+                row.status, row.sent_at = 'sent', finished_at
+                stats['sent'] += 1
+                continue
+            row.last_error = repr(exc)
+            if row.attempts >= max_attempts:
+                row.status = 'failed'
+                stats['failed'] += 1
+            else:
+                row.status, row.next_attempt_at = 'pending', finished_at + retry_delay(row.attempts)
+                stats['retried'] += 1
+        with transaction.atomic():
+            EmailOutbox.objects.bulk_update(
+                group, ['status', 'sent_at', 'attempts', 'last_error', 'next_attempt_at'])
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        record(rows, exc)
+        return stats
+    try:
+        for message, group in _build_messages(rows, digest):
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as exc:
+                record(group, exc)
+            else:
+                record(group)
+    finally:
+        connection.close()
+    return stats
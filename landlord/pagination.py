@@ -0,0 +1,29 @@
+from rest_framework.pagination import CursorPagination
+
+
+class BaseCursorPagination(CursorPagination):
+    # Keyset pagination: each page is a WHERE on the ordering key, so deep
+    # pages cost the same as the first one.
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class IdCursorPagination(BaseCursorPagination):
+    ordering = 'id'
+
+
+class PaymentCursorPagination(BaseCursorPagination):
+    ordering = ('-date', '-id')
+
+
+class ElectricityBillCursorPagination(BaseCursorPagination):
+    ordering = ('-month', '-id')
+
+
+class CreatedAtCursorPagination(BaseCursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class TimestampCursorPagination(BaseCursorPagination):
+    ordering = ('timestamp', 'id')
@@ -0,0 +1,26 @@
+import codecs
+import csv
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def read_csv_rows(stream, encoding='utf-8'):
+    """Read a CSV with a header row into a list of dicts with stripped values."""
+    try:
+        reader = csv.DictReader(codecs.iterdecode(stream, encoding))
+        return [
+            {key.strip(): (value or '').strip() for key, value in row.items() if key}
+            for row in reader
+        ]
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ParseError(f'CSV parse error - {exc}')
+
+
+class CSVParser(BaseParser):
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        return read_csv_rows(stream, encoding)
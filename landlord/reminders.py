@@ -0,0 +1,90 @@
+from django.db import transaction
+from django.db.models import Count
+
+from .models import ChatMessage, EmailOutbox, ReminderJob, RentDue
+
+
+class ReminderError(Exception):
+    pass
+
+
+def _reminder_text(month, room_number, outstanding, message):
+    text = (f"Reminder: rent of {outstanding} for room {room_number} "
+            f"({month.strftime('%B %Y')}) is still pending.")
+    return f"{text}\n\n{message}" if message else text
+
+
+def send_rent_reminders(landlord, month, tenant_ids=None, property_id=None, message=''):
+    """
+    Remind every tenant with an unpaid or partly paid RentDue for ``month``.
+
+    The recipients come from one query; chat messages and outbox emails are
+    written with one bulk_create each, and the emails go out with the next
+    send_outbox run. Returns the ReminderJob to poll for delivery progress;
+    raises ReminderError when the month's dues have not been generated.
+    """
+    month = month.replace(day=1)
+    dues = RentDue.objects.filter(
+        landlord=landlord, month=month, status__in=['unpaid', 'partial'], tenant__isnull=False)
+    if tenant_ids:
+        dues = dues.filter(tenant_id__in=tenant_ids)
+    if property_id is not None:
+        dues = dues.filter(room__property_id=property_id)
+
+    rows = list(dues.values_list(
+        'tenant_id', 'tenant__email', 'room__room_number', 'amount_due', 'amount_paid'))
+    if not rows and not RentDue.objects.filter(landlord=landlord, month=month).exists():
+        # No ledger for the month yet: nothing would say who owes what
+        raise ReminderError(f"No rent dues for {month:%Y-%m}; run generate_rent_dues for the month first.")
+    subject = f"Rent reminder for {month.strftime('%B %Y')}"
+
+    with transaction.atomic():
+        job = ReminderJob.objects.create(landlord=landlord, month=month, message=message)
+        chats, emails = [], []
+        for tenant_id, email, room_number, amount_due, amount_paid in rows:
+            text = _reminder_text(month, room_number, amount_due - amount_paid, message)
+            chats.append(ChatMessage(sender=landlord, receiver_id=tenant_id, message=text, reminder_job=job))
+            if email:
+                emails.append(EmailOutbox(
+                    recipient=email, subject=subject, body=text,
+                    from_email='from@example.com', reminder_job=job))
+        ChatMessage.objects.bulk_create(chats, batch_size=500)
+        EmailOutbox.objects.bulk_create(emails, batch_size=500)
+        job.recipients = len({row[0] for row in rows})
+        job.chat_messages = len(chats)
+        job.save(update_fields=['recipients', 'chat_messages'])
+        # bulk_create skips post_save, so push_chat_message never sees these rows
+        transaction.on_commit(lambda: _publish_chat_messages(job))
+    return job
+
+
+def _publish_chat_messages(job):
+    from apartment.realtime import publish, user_channel
+    from .serializers import ChatMessageSerializer
+
+    # Read back rather than use the bulk_create objects: MySQL leaves their ids unset
+    messages = ChatMessage.objects.filter(reminder_job=job).select_related('sender', 'receiver').order_by('id')
+    for data in ChatMessageSerializer(messages, many=True).data:
+        for user_id in (data['sender'], data['receiver']):
+            publish(user_channel(user_id), 'chat.message', data)
+
+
+def job_progress(job):
+    """Delivery counts for a ReminderJob, from one grouped query over its emails."""
+    counts = dict(
+        EmailOutbox.objects.filter(reminder_job=job)
+        .order_by().values_list('status').annotate(n=Count('id'))
+    )
+    emails = {status: counts.get(status, 0) for status, _ in EmailOutbox.STATUS_CHOICES if status != 'sending'}
+    # Emails a worker is sending right now are still pending to the landlord
+    emails['pending'] += counts.get('sending', 0)
+    emails['queued'] = sum(counts.values())
+    return {
+        'id': job.id,
+        'month': job.month.strftime('%Y-%m'),
+        'recipients': job.recipients,
+        'chat_messages': job.chat_messages,
+        'emails': emails,
+        'status': 'delivering' if emails.get('pending') else 'done',
+        'created_at': job.created_at,
+    }
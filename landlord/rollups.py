@@ -0,0 +1,117 @@
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import MonthlyIncome, Payment, Property, RentDue, Room
+
+
+def month_start(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+def next_month(month):
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def refresh_income_bucket(property_id, month, payment_type):
+    """
+    Recompute one (property, month, payment_type) row from its approved payments.
+
+    Runs under a row lock on the property, so two payments landing in the same
+    empty bucket cannot both miss the update and race to create it. Call it
+    inside a transaction.
+    """
+    start = timezone.make_aware(datetime.combine(month, time.min))
+    end = timezone.make_aware(datetime.combine(next_month(month), time.min))
+
+    landlord_id = Property.objects.select_for_update().values_list('landlord_id', flat=True).get(pk=property_id)
+    totals = Payment.objects.filter(
+        room__property_id=property_id,
+        payment_type=payment_type,
+        status='approved',
+        date__gte=start,
+        date__lt=end,
+    ).aggregate(total=Sum('amount'), count=Count('id'))
+
+    bucket = MonthlyIncome.objects.filter(
+        property_id=property_id, month=month, payment_type=payment_type)
+    if not totals['count']:
+        bucket.delete()
+        return
+    if not bucket.update(total=totals['total'], payment_count=totals['count'], updated_at=timezone.now()):
+        MonthlyIncome.objects.create(
+            landlord_id=landlord_id, property_id=property_id, month=month,
+            payment_type=payment_type, total=totals['total'], payment_count=totals['count'])
+
+
+def sync_payment_rollup(payment, deleted=False):
+    """
+    Bring the buckets a payment belongs (or belonged) to up to date.
+
+    Only approved payments count, so creating a pending payment or rejecting
+    one that was never approved touches nothing. Each affected bucket is
+    recomputed from the index rather than adjusted by a delta, which keeps it
+    correct across any status, amount or room change.
+    """
+    keys = set()
+    old_room_id, old_date, old_type, old_status = getattr(payment, '_rollup_state', (None,) * 4)
+    if old_status == 'approved' and old_date is not None:
+        keys.add((old_room_id, month_start(old_date), old_type))
+    if payment.status == 'approved' and not deleted:
+        keys.add((payment.room_id, month_start(payment.date), payment.payment_type))
+    if not keys:
+        payment._rollup_state = (payment.room_id, payment.date, payment.payment_type, payment.status)
+        return
+
+    from .ledger import reconcile_rent_dues
+
+    room_ids = {room_id for room_id, _, _ in keys}
+    properties = dict(Room.objects.filter(pk__in=room_ids).values_list('id', 'property_id'))
+    with transaction.atomic():
+        for room_id, month, payment_type in keys:
+            if room_id in properties:
+                refresh_income_bucket(properties[room_id], month, payment_type)
+            if payment_type == 'rent':
+                # The rent ledger follows the same approved-payment transitions
+                reconcile_rent_dues(RentDue.objects.filter(room_id=room_id, month=month))
+    payment._rollup_state = (payment.room_id, payment.date, payment.payment_type, payment.status)
+
+
+def rebuild_income_rollup(landlord=None):
+    """Recreate the MonthlyIncome table (or one landlord's rows) from payments."""
+    payments = Payment.objects.filter(status='approved')
+    rollup = MonthlyIncome.objects.all()
+    if landlord is not None:
+        payments = payments.filter(room__property__landlord=landlord)
+        rollup = rollup.filter(landlord=landlord)
+
+    rows = payments.annotate(
+        month=TruncMonth('date', output_field=DateField())
+    ).values(
+        'room__property_id', 'room__property__landlord_id', 'month', 'payment_type'
+    ).annotate(
+        total=Sum('amount'), count=Count('id')
+    ).order_by()
+
+    with transaction.atomic():
+        rollup.delete()
+        created = MonthlyIncome.objects.bulk_create(
+            (
+                MonthlyIncome(
+                    landlord_id=row['room__property__landlord_id'],
+                    property_id=row['room__property_id'],
+                    month=row['month'],
+                    payment_type=row['payment_type'],
+                    total=row['total'],
+                    payment_count=row['count'],
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+    return len(created)
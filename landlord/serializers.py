@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Property, Room, Payment, ElectricityBill, CommunityMessage, ChatMessage
+from .models import Property, Room, Payment, ElectricityBill, CommunityMessage, ChatMessage, UploadSession, RentDue, Complaint
+from .images import InvalidImage, process_screenshot
 
 
 class PropertySerializer(serializers.ModelSerializer):
@@ -47,13 +48,23 @@ class RoomSerializer(serializers.ModelSerializer):
 class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
-        fields = ['id', 'amount', 'screenshot', 'date', 'status']
-        read_only_fields = ['date', 'status']
+        fields = ['id', 'amount', 'screenshot', 'screenshot_thumbnail', 'date', 'status']
+        read_only_fields = ['screenshot_thumbnail', 'date', 'status']
 
     def create(self, validated_data):
         # Automatically set tenant and room
         validated_data['tenant'] = self.context['request'].user
-        validated_data['room'] = self.context['request'].user.rooms.first()
+        # From the database, not lookup_cache: a stale entry in another worker would file it under the old room
+        validated_data['room_id'] = self.context['request'].user.rooms.order_by('pk').values_list(
+            'pk', flat=True).first()
+        screenshot = validated_data.pop('screenshot', None)
+        if screenshot:
+            storage = Payment._meta.get_field('screenshot').storage
+            try:
+                validated_data.update(process_screenshot(screenshot, storage))
+            except InvalidImage:
+                raise serializers.ValidationError({'screenshot': [
+                    'Upload a valid image. The file you uploaded was either not an image or a corrupted image.']})
         return super().create(validated_data)
 
 class PaymentListSerializer(serializers.ModelSerializer):
@@ -62,7 +73,38 @@ class PaymentListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Payment
-        fields = ['id', 'tenant', 'room', 'amount', 'screenshot', 'date', 'status']
+        fields = ['id', 'tenant', 'room', 'amount', 'screenshot', 'screenshot_thumbnail', 'date', 'status']
+
+    def get_tenant(self, obj):
+        return {
+            'id': obj.tenant.id,
+            'username': obj.tenant.username,
+            'email': obj.tenant.email,
+        }
+
+    def get_room(self, obj):
+        return {
+            'id': obj.room.id,
+            'room_number': obj.room.room_number,
+            'property_name': obj.room.property.name,
+        }
+
+
+class ComplaintSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Complaint
+        fields = ['id', 'room', 'title', 'description', 'status', 'created_at']
+        read_only_fields = ['room', 'status', 'created_at']
+
+
+class ComplaintListSerializer(serializers.ModelSerializer):
+    tenant = serializers.SerializerMethodField()
+    room = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Complaint
+        fields = ['id', 'tenant', 'room', 'title', 'description', 'status', 'created_at']
+        read_only_fields = ['title', 'description', 'created_at']
 
     def get_tenant(self, obj):
         return {
@@ -110,8 +152,96 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['sender', 'timestamp', 'is_read']
 
 
+class ChatMarkReadSerializer(serializers.Serializer):
+    up_to = serializers.IntegerField(min_value=1)
+
+
+class BulkRoomRowSerializer(serializers.Serializer):
+    # Plain ids: ownership, types and duplicates are checked for the whole batch at once
+    property = serializers.IntegerField()
+    room_number = serializers.CharField(max_length=20)
+    floor = serializers.IntegerField()
+    type = serializers.IntegerField(required=False, allow_null=True)
+    rent = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+    def to_internal_value(self, data):
+        # CSV cells arrive as '' for "not set"
+        if data.get('type') == '':
+            data = {**data, 'type': None}
+        return super().to_internal_value(data)
+
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    room = serializers.IntegerField(source='room_id', required=False, allow_null=True)
+    name = serializers.CharField(source='document_name', max_length=100, required=False, allow_blank=True)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'target', 'filename', 'size', 'sha256', 'room', 'name', 'offset', 'status', 'document']
+        read_only_fields = ['offset', 'status', 'document']
+
+    def validate_filename(self, value):
+        # Only the base name; the storage decides the directory
+        value = value.replace('\\', '/').rsplit('/', 1)[-1]
+        if not value:
+            raise serializers.ValidationError('Filename is required.')
+        return value
+
+    def validate_size(self, value):
+        from django.conf import settings
+        max_size = settings.CHUNKED_UPLOAD_MAX_SIZE
+        if not 0 < value <= max_size:
+            raise serializers.ValidationError(f'Size must be between 1 and {max_size} bytes.')
+        return value
+
+
+class MeterReadingSerializer(serializers.Serializer):
+    room = serializers.IntegerField()
+    units = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+
+    def validate(self, data):
+        if ('units' in data) == ('amount' in data):
+            raise serializers.ValidationError('Give either units or amount.')
+        return data
 
 
+class BillRunSerializer(serializers.Serializer):
+    month = serializers.DateField(input_formats=['%Y-%m', '%Y-%m-%d'])
+    property = serializers.IntegerField(required=False)
+    tariff = serializers.DecimalField(max_digits=10, decimal_places=4, min_value=0, required=False)
+    fixed_charge = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, default=0)
+    readings = MeterReadingSerializer(many=True, required=False)
 
 
+class RentReminderSerializer(serializers.Serializer):
+    month = serializers.DateField(input_formats=['%Y-%m', '%Y-%m-%d'])
+    property = serializers.IntegerField(required=False)
+    tenants = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    message = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class RentDueSerializer(serializers.ModelSerializer):
+    room = serializers.SerializerMethodField()
+    tenant = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RentDue
+        fields = ['id', 'month', 'room', 'tenant', 'amount_due', 'amount_paid', 'status']
+
+    def get_room(self, obj):
+        return {
+            'id': obj.room.id,
+            'room_number': obj.room.room_number,
+            'property_name': obj.room.property.name,
+        }
+
+    def get_tenant(self, obj):
+        if obj.tenant is None:
+            return None
+        return {
+            'id': obj.tenant.id,
+            'username': obj.tenant.username,
+            'email': obj.tenant.email,
+        }
@@ -0,0 +1,189 @@
+"""
+Synthetic dataset for load tests and benchmarks.
+
+Everything is written with bulk_create in fixed-size chunks, so memory stays
+flat however large the dataset. bulk_create sends no signals, so the
+derived tables (landlord profiles, MonthlyIncome, RentDue) are built
+explicitly at the end.
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from superadmin.models import Role, User
+from .ledger import generate_rent_dues
+from .models import ChatMessage, CommunityMessage, Complaint, ElectricityBill, LandlordProfile, Payment, Property, RentDue, Room, RoomType
+from .rollups import rebuild_income_rollup
+
+PASSWORD = 'password123'
+
+
+def insert(model, objects, batch_size):
+    """bulk_create an iterable chunk by chunk; returns the number of rows."""
+    objects = iter(objects)
+    total = 0
+    while True:
+        chunk = list(islice(objects, batch_size))
+        if not chunk:
+            return total
+        model.objects.bulk_create(chunk, batch_size=batch_size)
+        total += len(chunk)
+
+
+@contextmanager
+def historical_timestamps(*fields):
+    """Let auto_now_add fields keep the back-dated values we assign."""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+def month_starts(months, today=None):
+    """First days of the last ``months`` months, oldest first, ending with the current one."""
+    current = (today or timezone.localdate()).replace(day=1)
+    starts = [current]
+    for _ in range(months - 1):
+        starts.append((starts[-1] - timedelta(days=1)).replace(day=1))
+    return starts[::-1]
+
+
+def moment(month, rng, max_day=27):
+    today = timezone.localdate()
+    if month == today.replace(day=1):
+        max_day = min(max_day, today.day)  # Nothing in the future
+    day = datetime.combine(month.replace(day=rng.randint(1, max_day)), time(rng.randint(7, 22), rng.randint(0, 59)))
+    return timezone.make_aware(day)
+
+
+def generate_dataset(prefix='bench', landlords=2, properties=3, rooms=20, months=6, chat=10,
+                     occupancy=0.9, complaints=2, seed=0, batch_size=2000, log=None):
+    """
+    Create ``landlords`` landlords, each with ``properties`` properties of
+    ``rooms`` rooms, tenants for ``occupancy`` of the rooms and ``months`` of
+    rent/electricity history. Each tenant gets ``chat`` chat messages with the
+    landlord. Usernames start with ``prefix``, which must not be in use yet.
+    Returns a dict of row counts.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    if User.objects.filter(username__startswith=f'{prefix}-').exists():
+        raise ValueError(f'Users named {prefix}-* already exist; pick another prefix.')
+
+    counts = {}
+    admin_role, _ = Role.objects.get_or_create(name='admin')
+    tenant_role, _ = Role.objects.get_or_create(name='tenant')
+    room_types = list(RoomType.objects.values_list('id', flat=True)) or [
+        room_type.id for room_type in RoomType.objects.bulk_create(
+            [RoomType(name=name) for name in ('Studio', '1BHK', '2BHK')])]
+    password = make_password(PASSWORD)  # Hashing once: it dominates otherwise
+    history = month_starts(months)
+
+    counts['landlords'] = insert(User, (
+        User(username=f'{prefix}-landlord-{n}', email=f'{prefix}-landlord-{n}@example.com',
+             password=password, role=admin_role)
+        for n in range(landlords)), batch_size)
+    landlord_ids = list(User.objects.filter(
+        username__startswith=f'{prefix}-landlord-').order_by('id').values_list('id', flat=True))
+    insert(LandlordProfile, (LandlordProfile(user_id=user_id) for user_id in landlord_ids), batch_size)
+
+    counts['properties'] = insert(Property, (
+        Property(name=f'{prefix} property {l}-{p}', address=f'{p} Synthetic Road', landlord_id=landlord_id,
+                 room_count=rooms)
+        for l, landlord_id in enumerate(landlord_ids) for p in range(properties)), batch_size)
+    property_ids = list(Property.objects.filter(
+        landlord_id__in=landlord_ids).order_by('id').values_list('id', flat=True))
+    log(f'{counts["landlords"]} landlords, {counts["properties"]} properties')
+
+    occupied = [(property_id, number) for property_id in property_ids for number in range(rooms)
+                if rng.random() < occupancy]
+    counts['tenants'] = insert(User, (
+        User(username=f'{prefix}-tenant-{n}', email=f'{prefix}-tenant-{n}@example.com',
+             password=password, role=tenant_role)
+        for n in range(len(occupied))), batch_size)
+    tenant_ids = dict(zip(occupied, User.objects.filter(
+        username__startswith=f'{prefix}-tenant-').order_by('id').values_list('id', flat=True)))
+
+    counts['rooms'] = insert(Room, (
+        Room(property_id=property_id, room_number=f'{number // 10 + 1}{number % 10 + 1:02d}',
+             floor=number // 10 + 1, type_id=rng.choice(room_types),
+             rent=Decimal(rng.randrange(500, 2500, 50)), tenant_id=tenant_ids.get((property_id, number)))
+        for property_id in property_ids for number in range(rooms)), batch_size)
+    occupied_rooms = list(Room.objects.filter(
+        property_id__in=property_ids, tenant__isnull=False
+    ).values_list('id', 'tenant_id', 'rent', 'property__landlord_id', 'property_id'))
+    log(f'{counts["rooms"]} rooms, {counts["tenants"]} tenants')
+
+    def payments():
+        for room_id, tenant_id, rent, _, _ in occupied_rooms:
+            for month in history:
+                status = rng.choices(['approved', 'pending', 'rejected'], [85, 10, 5])[0]
+                yield Payment(room_id=room_id, tenant_id=tenant_id, amount=rent, payment_type='rent',
+                              status=status, date=moment(month, rng))
+                if rng.random() < 0.6:
+                    yield Payment(room_id=room_id, tenant_id=tenant_id, payment_type='electricity',
+                                  amount=Decimal(rng.randrange(20, 200)), status='approved',
+                                  date=moment(month, rng))
+
+    def bills():
+        for room_id, _, _, _, _ in occupied_rooms:
+            for month in history:
+                yield ElectricityBill(room_id=room_id, month=month, amount=Decimal(rng.randrange(20, 200)),
+                                      is_paid=month != history[-1], created_at=moment(month, rng, 3))
+
+    def chats():
+        for room_id, tenant_id, _, landlord_id, _ in occupied_rooms:
+            stamps = sorted(moment(rng.choice(history), rng) for _ in range(chat))
+            for n, stamp in enumerate(stamps):
+                sender, receiver = (tenant_id, landlord_id) if n % 2 == 0 else (landlord_id, tenant_id)
+                yield ChatMessage(sender_id=sender, receiver_id=receiver, message=f'Synthetic message {n}',
+                                  timestamp=stamp, is_read=n < chat - 2)
+
+    def complaint_rows():
+        by_property = {}
+        for room_id, tenant_id, _, _, property_id in occupied_rooms:
+            by_property.setdefault(property_id, []).append((room_id, tenant_id))
+        for property_id, tenancies in by_property.items():
+            for room_id, tenant_id in rng.sample(tenancies, min(complaints, len(tenancies))):
+                yield Complaint(room_id=room_id, tenant_id=tenant_id, property_id=property_id,
+                                title='Synthetic complaint', description='Generated for load tests',
+                                status=rng.choice(Complaint.STATUS_CHOICES)[0],
+                                created_at=moment(rng.choice(history), rng))
+
+    def announcements():
+        for landlord_id in landlord_ids:
+            for month in history:
+                yield CommunityMessage(sender_id=landlord_id, title=f'Notice {month:%B %Y}',
+                                       content='Synthetic announcement', created_at=moment(month, rng))
+
+    with historical_timestamps(
+        Payment._meta.get_field('date'),
+        ElectricityBill._meta.get_field('created_at'),
+        ChatMessage._meta.get_field('timestamp'),
+        Complaint._meta.get_field('created_at'),
+        CommunityMessage._meta.get_field('created_at'),
+    ):
+        counts['payments'] = insert(Payment, payments(), batch_size)
+        log(f'{counts["payments"]} payments')
+        counts['electricity_bills'] = insert(ElectricityBill, bills(), batch_size)
+        counts['chat_messages'] = insert(ChatMessage, chats(), batch_size)
+        log(f'{counts["chat_messages"]} chat messages')
+        counts['complaints'] = insert(Complaint, complaint_rows(), batch_size)
+        counts['community_messages'] = insert(CommunityMessage, announcements(), batch_size)
+
+    for landlord in User.objects.filter(id__in=landlord_ids):
+        rebuild_income_rollup(landlord)
+        for month in history:
+            generate_rent_dues(month, landlord=landlord)
+    counts['rent_dues'] = RentDue.objects.filter(landlord_id__in=landlord_ids).count()
+    log('Income rollups and rent dues rebuilt')
+    return counts
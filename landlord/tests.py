@@ -1,9 +1,27 @@
-from django.test import TestCase
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.management import CommandError, call_command
+from io import StringIO
+from unittest import mock, skipUnless
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+import os
+import shutil
+import tempfile
+import json
+from asgiref.testing import ApplicationCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+from .lookups import lookup_cache
+from apartment.testing import QueryBudgetMixin
+from apartment.realtime import COMMUNITY_CHANNEL, get_broker, publish, user_channel, websocket_application
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from superadmin.models import Role
-from .models import Property, Room, RoomType, Payment, ElectricityBill, CommunityMessage
+from .models import Property, Room, RoomType, Payment, ElectricityBill, CommunityMessage, MonthlyIncome, EmailOutbox, ChatMessage, RentDue, ReminderJob, Complaint
+from .serializers import ChatMessageSerializer
 
 User = get_user_model()
 
@@ -30,6 +48,8 @@ class LandlordTests(TestCase):
         self.room_type = RoomType.objects.create(name="1BHK")
         self.room = Room.objects.create(
             property=self.property, room_number="101", floor=1, type=self.room_type, rent=1000.00)
+        lookup_cache.clear()
+        self.addCleanup(lookup_cache.clear)
 
     def test_create_property(self):
         data = {
@@ -51,6 +71,149 @@ class LandlordTests(TestCase):
         self.room.refresh_from_db()
         self.assertEqual(self.room.tenant, self.tenant)
 
+    def test_bulk_create_rooms_json(self):
+        rows = [
+            {'property': self.property.id, 'room_number': str(300 + i), 'floor': 3,
+             'type': self.room_type.id, 'rent': '750.00'}
+            for i in range(12)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/landlord/rooms/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 12)
+        self.assertLess(len(ctx.captured_queries), 10)
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.room_count, 13)
+
+    def test_bulk_create_rooms_reports_row_errors(self):
+        other_landlord = User.objects.create_user(
+            username='landlord2', password='password123', role=self.admin_role)
+        foreign = Property.objects.create(name="Other", address="1 Way", landlord=other_landlord)
+        rows = [
+            {'property': self.property.id, 'room_number': '401', 'floor': 4, 'rent': '700'},
+            {'property': self.property.id, 'room_number': '101', 'floor': 1, 'rent': '700'},
+            {'property': foreign.id, 'room_number': '1', 'floor': 1, 'rent': '700'},
+            {'property': self.property.id, 'room_number': '401', 'floor': 4, 'rent': '700'},
+            {'property': self.property.id, 'room_number': '402', 'floor': 'x', 'rent': '700'},
+        ]
+        response = self.client.post('/landlord/rooms/bulk/', {'rows': rows}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['row'] for e in response.data['errors']], [2, 3, 4, 5])
+        self.assertIn('property', response.data['errors'][1]['errors'])
+        self.assertEqual(Room.objects.count(), 1)
+
+    def test_bulk_create_rooms_concurrent_duplicate(self):
+        from landlord import views
+        rows = [
+            {'property': self.property.id, 'room_number': '401', 'floor': 4, 'rent': '700'},
+            {'property': self.property.id, 'room_number': '402', 'floor': 4, 'rent': '700'},
+        ]
+        real_check = views.existing_room_numbers
+
+        def raced(property_ids, valid):
+            # Another request creates room 402 right after the first duplicate check
+            found = real_check(property_ids, valid)
+            Room.objects.get_or_create(property=self.property, room_number='402', defaults={'floor': 4, 'rent': 700})
+            return found
+
+        with mock.patch.object(views, 'existing_room_numbers', side_effect=raced):
+            response = self.client.post('/landlord/rooms/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [
+            {'row': 2, 'errors': {'room_number': ['Room number already exists in this property.']}}])
+        self.assertFalse(Room.objects.filter(room_number='401').exists())
+
+    def test_bulk_create_rooms_csv(self):
+        body = 'property,room_number,floor,type,rent\n' + '\n'.join(
+            f'{self.property.id},5{i:02d},5,,600' for i in range(3))
+        response = self.client.post('/landlord/rooms/bulk/', body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Room.objects.filter(floor=5, type__isnull=True).count(), 3)
+
+    def test_bulk_assign_tenants(self):
+        rooms = [self.room] + [
+            Room.objects.create(property=self.property, room_number=f"6{i}", floor=6, rent=500)
+            for i in range(3)
+        ]
+        tenants = [self.tenant] + [
+            User.objects.create_user(username=f't{i}', password='password123',
+                                     role=self.tenant_role, email=f't{i}@test.com')
+            for i in range(3)
+        ]
+        body = 'room_id,tenant_email\n' + '\n'.join(
+            f'{room.id},{tenant.email}' for room, tenant in zip(rooms, tenants))
+        upload = SimpleUploadedFile('assign.csv', body.encode(), content_type='text/csv')
+        response = self.client.post('/landlord/assign-tenant/bulk/', {'file': upload})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['assigned'], 4)
+        self.assertEqual(
+            dict(Room.objects.values_list('id', 'tenant_id')),
+            {room.id: tenant.id for room, tenant in zip(rooms, tenants)})
+
+        response = self.client.post('/landlord/assign-tenant/bulk/', [
+            {'room_id': self.room.id, 'tenant_email': 'nobody@test.com'},
+            {'room_id': 999999, 'tenant_email': self.tenant.email},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data['errors'][0]['errors']), ['tenant_email'])
+        self.assertEqual(list(response.data['errors'][1]['errors']), ['room_id'])
+
+    def test_payment_export_streams_csv(self):
+        import csv
+        other_property = Property.objects.create(
+            name="Second Property", address="789 Rd", landlord=self.landlord)
+        other_room = Room.objects.create(
+            property=other_property, room_number="201", floor=2, rent=900.00)
+        for amount in (100, 200, 300):
+            Payment.objects.create(room=self.room, tenant=self.tenant, amount=amount, status='approved')
+        Payment.objects.create(room=other_room, tenant=self.tenant, amount=900)
+
+        response = self.client.get('/landlord/export/payments/', {'property': self.property.id},
+                                   HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:3], ['id', 'date', 'property'])
+        self.assertEqual([row[7] for row in rows[1:]], ['100.00', '200.00', '300.00'])
+
+        response = self.client.get('/landlord/export/payments/', {'status': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_rows_uses_keyset_chunks(self):
+        from landlord.exports import PAYMENT_COLUMNS, export_rows
+        for amount in range(5):
+            Payment.objects.create(room=self.room, tenant=self.tenant, amount=amount)
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(export_rows(Payment.objects.all(), PAYMENT_COLUMNS, chunk_size=2))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertIn('LIMIT 2', ctx.captured_queries[-1]['sql'])
+
+    def test_export_history_command(self):
+        ElectricityBill.objects.create(room=self.room, amount=80, month='2024-01-01', is_paid=True)
+        ElectricityBill.objects.create(room=self.room, amount=90, month='2024-02-01')
+        out = StringIO()
+        call_command('export_history', 'electricity', '--landlord', 'landlord1',
+                     '--status', 'unpaid', '--date-from', '2024-01-01', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('2024-02-01', lines[1])
+
+    def test_chunked_upload_landlord_proof(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            response = self.client.post('/landlord/uploads/', {
+                'target': 'proof', 'filename': '../../id-scan.pdf', 'size': 5})
+            self.assertEqual(response.data['filename'], 'id-scan.pdf')
+            response = self.client.patch(
+                f"/landlord/uploads/{response.data['id']}/", b'%PDF-', content_type='application/offset+octet-stream',
+                HTTP_UPLOAD_OFFSET='0')
+            self.assertEqual(response.data['status'], 'complete')
+            self.landlord.landlord_profile.refresh_from_db()
+            self.assertTrue(self.landlord.landlord_profile.proof.name.startswith('landlord_proofs/id-scan'))
+
     def test_post_electricity_bill(self):
         data = {
             'room': self.room.id,
@@ -60,6 +223,195 @@ class LandlordTests(TestCase):
         response = self.client.post('/landlord/electricity/add/', data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_duplicate_electricity_bill_rejected(self):
+        data = {'room': self.room.id, 'amount': 150.00, 'month': '2023-11-01'}
+        self.client.post('/landlord/electricity/add/', data)
+        response = self.client.post('/landlord/electricity/add/', data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ElectricityBill.objects.count(), 1)
+
+    def test_duplicate_room_number_rejected(self):
+        data = {'property': self.property.id, 'room_number': '101', 'floor': 1, 'rent': 500}
+        response = self.client.post('/landlord/rooms/', data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_explain_queries_command(self):
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+        for name in ['landlord-properties', 'room-list-create', 'landlord-payment-list',
+                     'tenant-payment-list', 'tenant-electricity-list', 'community-message-list', 'chat']:
+            self.assertIn(f'== {name} ', output)
+
+    def test_electricity_bill_run(self):
+        self.room.tenant = self.tenant
+        self.room.save()
+        rooms = [self.room]
+        for i in range(3):
+            tenant = User.objects.create_user(
+                username=f'bill_tenant{i}', password='password123', role=self.tenant_role)
+            rooms.append(Room.objects.create(
+                property=self.property, room_number=f"7{i}", floor=7, rent=500, tenant=tenant))
+        Room.objects.create(property=self.property, room_number="79", floor=7, rent=500)  # vacant
+        ElectricityBill.objects.create(room=rooms[3], amount=10, month='2024-03-01')
+
+        data = {
+            'month': '2024-03',
+            'tariff': '7.5',
+            'readings': [
+                {'room': rooms[0].id, 'units': '100'},
+                {'room': rooms[1].id, 'amount': '42.10'},
+            ],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/landlord/electricity/run/', data, format='json')
+        self.assertLess(len(ctx.captured_queries), 10)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['already_billed'], 1)
+        self.assertEqual(response.data['missing_readings'], [rooms[2].id])
+        self.assertEqual(float(response.data['total_amount']), 792.10)
+
+        # Re-running is a no-op for rooms that were billed
+        response = self.client.post('/landlord/electricity/run/', data, format='json')
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(ElectricityBill.objects.filter(month='2024-03-01').count(), 3)
+
+        out = StringIO()
+        call_command('run_electricity_bills', '--month', '2024-03', '--fixed-charge', '15', stdout=out)
+        self.assertIn('landlord1: 1 created', out.getvalue())
+        self.assertEqual(float(ElectricityBill.objects.get(room=rooms[2]).amount), 15.00)
+
+    def test_electricity_bill_run_counts_concurrent_bills(self):
+        from landlord import billing
+        self.room.tenant = self.tenant
+        self.room.save()
+        tenant = User.objects.create_user(username='bill_tenant', password='password123', role=self.tenant_role)
+        other = Room.objects.create(property=self.property, room_number='70', floor=7, rent=500, tenant=tenant)
+        ElectricityBill.objects.create(room=other, month='2024-03-01', amount=99)
+        real_plan = billing._plan_bills
+        attempts = []
+
+        def raced(*args):
+            # First attempt: planned before another run committed the second room's bill
+            already_billed, bills, missing = real_plan(*args)
+            if not attempts:
+                already_billed = already_billed - {other.id}
+                bills.append(ElectricityBill(room=other, month=bills[0].month, amount=bills[0].amount))
+            attempts.append(len(bills))
+            return already_billed, bills, missing
+
+        with mock.patch.object(billing, '_plan_bills', side_effect=raced):
+            response = self.client.post('/landlord/electricity/run/', {
+                'month': '2024-03', 'fixed_charge': '20'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['already_billed']), (1, 1))
+        self.assertEqual(float(response.data['total_amount']), 20.00)
+        self.assertEqual(attempts, [2, 1])
+        self.assertEqual(float(ElectricityBill.objects.get(room=other).amount), 99.00)
+
+    def test_electricity_bill_run_rejects_foreign_rooms(self):
+        response = self.client.post('/landlord/electricity/run/', {
+            'month': '2024-03', 'readings': [{'room': 999999, 'amount': '5'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rent_ledger_generation_and_reconciliation(self):
+        from django.utils import timezone
+        month = timezone.localdate().strftime('%Y-%m')
+        self.room.tenant = self.tenant
+        self.room.save()
+        other_tenant = User.objects.create_user(
+            username='tenant2', password='password123', role=self.tenant_role)
+        other_room = Room.objects.create(
+            property=self.property, room_number="102", floor=1, rent=800, tenant=other_tenant)
+        Room.objects.create(property=self.property, room_number="103", floor=1, rent=800)  # vacant
+        Payment.objects.create(room=other_room, tenant=other_tenant, amount=800, status='approved')
+
+        call_command('generate_rent_dues', '--month', month, stdout=StringIO())
+        call_command('generate_rent_dues', '--month', month, stdout=StringIO())
+        self.assertEqual(RentDue.objects.count(), 2)
+        self.assertEqual(RentDue.objects.get(room=other_room).status, 'paid')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/rent/unpaid/', {'month': month})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual([d['room']['room_number'] for d in response.data['results']], ['101'])
+        self.assertEqual(response.data['results'][0]['tenant']['username'], 'tenant1')
+
+        # Approving a payment reconciles the due straight away
+        payment = Payment.objects.create(room=self.room, tenant=self.tenant, amount=400)
+        self.client.patch(f'/landlord/payments/{payment.id}/', {'status': 'approved'})
+        due = RentDue.objects.get(room=self.room)
+        self.assertEqual((due.status, float(due.amount_paid)), ('partial', 400.00))
+
+        payment = Payment.objects.create(room=self.room, tenant=self.tenant, amount=600)
+        self.client.patch(f'/landlord/payments/{payment.id}/', {'status': 'approved'})
+        response = self.client.get('/landlord/rent/unpaid/', {'month': month})
+        self.assertEqual(response.data['results'], [])
+
+    def test_rent_reminders_fan_out(self):
+        from django.utils import timezone
+        month = timezone.localdate().strftime('%Y-%m')
+        self.room.tenant = self.tenant
+        self.room.save()
+        tenants, rooms = [self.tenant], [self.room]
+        for number in range(2, 5):
+            tenant = User.objects.create_user(
+                username=f'tenant{number}', password='password123', role=self.tenant_role,
+                email=f'tenant{number}@test.com')
+            rooms.append(Room.objects.create(
+                property=self.property, room_number=f'10{number}', floor=1, rent=800, tenant=tenant))
+            tenants.append(tenant)
+        Payment.objects.create(room=rooms[1], tenant=tenants[1], amount=800, status='approved')
+        call_command('generate_rent_dues', '--month', month, stdout=StringIO())
+
+        received = []
+        get_broker().subscribe(user_channel(self.tenant.id), received.append)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.post('/landlord/rent/reminders/', {'month': month}, format='json')
+        finally:
+            get_broker().unsubscribe(user_channel(self.tenant.id), received.append)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        # Recipients, job insert, chat + email bulk inserts, job update, progress
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+        self.assertEqual(response.data['recipients'], 3)
+        self.assertEqual(response.data['emails'], {'pending': 3, 'sent': 0, 'failed': 0, 'queued': 3})
+        self.assertEqual(response.data['status'], 'delivering')
+        self.assertEqual(ChatMessage.objects.filter(sender=self.landlord).count(), 3)
+        self.assertFalse(ChatMessage.objects.filter(receiver=tenants[1]).exists())
+        self.assertEqual([event['type'] for event in received], ['chat.message'])
+        self.assertIn('room 101', received[0]['data']['message'])
+        # Same payload as the REST endpoints, ids included
+        published = received[0]['data']
+        self.assertEqual(published, ChatMessageSerializer(ChatMessage.objects.get(pk=published['id'])).data)
+
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len([m for m in mail.outbox if m.subject.startswith('Rent reminder')]), 3)
+        response = self.client.get(f"/landlord/rent/reminders/{response.data['id']}/")
+        self.assertEqual(response.data['emails']['sent'], 3)
+        self.assertEqual(response.data['status'], 'done')
+
+        # Reminding a single tenant
+        response = self.client.post('/landlord/rent/reminders/', {
+            'month': month, 'tenants': [tenants[2].id], 'message': 'Please pay soon.'}, format='json')
+        self.assertEqual(response.data['recipients'], 1)
+        self.assertTrue(ChatMessage.objects.filter(
+            receiver=tenants[2], message__endswith='Please pay soon.').exists())
+
+        # A month whose dues were never generated is refused, not reported as sent to nobody
+        response = self.client.post('/landlord/rent/reminders/', {'month': '2020-01'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('generate_rent_dues', response.data['detail'])
+        self.assertEqual(ReminderJob.objects.count(), 2)
+
+        other = User.objects.create_user(username='landlord2', password='password123', role=self.admin_role)
+        self.client.force_authenticate(user=other)
+        job = ReminderJob.objects.first()
+        response = self.client.get(f'/landlord/rent/reminders/{job.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_post_community_message(self):
         data = {
             'title': 'Meeting',
@@ -80,8 +432,43 @@ class LandlordTests(TestCase):
         # Verify message exists
         response = self.client.get('/landlord/chat/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['message'], 'Hello Tenant')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['message'], 'Hello Tenant')
+
+    def test_chat_conversations_and_sync(self):
+        other_tenant = User.objects.create_user(
+            username='tenant2', password='password123', role=self.tenant_role)
+        first = ChatMessage.objects.create(sender=self.tenant, receiver=self.landlord, message='Hi')
+        second = ChatMessage.objects.create(sender=self.tenant, receiver=self.landlord, message='Rent paid')
+        ChatMessage.objects.create(sender=self.landlord, receiver=other_tenant, message='Welcome')
+        ChatMessage.objects.create(sender=other_tenant, receiver=self.tenant, message='Not mine')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/chat/conversations/')
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual([c['user']['username'] for c in response.data], ['tenant2', 'tenant1'])
+        self.assertEqual(response.data[1]['last_message']['message'], 'Rent paid')
+        self.assertEqual(response.data[1]['unread_count'], 2)
+        self.assertEqual(response.data[0]['unread_count'], 0)
+
+        url = f'/landlord/chat/conversations/{self.tenant.id}/messages/'
+        response = self.client.get(url, {'after': first.id})
+        self.assertEqual([m['id'] for m in response.data], [second.id])
+        response = self.client.get(url, {'after': second.id})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(url, {'before': second.id})
+        self.assertEqual([m['id'] for m in response.data], [first.id])
+        response = self.client.get(url, {'limit': 1})
+        self.assertEqual([m['id'] for m in response.data], [first.id])
+        for limit in ('0', '-1', 'x'):
+            response = self.client.get(url, {'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, limit)
+
+        response = self.client.post(
+            f'/landlord/chat/conversations/{self.tenant.id}/read/', {'up_to': first.id})
+        self.assertEqual(response.data['updated'], 1)
+        response = self.client.get('/landlord/chat/conversations/')
+        self.assertEqual(response.data[1]['unread_count'], 1)
 
     def test_income_analytics(self):
         # Create a payment
@@ -100,6 +487,203 @@ class LandlordTests(TestCase):
         self.assertTrue(len(response.data) > 0)
         self.assertEqual(float(response.data[0]['total']), 1000.00)
 
+    def test_income_rollup_follows_approval(self):
+        payment = Payment.objects.create(room=self.room, tenant=self.tenant, amount=1000.00)
+        self.assertFalse(MonthlyIncome.objects.exists())
+
+        self.client.patch(f'/landlord/payments/{payment.id}/', {'status': 'approved'})
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=50.00,
+                               payment_type='electricity', status='approved')
+        response = self.client.get('/landlord/analytics/income/')
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(float(response.data[0]['total']), 1050.00)
+        response = self.client.get('/landlord/analytics/income/', {'payment_type': 'rent'})
+        self.assertEqual(float(response.data[0]['total']), 1000.00)
+
+        self.client.patch(f'/landlord/payments/{payment.id}/', {'status': 'rejected'})
+        response = self.client.get('/landlord/analytics/income/')
+        self.assertEqual(float(response.data[0]['total']), 50.00)
+        self.assertEqual(MonthlyIncome.objects.get().payment_type, 'electricity')
+
+    def test_rebuild_income_rollup_command(self):
+        for amount in (100, 200, 300):
+            Payment.objects.create(room=self.room, tenant=self.tenant, amount=amount, status='approved')
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=999)
+        # Bulk updates bypass signals; the rebuild brings the table back in line
+        Payment.objects.filter(amount=300).update(status='rejected')
+
+        call_command('rebuild_income_rollup', stdout=StringIO())
+        income = MonthlyIncome.objects.get()
+        self.assertEqual(float(income.total), 300.00)
+        self.assertEqual(income.payment_count, 2)
+        self.assertEqual(income.landlord, self.landlord)
+
+    def test_rent_dashboard(self):
+        from django.utils import timezone
+        month = timezone.now().strftime('%Y-%m')
+        self.room.tenant = self.tenant
+        self.room.save()
+        Room.objects.create(property=self.property, room_number="102", floor=1, rent=800.00)
+        other_property = Property.objects.create(
+            name="Second Property", address="789 Rd", landlord=self.landlord, room_count=1)
+        other_tenant = User.objects.create_user(
+            username='tenant2', password='password123', role=self.tenant_role)
+        other_room = Room.objects.create(
+            property=other_property, room_number="201", floor=2, rent=900.00, tenant=other_tenant)
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=600, status='approved')
+        Payment.objects.create(room=other_room, tenant=other_tenant, amount=900)
+        ElectricityBill.objects.create(room=self.room, amount=75, month=f'{month}-01')
+        ElectricityBill.objects.create(room=other_room, amount=40, month=f'{month}-01', is_paid=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/dashboard/rent/', {'month': month})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        first, second = response.data['properties']
+        self.assertEqual((first['rooms_total'], first['rooms_occupied'], first['room_count']), (2, 1, 10))
+        self.assertEqual(float(first['expected_rent']), 1000.00)
+        self.assertEqual(float(first['collected_rent']), 600.00)
+        self.assertEqual(float(first['pending_rent']), 400.00)
+        self.assertEqual(float(first['unpaid_electricity']), 75.00)
+        self.assertEqual(float(second['pending_rent']), 900.00)
+        self.assertEqual(float(second['unpaid_electricity']), 0)
+
+        totals = response.data['totals']
+        self.assertEqual(totals['rooms_occupied'], 2)
+        self.assertEqual(float(totals['expected_rent']), 1900.00)
+        self.assertEqual(float(totals['pending_rent']), 1300.00)
+
+        response = self.client.get('/landlord/dashboard/rent/', {'property': other_property.id})
+        self.assertEqual(len(response.data['properties']), 1)
+        response = self.client.get('/landlord/dashboard/rent/', {'month': 'May'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_send_outbox_batches_and_digests(self):
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=100)
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailOutbox.objects.filter(recipient=self.landlord.email).count(), 2)
+
+        call_command('send_outbox', '--digest', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.landlord.email])
+        self.assertIn('2 new notifications', mail.outbox[0].subject)
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+
+    def test_send_outbox_retries_with_backoff(self):
+        from landlord.outbox import deliver_outbox
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=100)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=OSError('smtp down')):
+            self.assertEqual(deliver_outbox(max_attempts=2)['retried'], 1)
+        row = EmailOutbox.objects.get()
+        self.assertEqual((row.status, row.attempts), ('pending', 1))
+        self.assertGreater(row.next_attempt_at, row.created_at)
+        # Not due yet, so nothing is picked up
+        self.assertEqual(deliver_outbox(), {'sent': 0, 'retried': 0, 'failed': 0})
+
+        EmailOutbox.objects.update(next_attempt_at=row.created_at)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=OSError('smtp down')):
+            self.assertEqual(deliver_outbox(max_attempts=2)['failed'], 1)
+        self.assertEqual(EmailOutbox.objects.get().status, 'failed')
+
+    def test_send_outbox_claims_rows_before_sending(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from landlord.outbox import deliver_outbox
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=100)
+        row = EmailOutbox.objects.get()
+        seen = []
+
+        def send_messages(messages):
+            # The claim is committed before SMTP is touched
+            seen.append(EmailOutbox.objects.get(pk=row.pk).status)
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            self.assertEqual(deliver_outbox()['sent'], 1)
+        self.assertEqual(seen, ['sending'])
+
+        # A claim whose worker died is retried once it runs out; a live one is left alone
+        EmailOutbox.objects.update(status='sending', next_attempt_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(deliver_outbox()['sent'], 0)
+        EmailOutbox.objects.update(next_attempt_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(deliver_outbox()['sent'], 1)
+        self.assertEqual(EmailOutbox.objects.get().status, 'sent')
+
+    def _payment_list_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/payments/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_payment_list_query_count_is_constant(self):
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=1000.00)
+        baseline = self._payment_list_query_count()
+
+        # More rows, more tenants and rooms across properties
+        other_property = Property.objects.create(
+            name="Second Property", address="789 Rd", landlord=self.landlord)
+        for i in range(20):
+            tenant = User.objects.create_user(
+                username=f'bulk_tenant{i}', password='password123', role=self.tenant_role)
+            room = Room.objects.create(
+                property=other_property if i % 2 else self.property,
+                room_number=f"2{i:02d}", floor=2, rent=900.00, tenant=tenant)
+            Payment.objects.create(room=room, tenant=tenant, amount=900.00)
+
+        self.assertEqual(self._payment_list_query_count(), baseline)
+
+    def test_payment_list_cursor_pagination(self):
+        for i in range(5):
+            Payment.objects.create(room=self.room, tenant=self.tenant, amount=100 + i)
+
+        response = self.client.get('/landlord/payments/', {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['previous'])
+
+        seen = [p['id'] for p in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            seen += [p['id'] for p in response.data['results']]
+            next_url = response.data['next']
+        self.assertEqual(seen, list(
+            Payment.objects.order_by('-date', '-id').values_list('id', flat=True)))
+
+    def test_payment_list_filters(self):
+        other_property = Property.objects.create(
+            name="Second Property", address="789 Rd", landlord=self.landlord)
+        other_room = Room.objects.create(
+            property=other_property, room_number="201", floor=2, rent=900.00)
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=1000, status='approved')
+        Payment.objects.create(room=self.room, tenant=self.tenant, amount=50, payment_type='electricity')
+        Payment.objects.create(room=other_room, tenant=self.tenant, amount=900)
+
+        def ids(**params):
+            response = self.client.get('/landlord/payments/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return {p['id'] for p in response.data['results']}
+
+        self.assertEqual(ids(status='approved'), set(
+            Payment.objects.filter(status='approved').values_list('id', flat=True)))
+        self.assertEqual(ids(payment_type='electricity'), set(
+            Payment.objects.filter(payment_type='electricity').values_list('id', flat=True)))
+        self.assertEqual(ids(property=other_property.id), set(
+            Payment.objects.filter(room=other_room).values_list('id', flat=True)))
+        self.assertEqual(len(ids(room=self.room.id)), 2)
+        self.assertEqual(len(ids(date_from='2000-01-01', date_to='2999-12-31')), 3)
+        self.assertEqual(ids(date_to='2000-01-01'), set())
+
+    def test_payment_list_rejects_invalid_filters(self):
+        response = self.client.get('/landlord/payments/', {
+            'status': 'paid', 'room': 'abc', 'date_from': '01/02/2024'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'status', 'room', 'date_from'})
+
 
 
 class TenantTests(TestCase):
@@ -119,12 +703,167 @@ class TenantTests(TestCase):
             property=self.property, room_number="101", floor=1, rent=1000.00, tenant=self.tenant)
 
         self.client.force_authenticate(user=self.tenant)
+        lookup_cache.clear()
+        self.addCleanup(lookup_cache.clear)
 
     def test_view_room_details(self):
         response = self.client.get('/landlord/tenant/room/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['room_number'], '101')
 
+    def test_conditional_get_room_and_contact(self):
+        response = self.client.get('/landlord/tenant/room/')
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/tenant/room/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        contact = self.client.get('/landlord/tenant/contact/')
+        response = self.client.get('/landlord/tenant/contact/', HTTP_IF_NONE_MATCH=contact['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Editing the property or the landlord invalidates the validators
+        self.property.name = 'Renamed'
+        self.property.save()
+        response = self.client.get('/landlord/tenant/room/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['property']['name'], 'Renamed')
+        response = self.client.get('/landlord/tenant/contact/', HTTP_IF_NONE_MATCH=contact['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.landlord.email = 'new@test.com'
+        self.landlord.save()
+        response = self.client.get('/landlord/tenant/contact/', HTTP_IF_NONE_MATCH=contact['ETag'])
+        self.assertEqual(response.data['email'], 'new@test.com')
+
+    def test_lookup_cache(self):
+        self.client.get('/landlord/tenant/room/')
+        self.client.get('/landlord/tenant/contact/')
+        self.assertEqual(lookup_cache.stats(), {'hits': 1, 'misses': 3})
+
+        # Only the ETag validator hits the database once the lookups are cached
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/tenant/room/')
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(response.data['room_number'], '101')
+        self.assertEqual(lookup_cache.stats()['hits'], 3)
+
+        self.property.name = 'Renamed'
+        self.property.save()
+        self.assertEqual(self.client.get('/landlord/tenant/room/').data['property']['name'], 'Renamed')
+        self.landlord.email = 'new@test.com'
+        self.landlord.save()
+        self.assertEqual(self.client.get('/landlord/tenant/contact/').data['email'], 'new@test.com')
+        self.assertEqual(
+            self.client.get('/landlord/tenant/room/').data['property']['landlord']['email'], 'new@test.com')
+
+        # bulk_update sends no signals; the bulk view evicts both tenants itself
+        other_tenant = User.objects.create_user(
+            username='tenant2', password='password123', role=self.tenant_role, email='t2@test.com')
+        self.client.force_authenticate(user=other_tenant)
+        self.assertEqual(self.client.get('/landlord/tenant/room/').status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.landlord)
+        response = self.client.post('/landlord/assign-tenant/bulk/', {
+            'rows': [{'room_id': self.room.id, 'tenant_email': 't2@test.com'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(user=other_tenant)
+        self.assertEqual(self.client.get('/landlord/tenant/room/').data['room_number'], '101')
+        self.client.force_authenticate(user=self.tenant)
+        self.assertEqual(self.client.get('/landlord/tenant/room/').status_code, status.HTTP_404_NOT_FOUND)
+
+        # Payments read the room from the database, not the cached lookup: moving the
+        # tenant with update() leaves this process's entry stale, as another worker's would be
+        self.client.force_authenticate(user=other_tenant)
+        new_room = Room.objects.create(property=self.property, room_number='102', floor=1, rent=900)
+        Room.objects.filter(pk=self.room.pk).update(tenant=None)
+        Room.objects.filter(pk=new_room.pk).update(tenant=other_tenant)
+        self.assertEqual(self.client.get('/landlord/tenant/room/').data['room_number'], '101')
+        self.client.post('/landlord/tenant/payments/', {'amount': 100})
+        self.assertEqual(Payment.objects.get(tenant=other_tenant).room, new_room)
+
+    def test_conditional_get_lists(self):
+        CommunityMessage.objects.create(sender=self.landlord, title='Hi', content='Welcome')
+        feed = self.client.get('/landlord/community/')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/community/', HTTP_IF_NONE_MATCH=feed['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        response = self.client.get('/landlord/community/?page_size=1', HTTP_IF_NONE_MATCH=feed['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=self.landlord)
+        properties = self.client.get('/landlord/properties/')
+        response = self.client.get('/landlord/properties/', HTTP_IF_NONE_MATCH=properties['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        Property.objects.create(name="Second", address="9 St", landlord=self.landlord)
+        response = self.client.get('/landlord/properties/', HTTP_IF_NONE_MATCH=properties['ETag'])
+        self.assertEqual(len(response.data['results']), 2)
+        Property.objects.filter(name="Second").delete()
+        response = self.client.get('/landlord/properties/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_conditional_get_lists_after_delete(self):
+        from django.utils.http import http_date
+        import time
+        CommunityMessage.objects.create(sender=self.landlord, title='Old', content='Stays')
+        CommunityMessage.objects.create(sender=self.landlord, title='Gone', content='Deleted')
+        Property.objects.create(name="Second", address="9 St", landlord=self.landlord)
+        since = http_date(time.time() + 60)  # Later than every row's updated_at
+
+        for user, url, removed in (
+                (self.tenant, '/landlord/community/', CommunityMessage.objects.filter(title='Gone')),
+                (self.landlord, '/landlord/properties/', Property.objects.filter(name='Second'))):
+            self.client.force_authenticate(user=user)
+            response = self.client.get(url)
+            self.assertFalse(response.has_header('Last-Modified'))
+            removed.delete()
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), 1)
+
+    def test_complaint_flow(self):
+        for title in ('Leaking tap', 'Broken light'):
+            response = self.client.post('/landlord/tenant/complaints/', {
+                'title': title, 'description': 'Please fix', 'status': 'resolved'})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(Complaint.objects.filter(property=self.property).count(), 2)
+        response = self.client.get('/landlord/tenant/complaints/')
+        self.assertEqual([c['title'] for c in response.data['results']], ['Broken light', 'Leaking tap'])
+
+        other_property = Property.objects.create(name="Other", address="9 St", landlord=self.landlord)
+        other_room = Room.objects.create(property=other_property, room_number="201", floor=2, rent=900)
+        Complaint.objects.create(tenant=self.tenant, room=other_room, title='Noise', description='Loud')
+
+        self.client.force_authenticate(user=self.landlord)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/complaints/', {'property': self.property.id})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['results'][0]['room']['property_name'], 'Test Property')
+
+        complaint_id = response.data['results'][0]['id']
+        response = self.client.patch(f'/landlord/complaints/{complaint_id}/', {'status': 'resolved', 'title': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Complaint.objects.get(pk=complaint_id).title, 'Broken light')
+        response = self.client.get('/landlord/complaints/', {'status': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/landlord/complaints/counts/')
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(response.data, {'pending': 2, 'in_progress': 0, 'resolved': 1, 'open': 2})
+        response = self.client.get('/landlord/complaints/counts/', {'property': self.property.id})
+        self.assertEqual(response.data['open'], 1)
+
+        intruder = User.objects.create_user(username='landlord2', password='password123', role=self.admin_role)
+        self.client.force_authenticate(user=intruder)
+        response = self.client.patch(f'/landlord/complaints/{complaint_id}/', {'status': 'pending'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_pay_rent(self):
         # Note: Image upload might need mock, but basic post check:
         data = {
@@ -135,8 +874,549 @@ class TenantTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Payment.objects.count(), 1)
         self.assertEqual(Payment.objects.first().tenant, self.tenant)
+        # The landlord email is queued, not sent inside the request
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def _screenshot(self, size=(3000, 2000), color='white'):
+        from io import BytesIO
+        from PIL import Image
+        buffer = BytesIO()
+        Image.new('RGB', size, color).save(buffer, format='PNG')
+        return SimpleUploadedFile('shot.png', buffer.getvalue(), content_type='image/png')
+
+    def test_screenshot_downscaled_thumbnailed_and_deduplicated(self):
+        from PIL import Image
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            first = self.client.post('/landlord/tenant/payments/',
+                                     {'amount': 1000, 'screenshot': self._screenshot()})
+            second = self.client.post('/landlord/tenant/payments/',
+                                      {'amount': 1000, 'screenshot': self._screenshot()})
+            self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+            self.assertTrue(first.data['screenshot_thumbnail'])
+
+            payments = list(Payment.objects.order_by('id'))
+            self.assertEqual(payments[0].screenshot.name, payments[1].screenshot.name)
+            self.assertEqual(len(os.listdir(os.path.join(media_root, 'payment_screenshots'))), 2)  # image + thumbs/
+            with Image.open(payments[0].screenshot.path) as image:
+                self.assertEqual((image.format, max(image.size)), ('JPEG', 1600))
+            with Image.open(payments[0].screenshot_thumbnail.path) as image:
+                self.assertLessEqual(max(image.size), 320)
+
+    def test_corrupt_screenshot_rejected(self):
+        from io import BytesIO
+        from PIL import Image
+        buffer = BytesIO()
+        Image.effect_noise((800, 600), 64).convert('RGB').save(buffer, format='JPEG')
+        truncated = buffer.getvalue()[:len(buffer.getvalue()) // 2]
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            response = self.client.post('/landlord/tenant/payments/', {
+                'amount': 1000, 'screenshot': SimpleUploadedFile('shot.jpg', truncated, content_type='image/jpeg')})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('screenshot', response.data)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_process_screenshots_backfill(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            payment = Payment.objects.create(
+                room=self.room, tenant=self.tenant, amount=1000, screenshot=self._screenshot())
+            original = payment.screenshot.name
+            call_command('process_screenshots', '--workers', '1', '--delete-originals', stdout=StringIO())
+            payment.refresh_from_db()
+            self.assertEqual(len(payment.screenshot_hash), 64)
+            self.assertTrue(payment.screenshot_thumbnail.name.startswith('payment_screenshots/thumbs/'))
+            self.assertFalse(payment.screenshot.storage.exists(original))
+
+    def test_chunked_upload_resumes_and_attaches_document(self):
+        import hashlib
+        from landlord.models import Document
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        content = os.urandom(150_000)
+
+        with self.settings(MEDIA_ROOT=media_root):
+            response = self.client.post('/landlord/uploads/', {
+                'target': 'document', 'filename': 'lease.pdf', 'size': len(content),
+                'name': 'Lease', 'sha256': hashlib.sha256(content).hexdigest()})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            url = f"/landlord/uploads/{response.data['id']}/"
+
+            def send(offset, chunk):
+                return self.client.patch(url, chunk, content_type='application/offset+octet-stream',
+                                         HTTP_UPLOAD_OFFSET=str(offset))
+
+            self.assertEqual(send(0, content[:60_000]).data['offset'], 60_000)
+            # A retried chunk with a stale offset is refused with the offset to resume from
+            response = send(0, content[:60_000])
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+            self.assertEqual(response.data['offset'], 60_000)
+            self.assertEqual(self.client.get(url).data['offset'], 60_000)
+
+            response = send(60_000, content[60_000:])
+            self.assertEqual(response.data['status'], 'complete')
+            document = Document.objects.get(pk=response.data['document'])
+            self.assertEqual((document.name, document.tenant, document.room), ('Lease', self.tenant, self.room))
+            with document.file.open('rb') as stored:
+                self.assertEqual(stored.read(), content)
+            self.assertEqual(os.listdir(os.path.join(media_root, 'partial_uploads')), [])
+
+    def test_chunked_upload_claims_and_purge(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from landlord.models import UploadSession
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        partial_dir = os.path.join(media_root, 'partial_uploads')
+
+        with self.settings(MEDIA_ROOT=media_root):
+            response = self.client.post('/landlord/uploads/', {
+                'target': 'document', 'filename': 'lease.pdf', 'size': 10})
+            session_id = response.data['id']
+            url = f'/landlord/uploads/{session_id}/'
+
+            def send(offset, chunk):
+                return self.client.patch(url, chunk, content_type='application/offset+octet-stream',
+                                         HTTP_UPLOAD_OFFSET=str(offset))
+
+            # Another request is streaming a chunk into the session
+            UploadSession.objects.filter(pk=session_id).update(status='receiving', updated_at=timezone.now())
+            self.assertEqual(send(0, b'abcde').status_code, status.HTTP_409_CONFLICT)
+            # ... until its claim goes stale
+            UploadSession.objects.filter(pk=session_id).update(updated_at=timezone.now() - timedelta(hours=1))
+            response = send(0, b'abcde')
+            self.assertEqual((response.data['offset'], response.data['status']), (5, 'uploading'))
+
+            fresh = self.client.post('/landlord/uploads/', {
+                'target': 'document', 'filename': 'id.pdf', 'size': 10}).data['id']
+            self.client.patch(f'/landlord/uploads/{fresh}/', b'abc', content_type='application/offset+octet-stream',
+                              HTTP_UPLOAD_OFFSET='0')
+            orphan = os.path.join(partial_dir, 'orphan.part')
+            open(orphan, 'wb').close()
+            old = (timezone.now() - timedelta(days=2)).timestamp()
+            os.utime(orphan, (old, old))
+            UploadSession.objects.filter(pk=session_id).update(updated_at=timezone.now() - timedelta(days=2))
+
+            out = StringIO()
+            call_command('purge_uploads', stdout=out)
+            self.assertIn('Removed 1 abandoned upload sessions and 1 orphaned', out.getvalue())
+            self.assertEqual([str(pk) for pk in UploadSession.objects.values_list('pk', flat=True)], [fresh])
+            self.assertEqual(os.listdir(partial_dir), [f'{fresh}.part'])
+
+    def test_chunked_upload_to_vacated_room(self):
+        from landlord.models import Document
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            def start():
+                response = self.client.post('/landlord/uploads/', {
+                    'target': 'document', 'filename': 'lease.pdf', 'size': 4})
+                return f"/landlord/uploads/{response.data['id']}/"
+
+            def send(url):
+                return self.client.patch(url, b'abcd', content_type='application/offset+octet-stream',
+                                         HTTP_UPLOAD_OFFSET='0')
+
+            def stored_files():
+                return [name for _, _, names in os.walk(os.path.join(media_root, 'documents')) for name in names]
+
+            # The moved file is removed again when the Document can't be created
+            with mock.patch.object(Document.objects, 'create', side_effect=RuntimeError('db down')):
+                with self.assertRaises(RuntimeError):
+                    send(start())
+            self.assertEqual(stored_files(), [])
+
+            # The tenant moved out before the last chunk arrived
+            url = start()
+            Room.objects.filter(pk=self.room.pk).update(tenant=None)
+            response = send(url)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data['offset'], 0)
+            self.assertFalse(Document.objects.exists())
+            self.assertEqual(stored_files(), [])
+
+    def test_chunked_upload_checksum_mismatch_restarts(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            response = self.client.post('/landlord/uploads/', {
+                'target': 'document', 'filename': 'id.png', 'size': 4, 'sha256': '0' * 64})
+            url = f"/landlord/uploads/{response.data['id']}/"
+            response = self.client.patch(url, b'abcd', content_type='application/offset+octet-stream',
+                                         HTTP_UPLOAD_OFFSET='0')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self.client.get(url).data['offset'], 0)
+
+        response = self.client.post('/landlord/uploads/', {
+            'target': 'proof', 'filename': 'proof.pdf', 'size': 10})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
     def test_view_landlord_contact(self):
         response = self.client.get('/landlord/tenant/contact/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], self.landlord.username)
+
+
+@override_settings(JWT_USER_CACHE_TTL=0)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Each list endpoint stays within its QUERY_BUDGETS entry with several rows to render."""
+
+    def setUp(self):
+        admin_role = Role.objects.create(name='admin')
+        tenant_role = Role.objects.create(name='tenant')
+        self.landlord = User.objects.create_user(username='landlord1', password='password123', role=admin_role)
+        self.tenants = []
+        for number in range(3):
+            prop = Property.objects.create(name=f"Property {number}", address="1 St", landlord=self.landlord)
+            tenant = User.objects.create_user(
+                username=f'tenant{number}', password='password123', role=tenant_role)
+            room = Room.objects.create(property=prop, room_number="101", floor=1, rent=500, tenant=tenant)
+            Payment.objects.create(room=room, tenant=tenant, amount=500, status='approved')
+            Payment.objects.create(room=room, tenant=tenant, amount=100)
+            ChatMessage.objects.create(sender=tenant, receiver=self.landlord, message='Hi')
+            ChatMessage.objects.create(sender=self.landlord, receiver=tenant, message='Hello')
+            CommunityMessage.objects.create(sender=self.landlord, title='News', content='...')
+            self.tenants.append(tenant)
+        call_command('generate_rent_dues', stdout=StringIO())
+        lookup_cache.clear()
+        self.addCleanup(lookup_cache.clear)
+        self.client = APIClient()
+
+    def login(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def test_landlord_endpoints(self):
+        self.login(self.landlord)
+        tenant = self.tenants[0]
+        for view_name, url in [
+            ('landlord-properties', '/landlord/properties/'),
+            ('room-list-create', '/landlord/rooms/'),
+            ('landlord-payment-list', '/landlord/payments/'),
+            ('rent-unpaid', '/landlord/rent/unpaid/'),
+            ('rent-dashboard', '/landlord/dashboard/rent/'),
+            ('landlord-complaints', '/landlord/complaints/'),
+            ('complaint-counts', '/landlord/complaints/counts/'),
+            ('community-message-list', '/landlord/community/'),
+            ('chat', '/landlord/chat/'),
+            ('chat-conversations', '/landlord/chat/conversations/'),
+            ('chat-messages', f'/landlord/chat/conversations/{tenant.id}/messages/'),
+            ('income-analytics', '/landlord/analytics/income/'),
+            ('async-community-message-list', '/landlord/async/community/'),
+            ('async-chat-messages', f'/landlord/async/chat/conversations/{tenant.id}/messages/'),
+            ('async-income-analytics', '/landlord/async/analytics/income/'),
+        ]:
+            with self.subTest(view_name), self.assertQueryBudget(view_name):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, view_name)
+
+    def test_tenant_endpoints(self):
+        self.login(self.tenants[0])
+        for view_name, url in [
+            ('tenant-room-detail', '/landlord/tenant/room/'),
+            ('tenant-landlord-contact', '/landlord/tenant/contact/'),
+            ('tenant-payment-list', '/landlord/tenant/payments/list/'),
+            ('async-tenant-room-detail', '/landlord/async/tenant/room/'),
+            ('async-tenant-landlord-contact', '/landlord/async/tenant/contact/'),
+        ]:
+            with self.subTest(view_name), self.assertQueryBudget(view_name):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, view_name)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        lookup_cache.clear()
+        admin_role = Role.objects.create(name='admin')
+        tenant_role = Role.objects.create(name='tenant')
+        self.landlord = User.objects.create_user(
+            username='landlord1', password='password123', role=admin_role, email='landlord@test.com')
+        self.tenant = User.objects.create_user(username='tenant1', password='password123', role=tenant_role)
+        self.other = User.objects.create_user(username='tenant2', password='password123', role=tenant_role)
+        prop = Property.objects.create(name='Sunset', address='1 Road', landlord=self.landlord)
+        room = Room.objects.create(property=prop, room_number='101', floor=1, rent=1000, tenant=self.tenant)
+        Payment.objects.create(room=room, tenant=self.tenant, amount=1000, status='approved')
+        for number in range(3):
+            CommunityMessage.objects.create(sender=self.landlord, title=f'News {number}', content='...')
+            ChatMessage.objects.create(sender=self.tenant, receiver=self.landlord, message=f'Hi {number}')
+        self.client = APIClient()
+
+    def login(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def assertSameResponse(self, sync_url, async_url):
+        sync_response = self.client.get(sync_url)
+        async_response = self.client.get(async_url)
+        self.assertEqual(async_response.status_code, sync_response.status_code, async_url)
+        # Pagination links point back at the view that served them
+        self.assertEqual(async_response.content.replace(b'/landlord/async/', b'/landlord/'),
+                         sync_response.content, async_url)
+
+    def test_same_responses_as_sync_views(self):
+        self.login(self.tenant)
+        self.assertSameResponse('/landlord/tenant/room/', '/landlord/async/tenant/room/')
+        self.assertSameResponse('/landlord/tenant/contact/', '/landlord/async/tenant/contact/')
+        self.assertSameResponse('/landlord/community/?page_size=2', '/landlord/async/community/?page_size=2')
+        chat = f'chat/conversations/{self.landlord.id}/messages/'
+        self.assertSameResponse(f'/landlord/{chat}?limit=2', f'/landlord/async/{chat}?limit=2')
+        self.assertSameResponse(f'/landlord/{chat}?after=999999', f'/landlord/async/{chat}?after=999999')
+        self.assertSameResponse(f'/landlord/{chat}?after=x', f'/landlord/async/{chat}?after=x')
+        for limit in ('0', '-1'):
+            response = self.client.get(f'/landlord/async/{chat}?limit={limit}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, limit)
+            self.assertSameResponse(f'/landlord/{chat}?limit={limit}', f'/landlord/async/{chat}?limit={limit}')
+        self.login(self.landlord)
+        self.assertSameResponse('/landlord/analytics/income/', '/landlord/async/analytics/income/')
+        self.assertSameResponse('/landlord/community/?date_from=nope', '/landlord/async/community/?date_from=nope')
+
+    def test_cursor_pages(self):
+        self.login(self.tenant)
+        first = self.client.get('/landlord/async/community/?page_size=2').json()
+        second = self.client.get(first['next'].replace('/landlord/community/', '/landlord/async/community/'))
+        self.assertEqual([message['title'] for message in second.json()['results']], ['News 0'])
+
+    def test_permissions(self):
+        self.assertSameResponse('/landlord/tenant/room/', '/landlord/async/tenant/room/')
+        self.assertEqual(self.client.get('/landlord/async/tenant/room/')['WWW-Authenticate'], 'Bearer realm="api"')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer nope')
+        self.assertSameResponse('/landlord/tenant/room/', '/landlord/async/tenant/room/')
+        self.login(self.landlord)
+        self.assertSameResponse('/landlord/tenant/room/', '/landlord/async/tenant/room/')
+        self.login(self.other)  # No room
+        self.assertSameResponse('/landlord/tenant/room/', '/landlord/async/tenant/room/')
+
+    def test_conditional_get(self):
+        self.login(self.tenant)
+        response = self.client.get('/landlord/async/tenant/room/')
+        self.assertIn('ETag', response)
+        repeat = self.client.get('/landlord/async/tenant/room/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(repeat.content, b'')
+        # The feed, like its sync view, has an ETag but no Last-Modified
+        feed = self.client.get('/landlord/async/community/')
+        self.assertIn('ETag', feed)
+        self.assertNotIn('Last-Modified', feed)
+
+    async def test_served_by_async_client(self):
+        from django.test import AsyncClient
+
+        response = await AsyncClient().get(
+            '/landlord/async/tenant/room/', headers={'Authorization': f'Bearer {AccessToken.for_user(self.tenant)}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['room_number'], '101')
+        self.assertEqual(response.json()['property']['landlord']['email'], 'landlord@test.com')
+
+    async def test_metrics_count_async_queries(self):
+        from django.test import AsyncClient
+        from apartment.metrics import registry
+
+        registry.reset()
+        self.addCleanup(registry.reset)
+        await AsyncClient().get(
+            '/landlord/async/analytics/income/', headers={'Authorization': f'Bearer {AccessToken.for_user(self.landlord)}'})
+        # User lookup and the income query, run on the async ORM's thread
+        self.assertEqual(registry.snapshot()['async-income-analytics']['queries']['max'], 2)
+
+
+class SyntheticDataTests(TestCase):
+    def test_generate_and_benchmark(self):
+        call_command('generate_synthetic_data', '--landlords', '2', '--properties', '2', '--rooms', '5',
+                     '--months', '3', '--chat', '4', '--occupancy', '1', stdout=StringIO())
+        self.assertEqual(Room.objects.filter(tenant__isnull=False).count(), 20)
+        self.assertEqual(Payment.objects.filter(payment_type='rent').count(), 60)
+        self.assertEqual(ChatMessage.objects.count(), 80)
+        self.assertEqual(RentDue.objects.count(), 60)
+        self.assertTrue(MonthlyIncome.objects.exists())
+        self.assertEqual(Payment.objects.dates('date', 'month').count(), 3)
+        with self.assertRaises(CommandError):
+            call_command('generate_synthetic_data', '--landlords', '1', stdout=StringIO())
+
+        baseline = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(baseline))
+        args = ['--iterations', '2', '--warmup', '0', '--baseline', baseline,
+                '--only', 'landlord-payment-list', 'tenant-room-detail', 'rent-reminders', 'login']
+        call_command('benchmark', *args, '--save-baseline', stdout=StringIO())
+        with open(baseline) as f:
+            results = json.load(f)
+        self.assertEqual(set(results), {'landlord-payment-list', 'tenant-room-detail', 'rent-reminders', 'login'})
+        self.assertEqual(results['landlord-payment-list']['status'], [200])
+        self.assertEqual(results['rent-reminders']['status'], [202])
+        self.assertGreater(results['landlord-payment-list']['peak_kb'], 0)
+        # Write endpoints are rolled back
+        self.assertFalse(ReminderJob.objects.exists())
+
+        results['landlord-payment-list']['queries'] = 0
+        with open(baseline, 'w') as f:
+            json.dump(results, f)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('benchmark', *args, '--check', stdout=out)
+        self.assertIn('landlord-payment-list: 0 ->', out.getvalue())
+
+
+class AsyncBenchmarkTests(TransactionTestCase):
+    """The benchmark's requests run on their own threads and connections, so the data must be committed."""
+
+    def test_benchmark_async(self):
+        call_command('generate_synthetic_data', '--landlords', '1', '--properties', '1', '--rooms', '3',
+                     '--months', '2', '--chat', '2', '--occupancy', '1', stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_async', '--clients', '3', '--requests', '2',
+                     '--only', 'tenant-room-detail', 'chat-messages', stdout=out)
+        lines = out.getvalue().splitlines()
+        for name in ('tenant-room-detail', 'chat-messages'):
+            rows = [line.split() for line in lines if line.startswith(name)]
+            self.assertEqual([row[1] for row in rows], ['sync', 'async', 'async/sync'])
+            self.assertEqual([row[-1] for row in rows[:2]], ['200', '200'])
+        with self.assertRaises(CommandError):
+            call_command('benchmark_async', '--only', 'login', stdout=StringIO())
+
+
+class RealtimeTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_role = Role.objects.create(name='admin')
+        self.tenant_role = Role.objects.create(name='tenant')
+        self.landlord = User.objects.create_user(
+            username='landlord1', password='password123', role=self.admin_role)
+        self.tenant = User.objects.create_user(
+            username='tenant1', password='password123', role=self.tenant_role)
+        self.token = str(AccessToken.for_user(self.tenant))
+
+    def subscribe(self, channel):
+        events = []
+        get_broker().subscribe(channel, events.append)
+        self.addCleanup(get_broker().unsubscribe, channel, events.append)
+        return events
+
+    def test_events_published_on_commit(self):
+        tenant_events = self.subscribe(user_channel(self.tenant.id))
+        landlord_events = self.subscribe(user_channel(self.landlord.id))
+        community_events = self.subscribe(COMMUNITY_CHANNEL)
+
+        self.client.force_authenticate(user=self.landlord)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/landlord/chat/', {'receiver': self.tenant.id, 'message': 'Hello'})
+            self.client.post('/landlord/community/add/', {'title': 'Meeting', 'content': 'Sunday'})
+        self.assertEqual([e['type'] for e in tenant_events], ['chat.message'])
+        self.assertEqual(tenant_events[0]['data']['message'], 'Hello')
+        self.assertEqual([e['type'] for e in landlord_events], ['chat.message'])
+        self.assertEqual(community_events[0]['data']['title'], 'Meeting')
+
+        self.client.force_authenticate(user=self.tenant)
+        message_id = tenant_events[0]['data']['id']
+        self.client.post(f'/landlord/chat/conversations/{self.landlord.id}/read/', {'up_to': message_id})
+        self.assertEqual(landlord_events[-1], {
+            'type': 'chat.read', 'data': {'reader': self.tenant.id, 'up_to': message_id}})
+
+    async def test_websocket_push(self):
+        communicator = ApplicationCommunicator(websocket_application, {
+            'type': 'websocket', 'path': '/ws/', 'query_string': f'token={self.token}'.encode()})
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await communicator.receive_output(2))['type'], 'websocket.accept')
+
+        publish(user_channel(self.tenant.id), 'chat.message', {'message': 'Hi'})
+        publish(user_channel(self.landlord.id), 'chat.message', {'message': 'Not for you'})
+        publish(COMMUNITY_CHANNEL, 'community.message', {'title': 'Notice'})
+        first = json.loads((await communicator.receive_output(2))['text'])
+        second = json.loads((await communicator.receive_output(2))['text'])
+        self.assertEqual(first, {'type': 'chat.message', 'data': {'message': 'Hi'}})
+        self.assertEqual(second['type'], 'community.message')
+
+        await communicator.send_input({'type': 'websocket.receive', 'text': 'ping'})
+        self.assertEqual((await communicator.receive_output(2))['text'], 'pong')
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(2)
+        self.assertEqual(get_broker().subscriber_count(user_channel(self.tenant.id)), 0)
+
+    async def test_websocket_rejects_bad_token(self):
+        communicator = ApplicationCommunicator(websocket_application, {
+            'type': 'websocket', 'path': '/ws/', 'query_string': b'token=nope'})
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual(await communicator.receive_output(2), {'type': 'websocket.close', 'code': 4401})
+
+
+@skipUnless('replica' in settings.DATABASES, 'Run with --settings=apartment.settings_test')
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """'replica' is the stand-in database from apartment.settings_test; it holds only what the test copies into it."""
+
+    # Plain settings have no 'replica' (the class is skipped then); don't make the runner set it up
+    databases = {'default', 'replica'} & set(settings.DATABASES)
+
+    def setUp(self):
+        lookup_cache.clear()  # Also clears the replica pins: same cache
+        self.client = APIClient()
+        admin_role = Role.objects.create(name='admin')
+        tenant_role = Role.objects.create(name='tenant')
+        self.landlord = User.objects.create_user(username='landlord1', password='password123', role=admin_role)
+        self.tenant = User.objects.create_user(username='tenant1', password='password123', role=tenant_role)
+        prop = Property.objects.create(name='Sunset', address='1 Road', landlord=self.landlord)
+        self.room = Room.objects.create(property=prop, room_number='101', floor=1, rent=1000, tenant=self.tenant)
+        # Replication lags: the replica has the landlord (the feed's sender) but not the tenant yet
+        Role.objects.using('replica').bulk_create([admin_role])
+        User.objects.using('replica').bulk_create([self.landlord])
+        CommunityMessage.objects.create(sender=self.landlord, title='Primary', content='Written just now')
+        CommunityMessage.objects.using('replica').create(sender=self.landlord, title='Replica', content='Lagging')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.tenant)}')
+
+    def feed(self):
+        response = self.client.get('/landlord/community/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [message['title'] for message in response.data['results']]
+
+    @override_settings(JWT_USER_CACHE_TTL=60)
+    def test_opted_in_view_reads_replica(self):
+        from apartment.authentication import user_cache
+        user_cache.clear()
+        self.assertEqual(self.feed(), ['Replica'])
+        # The requesting user is loaded, and cached, from the primary
+        self.assertEqual(user_cache.get(self.tenant.pk)._state.db, 'default')
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.feed(), ['Primary'])
+
+    async def test_async_view_authenticates_against_primary(self):
+        from django.test import AsyncClient
+        from apartment.authentication import user_cache
+
+        user_cache.clear()
+        response = await AsyncClient().get(
+            '/landlord/async/community/', headers={'Authorization': f'Bearer {AccessToken.for_user(self.tenant)}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([message['title'] for message in response.json()['results']], ['Replica'])
+
+    def test_other_views_read_primary(self):
+        # The replica has no rooms
+        response = self.client.get('/landlord/tenant/room/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['room_number'], '101')
+
+    def test_user_reads_own_writes(self):
+        response = self.client.post('/landlord/tenant/complaints/', {
+            'room': self.room.id, 'title': 'Leak', 'description': 'Kitchen sink'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.feed(), ['Primary'])
+        # Other users still read the replica
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.landlord)}')
+        self.assertEqual(self.feed(), ['Replica'])
+
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post('/landlord/tenant/complaints/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.feed(), ['Replica'])
+
+    def test_router(self):
+        from apartment.replicas import ReplicaRouter, use_primary, use_replica
+
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(CommunityMessage), 'default')
+        with use_replica():
+            self.assertEqual(router.db_for_read(CommunityMessage), 'replica')
+            self.assertEqual(router.db_for_write(CommunityMessage), 'default')
+            with use_primary():
+                self.assertEqual(router.db_for_read(CommunityMessage), 'default')
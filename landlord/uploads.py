@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+from .models import Document, LandlordProfile, Room
+
+READ_SIZE = 64 * 1024
+MAX_CACHED_HASHERS = 1000
+
+# Running SHA-256 per upload session, keyed by session id, as (offset, hasher).
+# hashlib objects can't be stored in the database, so they live in the worker
+# that received the previous chunk; another worker catches up from disk once.
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+class ChecksumMismatch(Exception):
+    pass
+
+
+class RoomVacated(Exception):
+    """The document's room lost its tenant before the upload finished."""
+
+
+def upload_dir():
+    return getattr(settings, 'CHUNKED_UPLOAD_DIR', None) or os.path.join(settings.MEDIA_ROOT, 'partial_uploads')
+
+
+def partial_path(session):
+    return os.path.join(upload_dir(), f'{session.pk}.part')
+
+
+def _take_hasher(session, path):
+    with _hashers_lock:
+        entry = _hashers.pop(session.pk, None)
+    if entry is not None and entry[0] == session.offset:
+        return entry[1]
+    hasher = hashlib.sha256()
+    if session.offset:
+        with open(path, 'rb') as partial:
+            remaining = session.offset
+            while remaining:
+                data = partial.read(min(READ_SIZE, remaining))
+                if not data:
+                    break
+                hasher.update(data)
+                remaining -= len(data)
+    return hasher
+
+
+def _keep_hasher(session, hasher):
+    with _hashers_lock:
+        _hashers[session.pk] = (session.offset, hasher)
+        while len(_hashers) > MAX_CACHED_HASHERS:
+            _hashers.popitem(last=False)
+
+
+def discard(session):
+    with _hashers_lock:
+        _hashers.pop(session.pk, None)
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def append_chunk(session, stream, length):
+    """
+    Copy ``length`` bytes from ``stream`` to the end of the session's partial
+    file, hashing as they are written, and advance ``session.offset``.
+
+    Bytes past the stored offset (left by an interrupted request) are dropped
+    first. A short read keeps what arrived so the client can resume from the
+    returned offset. The caller saves the session.
+    """
+    path = partial_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    hasher = _take_hasher(session, path)
+
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as partial:
+        partial.seek(session.offset)
+        partial.truncate()
+        remaining = length
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            partial.write(data)
+            hasher.update(data)
+            remaining -= len(data)
+
+    session.offset += length - remaining
+    _keep_hasher(session, hasher)
+    return hasher
+
+
+def _move_into_storage(path, field, filename):
+    storage = field.storage
+    name = storage.get_available_name(field.generate_filename(None, filename))
+    if isinstance(storage, FileSystemStorage):
+        # Same disk: a rename, the bytes are never read again
+        target = storage.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        return name
+    with open(path, 'rb') as partial:
+        name = storage.save(name, File(partial))
+    os.remove(path)
+    return name
+
+
+def finalize(session, hasher):
+    """
+    Verify the checksum and attach the finished file to its Document or LandlordProfile.
+
+    Call inside a transaction: a document's room is locked and must still have
+    a tenant, checked before the file is moved into storage.
+    """
+    digest = hasher.hexdigest()
+    if session.sha256 and digest != session.sha256.lower():
+        raise ChecksumMismatch(digest)
+    session.sha256 = digest
+
+    path = partial_path(session)
+    if session.target == 'document':
+        tenant_id = Room.objects.select_for_update().values_list('tenant_id', flat=True).get(pk=session.room_id)
+        if tenant_id is None:
+            raise RoomVacated(session.room_id)
+        field = Document._meta.get_field('file')
+        name = _move_into_storage(path, field, session.filename)
+        try:
+            session.document = Document.objects.create(
+                room=session.room,
+                tenant_id=tenant_id,
+                name=session.document_name or session.filename[:100],
+                file=name,
+            )
+        except Exception:
+            field.storage.delete(name)
+            raise
+    else:
+        field = LandlordProfile._meta.get_field('proof')
+        name = _move_into_storage(path, field, session.filename)
+        try:
+            profile, _ = LandlordProfile.objects.get_or_create(user=session.user)
+            profile.proof = name
+            profile.save(update_fields=['proof', 'updated_at'])
+        except Exception:
+            field.storage.delete(name)
+            raise
+
+    with _hashers_lock:
+        _hashers.pop(session.pk, None)
+    session.status = 'complete'
+
+
+def purge_abandoned_uploads(older_than):
+    """
+    Delete unfinished sessions idle since before ``older_than`` with their
+    partial files, then any ``.part`` file older than that with no session.
+    Returns ``(sessions, files)`` removed.
+    """
+    from .models import UploadSession
+
+    abandoned = list(UploadSession.objects.exclude(status='complete').filter(updated_at__lt=older_than).only('pk'))
+    UploadSession.objects.filter(pk__in=[session.pk for session in abandoned]).delete()
+    for session in abandoned:
+        discard(session)
+
+    files = 0
+    directory = upload_dir()
+    if os.path.isdir(directory):
+        live = {f'{pk}.part' for pk in UploadSession.objects.values_list('pk', flat=True)}
+        cutoff = older_than.timestamp()
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.part') and entry.name not in live and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                files += 1
+    return len(abandoned), files
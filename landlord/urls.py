@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import PropertyListCreateView, PropertyRetrieveUpdateView, RoomListCreateView, RoomDetailView, TenantRoomDetailView, TenantPaymentCreateView, TenantPaymentListView, LandlordPaymentListView, LandlordPaymentDetailView, AssignTenantView, ElectricityBillCreateView, TenantElectricityBillListView, CommunityMessageCreateView, CommunityMessageListView, LandlordContactView, ChatView, IncomeAnalyticsView
+from .async_views import AsyncChatMessageSyncView, AsyncCommunityMessageListView, AsyncIncomeAnalyticsView, AsyncLandlordContactView, AsyncTenantRoomDetailView
+from .views import PropertyListCreateView, PropertyRetrieveUpdateView, RoomListCreateView, RoomDetailView, TenantRoomDetailView, TenantPaymentCreateView, TenantPaymentListView, LandlordPaymentListView, LandlordPaymentDetailView, UnpaidRentListView, RentReminderView, RentReminderJobView, TenantComplaintListCreateView, LandlordComplaintListView, LandlordComplaintDetailView, ComplaintCountsView, AssignTenantView, BulkRoomCreateView, BulkAssignTenantView, ElectricityBillCreateView, ElectricityBillRunView, ChunkedUploadCreateView, ChunkedUploadView, PaymentExportView, ElectricityBillExportView, TenantElectricityBillListView, CommunityMessageCreateView, CommunityMessageListView, LandlordContactView, ChatView, ChatConversationListView, ChatMessageSyncView, ChatMarkReadView, IncomeAnalyticsView, RentDashboardView
 
 urlpatterns = [
     path('properties/', PropertyListCreateView.as_view(),
@@ -8,15 +9,35 @@ urlpatterns = [
          name='landlord-property-detail'),
     path('rooms/', RoomListCreateView.as_view(), name='room-list-create'),
     path('rooms/<int:pk>/', RoomDetailView.as_view(), name='room-detail'),
+    path('rooms/bulk/', BulkRoomCreateView.as_view(), name='room-bulk-create'),
     path('assign-tenant/', AssignTenantView.as_view(), name='assign-tenant'),
+    path('assign-tenant/bulk/', BulkAssignTenantView.as_view(), name='assign-tenant-bulk'),
     path('tenant/room/', TenantRoomDetailView.as_view(), name='tenant-room-detail'),
     path('tenant/payments/', TenantPaymentCreateView.as_view(), name='tenant-payment-create'),
     path('tenant/payments/list/', TenantPaymentListView.as_view(), name='tenant-payment-list'),
     path('payments/', LandlordPaymentListView.as_view(), name='landlord-payment-list'),
     path('payments/<int:pk>/', LandlordPaymentDetailView.as_view(), name='landlord-payment-detail'),
-    
+    path('rent/unpaid/', UnpaidRentListView.as_view(), name='rent-unpaid'),
+    path('rent/reminders/', RentReminderView.as_view(), name='rent-reminders'),
+    path('rent/reminders/<int:pk>/', RentReminderJobView.as_view(), name='rent-reminder-job'),
+
+    # Complaints
+    path('tenant/complaints/', TenantComplaintListCreateView.as_view(), name='tenant-complaints'),
+    path('complaints/', LandlordComplaintListView.as_view(), name='landlord-complaints'),
+    path('complaints/counts/', ComplaintCountsView.as_view(), name='complaint-counts'),
+    path('complaints/<int:pk>/', LandlordComplaintDetailView.as_view(), name='landlord-complaint-detail'),
+
+    # Resumable uploads (documents, landlord proof)
+    path('uploads/', ChunkedUploadCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', ChunkedUploadView.as_view(), name='upload-detail'),
+
+    # Exports
+    path('export/payments/', PaymentExportView.as_view(), name='payment-export'),
+    path('export/electricity/', ElectricityBillExportView.as_view(), name='electricity-export'),
+
     # Electricity
     path('electricity/add/', ElectricityBillCreateView.as_view(), name='electricity-bill-create'),
+    path('electricity/run/', ElectricityBillRunView.as_view(), name='electricity-bill-run'),
     path('tenant/electricity/', TenantElectricityBillListView.as_view(), name='tenant-electricity-list'),
 
     # Community
@@ -28,10 +49,21 @@ urlpatterns = [
 
     # Chat
     path('chat/', ChatView.as_view(), name='chat'),
+    path('chat/conversations/', ChatConversationListView.as_view(), name='chat-conversations'),
+    path('chat/conversations/<int:user_id>/messages/', ChatMessageSyncView.as_view(), name='chat-messages'),
+    path('chat/conversations/<int:user_id>/read/', ChatMarkReadView.as_view(), name='chat-mark-read'),
 
 
 
 
     # Analytics
     path('analytics/income/', IncomeAnalyticsView.as_view(), name='income-analytics'),
+    path('dashboard/rent/', RentDashboardView.as_view(), name='rent-dashboard'),
+
+    # Async variants of the hot read paths (same responses; see async_views.py)
+    path('async/tenant/room/', AsyncTenantRoomDetailView.as_view(), name='async-tenant-room-detail'),
+    path('async/tenant/contact/', AsyncLandlordContactView.as_view(), name='async-tenant-landlord-contact'),
+    path('async/chat/conversations/<int:user_id>/messages/', AsyncChatMessageSyncView.as_view(), name='async-chat-messages'),
+    path('async/community/', AsyncCommunityMessageListView.as_view(), name='async-community-message-list'),
+    path('async/analytics/income/', AsyncIncomeAnalyticsView.as_view(), name='async-income-analytics'),
 ]
@@ -1,29 +1,52 @@
 from django.shortcuts import render
 from django.db import models # Import models for Q objects
+from django.db import IntegrityError, transaction
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 from superadmin.models import User
 from .models import LandlordProfile
 from rest_framework import generics, permissions
-from .serializers import PropertySerializer, RoomSerializer, RoomDetailTenantSerializer, PaymentSerializer, PaymentListSerializer, AssignTenantSerializer, ElectricityBillSerializer, CommunityMessageSerializer, ChatMessageSerializer
-from .models import Property, Room, Payment, ElectricityBill, CommunityMessage, ChatMessage
-from rest_framework.exceptions import PermissionDenied
+from .serializers import PropertySerializer, RoomSerializer, RoomDetailTenantSerializer, PaymentSerializer, PaymentListSerializer, AssignTenantSerializer, ElectricityBillSerializer, CommunityMessageSerializer, ChatMessageSerializer, ChatMarkReadSerializer, BulkRoomRowSerializer, UploadSessionSerializer, BillRunSerializer, RentDueSerializer, RentReminderSerializer, ComplaintSerializer, ComplaintListSerializer
+from .models import Property, Room, RoomType, Payment, ElectricityBill, CommunityMessage, ChatMessage, MonthlyIncome, UploadSession, RentDue, ReminderJob, Complaint
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Greatest, Now
 from .permissions import IsLandlord, IsTenant
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from .pagination import IdCursorPagination, PaymentCursorPagination, ElectricityBillCursorPagination, CreatedAtCursorPagination, TimestampCursorPagination
+from .filters import QueryParamFilterBackend
+from .parsers import CSVParser, read_csv_rows
+from .exports import EXPORTS, export_queryset, export_rows, stream_csv
+from .uploads import ChecksumMismatch, RoomVacated, append_chunk, discard, finalize
+from .billing import BillRunError, run_electricity_bills
+from .reminders import ReminderError, job_progress, send_rent_reminders
+from .conditional import ConditionalGetMixin
+from .lookups import get_landlord_contact, get_room_detail, get_tenant_room, invalidate_rooms
+from apartment.realtime import publish, user_channel
 
 
 
 
 
-class PropertyListCreateView(generics.ListCreateAPIView):
+class PropertyListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAuthenticated, IsLandlord]
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         return Property.objects.filter(landlord=self.request.user)
 
+    def get_validators(self, request):
+        # The count catches deletes, max(updated_at) catches inserts and edits.
+        # No Last-Modified: a delete leaves max(updated_at) where it was
+        stats = Property.objects.filter(landlord=request.user).aggregate(
+            count=Count('id'), last=Max('updated_at'))
+        return (stats['count'], stats['last']), None
+
     def perform_create(self, serializer):
         serializer.save(landlord=self.request.user)
 
@@ -39,6 +62,9 @@ class PropertyRetrieveUpdateView(generics.RetrieveUpdateAPIView):
 class RoomListCreateView(generics.ListCreateAPIView):
     serializer_class = RoomSerializer
     permission_classes = [permissions.IsAuthenticated, IsLandlord]
+    pagination_class = IdCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {'property': 'property'}
 
     def get_queryset(self):
         return Room.objects.filter(property__landlord=self.request.user)
@@ -59,16 +85,22 @@ class RoomDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Room.objects.filter(property__landlord=self.request.user)
 
 
-class TenantRoomDetailView(APIView):
+class TenantRoomDetailView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated, IsTenant]
 
+    def get_validators(self, request):
+        # Same room as user.rooms.first(); the body shows room, property and landlord
+        row = Room.objects.filter(tenant=request.user).order_by('pk').values_list(
+            'id', 'updated_at', 'property__updated_at', 'property__landlord__updated_at').first()
+        if row is None:
+            return None
+        return row, max(row[1:])
+
     def get(self, request):
-        user = request.user
-        room = user.rooms.first()
-        if not room:
+        lookup = get_tenant_room(request.user)
+        if lookup is None:
             return Response({'detail': 'No room assigned.'}, status=404)
-        serializer = RoomDetailTenantSerializer(room)
-        return Response(serializer.data)
+        return Response(get_room_detail(lookup['room']))
 
 
 class TenantPaymentCreateView(generics.CreateAPIView):
@@ -76,11 +108,17 @@ class TenantPaymentCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated, IsTenant]
 
     def perform_create(self, serializer):
-        serializer.save()
+        # The landlord notification is written to the outbox in this transaction
+        with transaction.atomic():
+            serializer.save()
 
 class TenantPaymentListView(generics.ListAPIView):
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated, IsTenant]
+    pagination_class = PaymentCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {'status': 'status', 'payment_type': 'payment_type'}
+    date_filter_field = 'date'
 
     def get_queryset(self):
         return Payment.objects.filter(tenant=self.request.user).order_by('-date')
@@ -88,16 +126,90 @@ class TenantPaymentListView(generics.ListAPIView):
 class LandlordPaymentListView(generics.ListAPIView):
     serializer_class = PaymentListSerializer
     permission_classes = [IsAuthenticated, IsLandlord]
+    read_replica = True
+    pagination_class = PaymentCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {
+        'status': 'status',
+        'payment_type': 'payment_type',
+        'property': 'room__property',
+        'room': 'room',
+    }
+    date_filter_field = 'date'
+
+    def get_queryset(self):
+        # PaymentListSerializer reads tenant, room and room.property for every row
+        return Payment.objects.filter(
+            room__property__landlord=self.request.user
+        ).select_related('tenant', 'room__property').order_by('-date')
+
+class UnpaidRentListView(generics.ListAPIView):
+    serializer_class = RentDueSerializer
+    permission_classes = [IsAuthenticated, IsLandlord]
+    pagination_class = IdCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {'property': 'room__property', 'room': 'room'}
+
+    def get_month(self):
+        from datetime import date
+        from django.utils import timezone
+
+        value = self.request.query_params.get('month')
+        if not value:
+            return timezone.localdate().replace(day=1)
+        try:
+            year, month = (int(part) for part in value.split('-'))
+            return date(year, month, 1)
+        except ValueError:
+            raise ValidationError({'month': ['Use the YYYY-MM format.']})
 
     def get_queryset(self):
-        return Payment.objects.filter(room__property__landlord=self.request.user).order_by('-date')
+        # Served by the (landlord, month, status) index
+        return RentDue.objects.filter(
+            landlord=self.request.user,
+            month=self.get_month(),
+            status__in=['unpaid', 'partial'],
+        ).select_related('room__property', 'tenant')
+
+
+class RentReminderView(APIView):
+    permission_classes = [IsAuthenticated, IsLandlord]
+
+    def post(self, request):
+        serializer = RentReminderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            job = send_rent_reminders(
+                request.user,
+                data['month'],
+                tenant_ids=data.get('tenants'),
+                property_id=data.get('property'),
+                message=data['message'],
+            )
+        except ReminderError as exc:
+            return Response({'detail': str(exc)}, status=400)
+        return Response(job_progress(job), status=202)
+
+
+class RentReminderJobView(APIView):
+    permission_classes = [IsAuthenticated, IsLandlord]
+
+    def get(self, request, pk):
+        job = ReminderJob.objects.filter(pk=pk, landlord=request.user).first()
+        if job is None:
+            return Response({'detail': 'Not found.'}, status=404)
+        return Response(job_progress(job))
+
 
 class LandlordPaymentDetailView(generics.RetrieveUpdateAPIView):
     serializer_class = PaymentListSerializer
     permission_classes = [IsAuthenticated, IsLandlord]
 
     def get_queryset(self):
-        return Payment.objects.filter(room__property__landlord=self.request.user)
+        return Payment.objects.filter(
+            room__property__landlord=self.request.user
+        ).select_related('tenant', 'room__property')
 
     def patch(self, request, *args, **kwargs):
         payment = self.get_object()
@@ -111,6 +223,61 @@ class LandlordPaymentDetailView(generics.RetrieveUpdateAPIView):
         return Response({'detail': 'Invalid status.'}, status=400)
 
 
+class TenantComplaintListCreateView(generics.ListCreateAPIView):
+    serializer_class = ComplaintSerializer
+    permission_classes = [IsAuthenticated, IsTenant]
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {'status': 'status'}
+
+    def get_queryset(self):
+        return Complaint.objects.filter(tenant=self.request.user)
+
+    def perform_create(self, serializer):
+        room = self.request.user.rooms.first()
+        if room is None:
+            raise ValidationError({'room': ['No room assigned.']})
+        serializer.save(tenant=self.request.user, room=room)
+
+
+class LandlordComplaintListView(generics.ListAPIView):
+    serializer_class = ComplaintListSerializer
+    permission_classes = [IsAuthenticated, IsLandlord]
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {'status': 'status', 'property': 'property', 'room': 'room'}
+    date_filter_field = 'created_at'
+
+    def get_queryset(self):
+        # Served by complaint_queue_idx (property, status, -created_at)
+        return Complaint.objects.filter(
+            property__landlord=self.request.user
+        ).select_related('tenant', 'room__property')
+
+
+class LandlordComplaintDetailView(generics.RetrieveUpdateAPIView):
+    serializer_class = ComplaintListSerializer
+    permission_classes = [IsAuthenticated, IsLandlord]
+
+    def get_queryset(self):
+        return Complaint.objects.filter(
+            property__landlord=self.request.user
+        ).select_related('tenant', 'room__property')
+
+
+class ComplaintCountsView(APIView):
+    permission_classes = [IsAuthenticated, IsLandlord]
+    filter_fields = {'property': 'property'}
+
+    def get(self, request):
+        complaints = QueryParamFilterBackend().filter_queryset(
+            request, Complaint.objects.filter(property__landlord=request.user), self)
+        counts = dict(complaints.order_by().values_list('status').annotate(n=Count('id')))
+        data = {status: counts.get(status, 0) for status, _ in Complaint.STATUS_CHOICES}
+        data['open'] = sum(data[status] for status in Complaint.OPEN_STATUSES)
+        return Response(data)
+
+
 class AssignTenantView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsLandlord]
 
@@ -140,6 +307,320 @@ class AssignTenantView(APIView):
         return Response(serializer.errors, status=400)
 
 
+MAX_BULK_ROWS = 1000
+
+
+def get_bulk_rows(request):
+    """Rows of a bulk request: a JSON array (or {"rows": [...]}), a text/csv body or a CSV upload named "file"."""
+    if 'file' in request.FILES:
+        rows = read_csv_rows(request.FILES['file'])
+    else:
+        rows = request.data.get('rows') if isinstance(request.data, dict) else request.data
+    if not isinstance(rows, list) or not rows:
+        raise ValidationError({'detail': 'Send a non-empty list of rows as JSON or CSV.'})
+    if len(rows) > MAX_BULK_ROWS:
+        raise ValidationError({'detail': f'At most {MAX_BULK_ROWS} rows per request.'})
+    return rows
+
+
+def validate_bulk_rows(rows, serializer_class):
+    """Field-level validation of every row; returns ([(row_number, data)], {row_number: errors})."""
+    valid, errors = [], {}
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors[number] = {'non_field_errors': ['Expected an object.']}
+            continue
+        serializer = serializer_class(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors[number] = serializer.errors
+    return valid, errors
+
+
+def bulk_error_response(errors):
+    return Response(
+        {'errors': [{'row': number, 'errors': errors[number]} for number in sorted(errors)]},
+        status=400)
+
+
+def existing_room_numbers(property_ids, valid):
+    return set(Room.objects.filter(
+        property_id__in=property_ids, room_number__in={data['room_number'] for _, data in valid}
+    ).values_list('property_id', 'room_number'))
+
+
+class BulkRoomCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsLandlord]
+    parser_classes = [JSONParser, CSVParser, MultiPartParser]
+
+    def post(self, request):
+        valid, errors = validate_bulk_rows(get_bulk_rows(request), BulkRoomRowSerializer)
+
+        # Ownership, room types and existing room numbers checked with one query each
+        property_ids = {data['property'] for _, data in valid}
+        owned = set(Property.objects.filter(
+            landlord=request.user, id__in=property_ids).values_list('id', flat=True))
+        room_types = set(RoomType.objects.filter(
+            id__in={data['type'] for _, data in valid if data.get('type')}).values_list('id', flat=True))
+        existing = existing_room_numbers(owned, valid)
+
+        seen = set()
+        for number, data in valid:
+            row_errors = {}
+            if data['property'] not in owned:
+                row_errors['property'] = ['Property not found or does not belong to you.']
+            if data.get('type') and data['type'] not in room_types:
+                row_errors['type'] = ['Room type not found.']
+            key = (data['property'], data['room_number'])
+            if key in existing:
+                row_errors['room_number'] = ['Room number already exists in this property.']
+            elif key in seen:
+                row_errors['room_number'] = ['Duplicate room number in this batch.']
+            seen.add(key)
+            if row_errors:
+                errors[number] = row_errors
+
+        if errors:
+            return bulk_error_response(errors)
+
+        try:
+            with transaction.atomic():
+                created = Room.objects.bulk_create([
+                    Room(
+                        property_id=data['property'],
+                        room_number=data['room_number'],
+                        floor=data['floor'],
+                        type_id=data.get('type'),
+                        rent=data['rent'],
+                    )
+                    for _, data in valid
+                ], batch_size=500)
+                # room_count never drops below the rooms that actually exist
+                room_totals = Room.objects.filter(
+                    property=OuterRef('pk')
+                ).order_by().values('property').annotate(total=Count('id')).values('total')
+                Property.objects.filter(id__in=property_ids).update(
+                    room_count=Greatest('room_count', Subquery(room_totals)), updated_at=Now())
+        except IntegrityError:
+            # Another request added some of these room numbers after the check above
+            existing = existing_room_numbers(owned, valid)
+            return bulk_error_response({
+                number: {'room_number': ['Room number already exists in this property.']}
+                for number, data in valid if (data['property'], data['room_number']) in existing
+            } or {number: {'non_field_errors': ['Row could not be saved.']} for number, _ in valid})
+
+        return Response({'created': len(created)}, status=201)
+
+
+class BulkAssignTenantView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsLandlord]
+    parser_classes = [JSONParser, CSVParser, MultiPartParser]
+
+    def post(self, request):
+        valid, errors = validate_bulk_rows(get_bulk_rows(request), AssignTenantSerializer)
+
+        rooms = Room.objects.filter(
+            property__landlord=request.user, id__in={data['room_id'] for _, data in valid}
+        ).in_bulk()
+        tenants = {}
+        for email, user_id, username in User.objects.filter(
+            email__in={data['tenant_email'] for _, data in valid}
+        ).values_list('email', 'id', 'username'):
+            tenants.setdefault(email, []).append((user_id, username))
+
+        seen = set()
+        assignments = []
+        for number, data in valid:
+            row_errors = {}
+            room = rooms.get(data['room_id'])
+            matches = tenants.get(data['tenant_email'], [])
+            if room is None:
+                row_errors['room_id'] = ['Room not found or does not belong to you.']
+            elif data['room_id'] in seen:
+                row_errors['room_id'] = ['Room appears more than once in this batch.']
+            if not matches:
+                row_errors['tenant_email'] = ['Tenant not found.']
+            elif len(matches) > 1:
+                row_errors['tenant_email'] = ['More than one user has this email.']
+            seen.add(data['room_id'])
+            if row_errors:
+                errors[number] = row_errors
+            else:
+                assignments.append((room, matches[0][0]))
+
+        if errors:
+            return bulk_error_response(errors)
+
+        from django.utils import timezone
+
+        now = timezone.now()
+        for room, tenant_id in assignments:
+            room.tenant_id = tenant_id
+            room.updated_at = now  # bulk_update skips auto_now
+        with transaction.atomic():
+            Room.objects.bulk_update(
+                [room for room, _ in assignments], ['tenant', 'updated_at'], batch_size=500)
+            # bulk_update sends no post_save
+            invalidate_rooms([room for room, _ in assignments])
+        return Response({'assigned': len(assignments)})
+
+
+class CSVStreamRenderer(BaseRenderer):
+    """Lets exports be requested with ``Accept: text/csv``; the body itself is streamed by the view."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only reached for error payloads (403, 400, ...)
+        return '' if data is None else str(data)
+
+
+class BaseExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsLandlord]
+    renderer_classes = [JSONRenderer, CSVStreamRenderer]
+    export_kind = None
+
+    def get(self, request):
+        from django.http import StreamingHttpResponse
+        from django.utils import timezone
+
+        _, columns = EXPORTS[self.export_kind]
+        queryset = QueryParamFilterBackend().filter_queryset(
+            request, export_queryset(self.export_kind, request.user), self)
+        response = StreamingHttpResponse(
+            stream_csv(export_rows(queryset, columns)), content_type='text/csv')
+        filename = f'{self.export_kind}-{timezone.localdate():%Y%m%d}.csv'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class PaymentExportView(BaseExportView):
+    export_kind = 'payments'
+    filter_fields = {
+        'status': 'status',
+        'payment_type': 'payment_type',
+        'property': 'room__property',
+        'room': 'room',
+    }
+    date_filter_field = 'date'
+
+
+class ElectricityBillExportView(BaseExportView):
+    export_kind = 'electricity'
+    filter_fields = {'property': 'room__property', 'room': 'room', 'is_paid': 'is_paid'}
+    date_filter_field = 'month'
+
+
+class ChunkedUploadCreateView(APIView):
+    """
+    Start a resumable upload.
+
+    The client then PATCHes raw bytes to ``uploads/<id>/`` with an
+    ``Upload-Offset`` header equal to the bytes already stored, and can GET the
+    session at any time to learn where to resume.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        from django.conf import settings
+
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        user = request.user
+        room = None
+
+        if data['target'] == 'proof':
+            if not IsLandlord().has_permission(request, self):
+                raise PermissionDenied("Only landlords can upload a proof.")
+        elif IsTenant().has_permission(request, self):
+            room = user.rooms.first()
+            if room is None:
+                return Response({'detail': 'No room assigned.'}, status=404)
+        elif IsLandlord().has_permission(request, self):
+            room = Room.objects.filter(
+                id=data.get('room_id'), property__landlord=user, tenant__isnull=False).first()
+            if room is None:
+                return Response({'room': ['Room not found, not yours, or has no tenant.']}, status=400)
+        else:
+            raise PermissionDenied()
+
+        session = serializer.save(user=user, room_id=room.id if room else None)
+        return Response({
+            **UploadSessionSerializer(session).data,
+            'chunk_size': settings.CHUNKED_UPLOAD_MAX_CHUNK,
+        }, status=201)
+
+
+class ChunkedUploadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        session = generics.get_object_or_404(UploadSession, pk=pk, user=request.user)
+        return Response(UploadSessionSerializer(session).data)
+
+    def patch(self, request, pk):
+        from datetime import timedelta
+        from django.conf import settings
+        from django.utils import timezone
+
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response({'detail': 'Upload-Offset and Content-Length headers are required.'}, status=400)
+        if not 0 < length <= settings.CHUNKED_UPLOAD_MAX_CHUNK:
+            return Response({'detail': f'Chunks must be 1 to {settings.CHUNKED_UPLOAD_MAX_CHUNK} bytes.'}, status=400)
+
+        # Lock only long enough to check the offset and claim the session;
+        # the chunk itself streams with no transaction or row lock held
+        stale = timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_CLAIM_SECONDS)
+        with transaction.atomic():
+            session = generics.get_object_or_404(
+                UploadSession.objects.select_for_update().select_related('room'), pk=pk, user=request.user)
+            busy = session.status == 'receiving' and session.updated_at > stale
+            if session.status == 'complete' or busy or offset != session.offset:
+                return Response({'detail': 'Offset mismatch.', 'offset': session.offset}, status=409)
+            if offset + length > session.size:
+                return Response({'detail': 'Chunk runs past the declared size.'}, status=400)
+            session.status = 'receiving'
+            session.save(update_fields=['status', 'updated_at'])
+
+        # updated_at identifies this claim: taking over a stale one bumps it
+        claimed = UploadSession.objects.filter(
+            pk=session.pk, status='receiving', offset=offset, updated_at=session.updated_at)
+        try:
+            # Read the raw request stream straight to disk; the body is never parsed
+            hasher = append_chunk(session, request.stream, length)
+        except BaseException:
+            claimed.update(status='uploading', updated_at=timezone.now())
+            raise
+
+        with transaction.atomic():
+            if not claimed.update(offset=session.offset, updated_at=timezone.now()):
+                current = UploadSession.objects.filter(pk=session.pk).values_list('offset', flat=True).first()
+                return Response({'detail': 'Offset mismatch.', 'offset': current}, status=409)
+            session.status = 'uploading'
+            if session.offset == session.size:
+                try:
+                    finalize(session, hasher)
+                except ChecksumMismatch:
+                    discard(session)
+                    session.offset = 0
+                    session.save(update_fields=['offset', 'status', 'updated_at'])
+                    return Response({'detail': 'Checksum mismatch, upload restarted.', 'offset': 0}, status=400)
+                except RoomVacated:
+                    discard(session)
+                    session.offset = 0
+                    session.save(update_fields=['offset', 'status', 'updated_at'])
+                    return Response({'detail': 'The room no longer has a tenant.', 'offset': 0}, status=400)
+            session.save()
+
+        return Response(UploadSessionSerializer(session).data)
+
+
 class ElectricityBillCreateView(generics.CreateAPIView):
     serializer_class = ElectricityBillSerializer
     permission_classes = [permissions.IsAuthenticated, IsLandlord]
@@ -147,14 +628,45 @@ class ElectricityBillCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         # Ensure the room belongs to the landlord
         room = serializer.validated_data['room']
-        if room.property.landlord != self.request.user:
+        if room.property.landlord_id != self.request.user.id:
             raise PermissionDenied("You can only add bills for your own properties.")
         serializer.save()
 
 
+class ElectricityBillRunView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsLandlord]
+
+    def post(self, request):
+        serializer = BillRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        readings = {}
+        for reading in data.get('readings', []):
+            if reading['room'] in readings:
+                return Response({'readings': [f"Room {reading['room']} appears more than once."]}, status=400)
+            readings[reading['room']] = reading
+
+        try:
+            summary = run_electricity_bills(
+                request.user,
+                data['month'],
+                readings=readings,
+                tariff=data.get('tariff'),
+                fixed_charge=data['fixed_charge'],
+                property_id=data.get('property'),
+            )
+        except BillRunError as exc:
+            return Response({'detail': str(exc)}, status=400)
+        return Response(summary, status=201 if summary['created'] else 200)
+
+
 class TenantElectricityBillListView(generics.ListAPIView):
     serializer_class = ElectricityBillSerializer
     permission_classes = [permissions.IsAuthenticated, IsTenant]
+    pagination_class = ElectricityBillCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {'room': 'room', 'is_paid': 'is_paid'}
+    date_filter_field = 'month'
 
     def get_queryset(self):
         # Show bills for the tenant's assigned room
@@ -169,61 +681,173 @@ class CommunityMessageCreateView(generics.CreateAPIView):
         serializer.save(sender=self.request.user)
 
 
-class CommunityMessageListView(generics.ListAPIView):
+class CommunityMessageListView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = CommunityMessageSerializer
     permission_classes = [permissions.IsAuthenticated] # Both can view
+    read_replica = True
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [QueryParamFilterBackend]
+    date_filter_field = 'created_at'
 
     def get_queryset(self):
-        return CommunityMessage.objects.all().order_by('-created_at')
+        return CommunityMessage.objects.select_related('sender').order_by('-created_at')
+
+    def get_validators(self, request):
+        # Whole feed: any filtered page changes only if the feed does. ETag
+        # only, as for the properties list: deletes don't move max(updated_at)
+        stats = CommunityMessage.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+        return (stats['count'], stats['last']), None
 
 
-class LandlordContactView(APIView):
+class LandlordContactView(ConditionalGetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated, IsTenant]
 
+    def get_validators(self, request):
+        row = Room.objects.filter(tenant=request.user).order_by('pk').values_list(
+            'property__landlord_id', 'property__landlord__updated_at').first()
+        if row is None:
+            return None
+        return row, row[1]
+
     def get(self, request):
-        user = request.user
-        room = user.rooms.first()
-        if not room:
+        lookup = get_tenant_room(request.user)
+        if lookup is None:
             return Response({'detail': 'No room assigned.'}, status=404)
-        
-        landlord = room.property.landlord
-        return Response({
-            'name': landlord.username,
-            'email': landlord.email,
-            # Add phone number if available in profile
-        })
+        # Add phone number if available in profile
+        return Response(get_landlord_contact(lookup['landlord']))
 
 
 class ChatView(generics.ListCreateAPIView):
     serializer_class = ChatMessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimestampCursorPagination
 
     def get_queryset(self):
         user = self.request.user
         # Get messages where user is sender OR receiver
         return ChatMessage.objects.filter(
             models.Q(sender=user) | models.Q(receiver=user)
-        ).order_by('timestamp')
+        ).select_related('sender', 'receiver').order_by('timestamp')
 
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
 
 
+class ChatConversationListView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        from django.db.models import Case, Count, F, Max, Q, When
+
+        user = request.user
+        # One grouped query over the user's messages: last id and unread count
+        # per counterpart. The last messages are then fetched by primary key.
+        conversations = list(
+            ChatMessage.objects.filter(Q(sender=user) | Q(receiver=user))
+            .annotate(other=Case(When(sender=user, then=F('receiver')), default=F('sender')))
+            .values('other')
+            .annotate(last_id=Max('id'), unread=Count('id', filter=Q(receiver=user, is_read=False)))
+            .order_by('-last_id')
+        )
+        last_messages = ChatMessage.objects.select_related('sender', 'receiver').in_bulk(
+            [c['last_id'] for c in conversations])
+
+        data = []
+        for conversation in conversations:
+            message = last_messages[conversation['last_id']]
+            other = message.receiver if message.sender_id == user.id else message.sender
+            data.append({
+                'user': {'id': other.id, 'username': other.username},
+                'last_message': ChatMessageSerializer(message).data,
+                'unread_count': conversation['unread'],
+            })
+        return Response(data)
+
+
+CHAT_SYNC_PARAMS_ERROR = 'after, before and limit must be integers, limit at least 1.'
+
+
+def chat_sync_params(params, default_limit, max_limit):
+    """``(after, before, limit)`` from the chat sync query string; ValueError when invalid."""
+    after = int(params.get('after', 0))
+    before = int(params['before']) if params.get('before') else None
+    limit = int(params.get('limit', default_limit))
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return after, before, min(limit, max_limit)
+
+
+class ChatMessageSyncView(APIView):
+    """
+    Messages exchanged with one user.
+
+    ``?after=<id>`` returns newer messages (oldest first) and answers 204 when
+    there is nothing new; ``?before=<id>`` pages back through older history.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 100
+    max_limit = 500
+
+    def get(self, request, user_id):
+        try:
+            after, before, limit = chat_sync_params(request.query_params, self.default_limit, self.max_limit)
+        except ValueError:
+            return Response({'detail': CHAT_SYNC_PARAMS_ERROR}, status=400)
+
+        user = request.user
+        messages = ChatMessage.objects.filter(
+            models.Q(sender=user, receiver_id=user_id) | models.Q(sender_id=user_id, receiver=user),
+            id__gt=after,
+        )
+        if before is not None:
+            # Most recent page before the cursor, returned in chronological order
+            messages = list(messages.filter(id__lt=before).select_related(
+                'sender', 'receiver').order_by('-id')[:limit])[::-1]
+        else:
+            messages = list(messages.select_related('sender', 'receiver').order_by('id')[:limit])
+
+        if not messages:
+            return Response(status=204)
+        return Response(ChatMessageSerializer(messages, many=True).data)
+
+
+class ChatMarkReadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, user_id):
+        serializer = ChatMarkReadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        updated = ChatMessage.objects.filter(
+            sender_id=user_id,
+            receiver=request.user,
+            is_read=False,
+            id__lte=serializer.validated_data['up_to'],
+        ).update(is_read=True)
+        if updated:
+            # Read receipt for the other side of the conversation
+            publish(user_channel(user_id), 'chat.read', {
+                'reader': request.user.id,
+                'up_to': serializer.validated_data['up_to'],
+            })
+        return Response({'updated': updated})
+
+
 class IncomeAnalyticsView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsLandlord]
+    read_replica = True
+    filter_fields = {'property': 'property', 'payment_type': 'payment_type'}
 
     def get(self, request):
         from django.db.models import Sum
-        from django.db.models.functions import TruncMonth
 
-        # Aggregate payments by month for the landlord's properties
-        payments = Payment.objects.filter(
-            room__property__landlord=request.user,
-            status='approved'
-        ).annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            total=Sum('amount')
+        # Served from the MonthlyIncome rollup: one row per property/month/type
+        income = QueryParamFilterBackend().filter_queryset(
+            request, MonthlyIncome.objects.filter(landlord=request.user), self)
+
+        payments = income.values('month').annotate(
+            total=Sum('total')
         ).order_by('month')
 
         data = [
@@ -236,4 +860,64 @@ class IncomeAnalyticsView(APIView):
         return Response(data)
 
 
+class RentDashboardView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsLandlord]
+    read_replica = True
+    filter_fields = {'property': 'id'}
 
+    def get(self, request):
+        from datetime import date
+        from decimal import Decimal
+        from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+        from django.db.models.functions import Coalesce
+        from django.utils import timezone
+
+        month_param = request.query_params.get('month')
+        if month_param:
+            try:
+                year, month = (int(part) for part in month_param.split('-'))
+                month = date(year, month, 1)
+            except ValueError:
+                return Response({'month': ['Use the YYYY-MM format.']}, status=400)
+        else:
+            month = timezone.localdate().replace(day=1)
+
+        money = DecimalField(max_digits=14, decimal_places=2)
+        zero = Value(Decimal('0'), output_field=money)
+        collected = MonthlyIncome.objects.filter(
+            property=OuterRef('pk'), month=month, payment_type='rent'
+        ).values('total')[:1]
+        unpaid_bills = ElectricityBill.objects.filter(
+            room__property=OuterRef('pk'), month=month, is_paid=False
+        ).order_by().values('room__property').annotate(total=Sum('amount')).values('total')
+
+        # One grouped query: room counts/rent come from the join, collected rent
+        # and unpaid bills from correlated subqueries (no row multiplication).
+        properties = QueryParamFilterBackend().filter_queryset(
+            request, Property.objects.filter(landlord=request.user), self
+        ).annotate(
+            rooms_total=Count('rooms'),
+            rooms_occupied=Count('rooms', filter=Q(rooms__tenant__isnull=False)),
+            expected_rent=Coalesce(Sum('rooms__rent', filter=Q(rooms__tenant__isnull=False)), zero),
+            collected_rent=Coalesce(Subquery(collected, output_field=money), zero),
+            unpaid_electricity=Coalesce(Subquery(unpaid_bills, output_field=money), zero),
+        ).values(
+            'id', 'name', 'room_count', 'rooms_total', 'rooms_occupied',
+            'expected_rent', 'collected_rent', 'unpaid_electricity',
+        ).order_by('id')
+
+        fields = ['room_count', 'rooms_total', 'rooms_occupied', 'expected_rent',
+                  'collected_rent', 'pending_rent', 'unpaid_electricity']
+        totals = dict.fromkeys(fields, 0)
+        rows = []
+        for prop in properties:
+            prop['pending_rent'] = max(prop['expected_rent'] - prop['collected_rent'], 0)
+            for field in fields:
+                totals[field] += prop[field]
+            rows.append(prop)
+
+        return Response({
+            'month': month.strftime('%Y-%m'),
+            'properties': rows,
+            'totals': totals,
+        })
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SuperadminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'superadmin'
+
+    def ready(self):
+        # Connects the per-connection database tuning
+        import apartment.db  # noqa: F401
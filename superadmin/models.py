@@ -12,6 +12,7 @@ class Role(models.Model):
 class User(AbstractUser):
     role = models.ForeignKey(
         Role, on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Optional helper
     @property
@@ -1,8 +1,18 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
+from django.db import connection
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 from superadmin.models import Role
+from apartment.authentication import user_cache
+from apartment.metrics import registry
+from apartment.pool import PoolTimeout, close_pools, pool_stats
 
 User = get_user_model()
 
@@ -40,3 +50,220 @@ class AuthTests(TestCase):
         response = self.client.post(self.login_url, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
+
+
+class JWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_role = Role.objects.create(name='admin')
+        self.landlord = User.objects.create_user(
+            username='landlord1', password='password123', role=self.admin_role)
+        token = AccessToken.for_user(self.landlord)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+
+    @override_settings(JWT_USER_CACHE_TTL=0)
+    def test_role_loaded_with_user(self):
+        # One query for user + role, one for the rooms page
+        with self.assertNumQueries(2):
+            response = self.client.get('/landlord/rooms/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(JWT_USER_CACHE_TTL=60)
+    def test_cached_user_and_invalidation(self):
+        self.client.get('/landlord/rooms/')
+        with self.assertNumQueries(1):
+            self.client.get('/landlord/rooms/')
+
+        self.landlord.role = Role.objects.create(name='tenant')
+        self.landlord.save()
+        response = self.client.get('/landlord/rooms/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(JWT_USER_CACHE_TTL=60)
+    def test_cache_holds_own_copy_and_drops_expired(self):
+        user_cache.set(self.landlord)
+        self.landlord.username = 'changed'
+        self.assertEqual(user_cache.get(self.landlord.pk).username, 'landlord1')
+
+        other = User.objects.create_user(username='other', password='password123')
+        user_cache.set(other)
+        with mock.patch('apartment.authentication.time.monotonic', return_value=time.monotonic() + 120):
+            self.assertIsNone(user_cache.get(other.pk))
+            user_cache.set(self.landlord)
+        self.assertEqual(list(user_cache._entries), [str(self.landlord.pk)])
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.landlord = User.objects.create_user(
+            username='landlord1', password='password123', role=Role.objects.create(name='admin'))
+        self.staff = User.objects.create_user(username='ops', password='password123', is_staff=True)
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_requests_recorded_per_url_name(self):
+        self.client.force_authenticate(user=self.landlord)
+        self.client.get('/landlord/rooms/')
+        self.client.get('/landlord/rooms/')
+        self.client.get('/no-such-page/')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+
+        with self.assertLogs('apartment.metrics', 'INFO') as logs:
+            self.client.force_authenticate(user=self.staff)
+            response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rooms = response.data['endpoints']['room-list-create']
+        self.assertEqual(rooms['count'], 2)
+        self.assertEqual(rooms['queries'], {'avg': 1.0, 'max': 1})
+        self.assertEqual(sum(rooms['histogram'].values()), 2)
+        self.assertIsNotNone(rooms['time_ms']['p95'])
+        self.assertGreater(rooms['bytes_avg'], 0)
+        self.assertIn('<unresolved>', response.data['endpoints'])
+        self.assertIn('lookups', response.data['caches'])
+        self.assertIn('"view": "metrics"', logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={'room-list-create': 0})
+    def test_over_budget_logged_as_warning(self):
+        self.client.force_authenticate(user=self.landlord)
+        with self.assertLogs('apartment.metrics', 'WARNING') as logs:
+            self.client.get('/landlord/rooms/')
+        self.assertIn('"query_budget": 0', logs.output[0])
+
+
+class ConnectionPoolTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = {
+            **connection.settings_dict, 'NAME': os.path.join(directory.name, 'db.sqlite3'), 'CONN_MAX_AGE': 0,
+            'POOL': {'MAX_SIZE': 1, 'TIMEOUT': 0.1, 'PING_AFTER': 0},
+        }
+        self.addCleanup(close_pools)
+
+    def wrapper(self):
+        from apartment.db_backends.sqlite3.base import DatabaseWrapper
+
+        return DatabaseWrapper(self.settings_dict, 'pooled')
+
+    def query(self, db):
+        with db.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return db.connection
+
+    def in_thread(self, target):
+        errors = []
+
+        def run():
+            try:
+                target()
+            except Exception as exc:
+                errors.append(exc)
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        return errors
+
+    def test_connection_returned_and_reused(self):
+        db = self.wrapper()
+        first = self.query(db)
+        db.close()
+        self.assertEqual(pool_stats()['pooled'], {
+            'max_size': 1, 'size': 1, 'idle': 1, 'in_use': 0,
+            'created': 1, 'reused': 0, 'discarded': 0, 'reaped': 0, 'waits': 0, 'timeouts': 0,
+        })
+        # Another thread (own wrapper) gets the same raw connection
+        seen = []
+        self.assertEqual(self.in_thread(lambda: seen.append(self.query(self.wrapper()))), [])
+        self.assertIs(seen[0], first)
+        self.assertEqual(pool_stats()['pooled']['reused'], 1)
+
+    def test_size_capped_per_worker(self):
+        db = self.wrapper()
+        self.query(db)
+        self.addCleanup(db.close)
+        errors = self.in_thread(lambda: self.query(self.wrapper()))
+        self.assertIsInstance(errors[0], PoolTimeout)
+        self.assertEqual(pool_stats()['pooled']['timeouts'], 1)
+
+    def test_connection_of_finished_thread_reclaimed(self):
+        # The thread ends without closing its connection
+        self.assertEqual(self.in_thread(lambda: self.query(self.wrapper())), [])
+        db = self.wrapper()
+        self.query(db)
+        db.close()
+        stats = pool_stats()['pooled']
+        self.assertEqual((stats['reaped'], stats['size']), (1, 1))
+
+    def test_dead_connection_replaced(self):
+        db = self.wrapper()
+        raw = self.query(db)
+        db.close()
+        raw.close()  # e.g. the server dropped it
+        self.assertIsNot(self.query(db), raw)
+        db.close()
+        stats = pool_stats()['pooled']
+        self.assertEqual((stats['created'], stats['discarded'], stats['size']), (2, 1, 1))
+
+    def test_open_transaction_rolled_back_on_return(self):
+        db = self.wrapper()
+        with db.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (n integer)')
+        db.set_autocommit(False)
+        with db.cursor() as cursor:
+            cursor.execute('INSERT INTO t VALUES (1)')
+        db.close()
+        with db.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM t')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertTrue(db.get_autocommit())
+        db.close()
+
+    def test_pragmas_applied_once_per_raw_connection(self):
+        from apartment.db_backends.sqlite3 import base
+
+        with mock.patch.object(base, 'apply_sqlite_pragmas', wraps=base.apply_sqlite_pragmas) as tune:
+            db = self.wrapper()
+            self.query(db)
+            db.close()
+            with db.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.assertEqual(cursor.fetchone()[0], 'wal')
+            db.close()
+        self.assertEqual(tune.call_count, 1)
+        self.assertEqual(pool_stats()['pooled']['reused'], 1)
+
+    def test_stats_in_metrics(self):
+        db = self.wrapper()
+        self.query(db)
+        db.close()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='ops', password='password123', is_staff=True))
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.data['db_pools']['pooled']['created'], 1)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite profile only')
+class SQLiteTuningTests(TestCase):
+    def test_pragmas_applied_on_connect(self):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        db = DatabaseWrapper({**connection.settings_dict, 'NAME': os.path.join(directory.name, 'db.sqlite3')}, 'tuning')
+        self.addCleanup(db.close)
+        db.force_debug_cursor = True
+        with db.cursor() as cursor:
+            values = {}
+            for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'temp_store'):
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+        # synchronous NORMAL = 1, temp_store MEMORY = 2
+        self.assertEqual(values, {
+            'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+            'cache_size': -65536, 'temp_store': 2,
+        })
+        # Set on the raw connection: not logged, nor counted as request queries
+        self.assertEqual([query['sql'] for query in db.queries_log if ' = ' in query['sql']], [])